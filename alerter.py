@@ -1,15 +1,96 @@
 """
 Alert Service Module for Network Monitor
-Handles sending alerts via Email and LINE Notify
+Handles sending alerts via Email and Telegram
 """
+import functools
+import queue
 import smtplib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from secret_store import decrypt_secret
 
 
+def _build_http_session():
+    """Keep-alive session shared by the HTTP alert senders"""
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=frozenset(['POST']),
+        raise_on_status=False,
+    )
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+_HTTP = _build_http_session()
+
+# LINE Notify was shut down by LINE in March 2025
+_LINE_NOTIFY_DISCONTINUED = 'LINE Notify discontinued (service ended March 2025)'
+
+_BODY_TEMPLATE = (
+    "\nNetwork Monitor Alert\n"
+    "=====================\n"
+    "\n"
+    "%s\n"
+    "\n"
+    "Time: %s\n"
+    "\n"
+    "---\n"
+    "This is an automated message from Network Monitor.\n"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _format_timestamp(epoch_second):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(epoch_second))
+
+
+def _delivery_status(result):
+    """alert_history status for a send result; only 'sent' rows count towards the cooldown"""
+    if result.get('success'):
+        return 'sent'
+    return 'queued' if result.get('queued') else 'failed'
+
+
+def _now_str():
+    """Current local time as 'YYYY-MM-DD HH:MM:SS', formatted at most once per second"""
+    return _format_timestamp(int(time.time()))
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace outbound API calls"""
+    
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens=1):
+        """Block until the requested number of tokens is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 class Alerter:
     """Alert service for sending notifications"""
     
@@ -17,23 +98,69 @@ class Alerter:
         self.db = database
         self.plugin_manager = None
         self._settings_cache = {}
+        self._enabled_settings = frozenset()  # keys whose value is 'true'
+        self._line_warned = False
         self._cache_time = None
-        self._cache_duration = timedelta(seconds=30)
+        # Any Database write bumps alert_settings_version, which drops the cache;
+        # invalidate_settings() covers other writers and the TTL is only a safety net
+        self._cache_duration = timedelta(minutes=10)
+        self._settings_version = None
         # In-memory lock to prevent duplicate alerts (race condition prevention)
-        self._recent_alerts = {}  # key: (device_id, event_type), value: datetime
-        self._alert_lock_duration = timedelta(seconds=30)  # Minimum 30 seconds between same alerts
+        self._recent_alerts = OrderedDict()  # key: (device_id, event_type), value: time.monotonic(), oldest first
+        self._alert_lock_seconds = 30  # Minimum 30 seconds between same alerts
+        self._recent_alert_ttl = 600  # Forget in-memory locks after 10 minutes
+        # Short-lived maintenance lookups; maintenance routes call invalidate_maintenance()
+        self._maintenance_cache = {}  # key: device_id, value: (time.monotonic(), [(start_time, end_time), ...])
+        self._maintenance_cache_seconds = 15
+        # Reused SMTP session (avoids TLS handshake + login on every alert)
+        self._smtp = None
+        self._smtp_key = None
+        self._smtp_lock = threading.Lock()
+        self._smtp_sent_count = 0
+        self._smtp_last_used = 0.0
+        # Telegram rate limits: ~30 msg/s per bot, ~1 msg/s per chat
+        self._tg_bucket = TokenBucket(rate=25, burst=25)
+        # Per-chat buckets, least recently used first; idle ones are refilled anyway, so they are evicted
+        self._tg_per_chat = OrderedDict()  # key: chat_id, value: (TokenBucket, time.monotonic() of last use)
+        self._tg_per_chat_lock = threading.Lock()
+        self._tg_per_chat_idle = 300
+        self._tg_per_chat_max = 1024
+        self._tg_deferred = queue.Queue()
+        self._tg_worker = None
+        self._tg_worker_lock = threading.Lock()
+        # Channel results are logged by a background writer in small batches
+        self._log_q = queue.Queue(maxsize=1000)
+        self._log_writer = None
+        self._log_writer_lock = threading.Lock()
+        # Channels are independent, so a single alert fans out to them concurrently
+        self._exec = ThreadPoolExecutor(max_workers=3, thread_name_prefix='alerter')
     
     def _get_settings(self):
         """Get alert settings from database with caching"""
         now = datetime.now()
-        if self._cache_time and (now - self._cache_time) < self._cache_duration:
+        version = getattr(self.db, 'alert_settings_version', None)
+        if (self._cache_time and (now - self._cache_time) < self._cache_duration
+                and version == self._settings_version):
             return self._settings_cache
         
         settings = self.db.get_all_alert_settings()
         self._settings_cache = {s['setting_key']: s['setting_value'] for s in settings}
+        self._enabled_settings = frozenset(
+            key for key, value in self._settings_cache.items()
+            if str(value).lower() == 'true'
+        )
         self._cache_time = now
+        self._settings_version = version
         return self._settings_cache
     
+    def get_settings(self):
+        """Copy of the cached alert settings dict"""
+        return dict(self._get_settings())
+    
+    def invalidate_settings(self):
+        """Drop cached settings so the next read reloads them from the database"""
+        self._cache_time = None
+    
     def _get_setting(self, key, default=None):
         """Get a single setting value"""
         settings = self._get_settings()
@@ -41,7 +168,81 @@ class Alerter:
     
     def is_enabled(self, channel):
         """Check if a notification channel is enabled"""
-        return self._get_setting(f'{channel}_enabled', 'false').lower() == 'true'
+        if channel == 'line':
+            if not self._line_warned:
+                self._line_warned = True
+                print(f"[Alert] {_LINE_NOTIFY_DISCONTINUED}; channel ignored")
+            return False
+        self._get_settings()
+        return f'{channel}_enabled' in self._enabled_settings
+    
+    def _get_smtp_conn(self, smtp_server, smtp_port, smtp_user, smtp_password,
+                       max_per_conn=100, idle_seconds=120):
+        """
+        Return an authenticated SMTP session, reusing the cached one when healthy.
+        The session is rotated after max_per_conn messages or idle_seconds of
+        inactivity so provider quotas and firewall idle drops don't bite.
+        Caller must hold self._smtp_lock.
+        """
+        key = (smtp_server, smtp_port, smtp_user, smtp_password)
+        expired = (
+            self._smtp_sent_count >= max_per_conn
+            or (time.monotonic() - self._smtp_last_used) > idle_seconds
+        )
+        if self._smtp is not None and self._smtp_key == key and not expired:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+        self._reset_smtp_conn()
+        
+        if smtp_port == 465:
+            # Use SSL directly for port 465
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=30)
+        else:
+            # Use STARTTLS for port 587 and others
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
+            server.ehlo()
+            server.starttls()
+            server.ehlo()
+        
+        try:
+            server.login(smtp_user, smtp_password)
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+            raise
+        
+        self._smtp = server
+        self._smtp_key = key
+        self._smtp_sent_count = 0
+        self._smtp_last_used = time.monotonic()
+        return server
+    
+    def _reset_smtp_conn(self):
+        """Drop the cached SMTP session (caller must hold self._smtp_lock)"""
+        server = self._smtp
+        self._smtp = None
+        self._smtp_key = None
+        self._smtp_sent_count = 0
+        if server is not None:
+            try:
+                server.quit()
+            except Exception:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+    
+    def close(self):
+        """Close the cached SMTP session and channel workers (call on shutdown)"""
+        self._exec.shutdown(wait=False)
+        self._stop_log_writer()
+        with self._smtp_lock:
+            self._reset_smtp_conn()
     
     def send_email(self, subject, message, recipient=None):
         """
@@ -56,6 +257,8 @@ class Alerter:
         smtp_user = settings.get('smtp_user', '').strip()
         smtp_password = settings.get('smtp_password', '')
         smtp_from = settings.get('smtp_from', '').strip() or smtp_user
+        max_per_conn = self._get_int_setting('smtp_max_per_conn', 100, minimum=1)
+        idle_seconds = self._get_int_setting('smtp_idle_seconds', 120)
         recipient_str = ""
         if recipient:
             if isinstance(recipient, list):
@@ -79,36 +282,38 @@ class Alerter:
             msg['Subject'] = f"[Network Monitor] {subject}"
             
             # Add body
-            body = f"""
-Network Monitor Alert
-=====================
-
-{message}
-
-Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
----
-This is an automated message from Network Monitor.
-"""
+            body = _BODY_TEMPLATE % (message, _now_str())
             msg.attach(MIMEText(body, 'plain', 'utf-8'))
             
-            # Connect and send
-            if smtp_port == 465:
-                # Use SSL directly for port 465
-                server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=30)
-            else:
-                # Use STARTTLS for port 587 and others
-                server = smtplib.SMTP(smtp_server, smtp_port, timeout=30)
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
+            # Serialize once; sendmail issues one RCPT per recipient and reports
+            # refused addresses instead of failing the whole envelope
+            raw = msg.as_bytes()
             
-            server.login(smtp_user, smtp_password)
-            server.send_message(msg)
-            server.quit()
+            conn_args = (smtp_server, smtp_port, smtp_user, smtp_password, max_per_conn, idle_seconds)
+            with self._smtp_lock:
+                try:
+                    server = self._get_smtp_conn(*conn_args)
+                    refused = server.sendmail(smtp_from, recipients, raw)
+                except smtplib.SMTPServerDisconnected:
+                    # Cached session may have been dropped by the server; reconnect once.
+                    # Other SMTP errors mean the server already answered the message,
+                    # so resending could only duplicate or repeat a rejection.
+                    self._reset_smtp_conn()
+                    server = self._get_smtp_conn(*conn_args)
+                    refused = server.sendmail(smtp_from, recipients, raw)
+                self._smtp_sent_count += 1
+                self._smtp_last_used = time.monotonic()
             
+            if refused:
+                return {
+                    'success': True,
+                    'partial': sorted(refused),
+                    'warning': f"Sent to {len(recipients) - len(refused)}/{len(recipients)}, refused: {', '.join(sorted(refused))}"
+                }
             return {'success': True}
             
+        except smtplib.SMTPRecipientsRefused as e:
+            return {'success': False, 'error': f"All recipients refused: {', '.join(sorted(e.recipients))}"}
         except smtplib.SMTPAuthenticationError as e:
             return {'success': False, 'error': f'SMTP authentication failed: {str(e)}'}
         except smtplib.SMTPException as e:
@@ -118,36 +323,10 @@ This is an automated message from Network Monitor.
     
     def send_line_notify(self, message):
         """
-        Send LINE Notify message (DEPRECATED - service ended March 2025)
-        Returns: dict with 'success' and 'error' (if failed)
+        LINE Notify (DEPRECATED - service ended March 2025)
+        Kept so existing callers get an explicit error instead of a network timeout
         """
-        token = self._get_setting('line_notify_token', '')
-        
-        if not token:
-            return {'success': False, 'error': 'LINE Notify token not configured'}
-        
-        try:
-            url = 'https://notify-api.line.me/api/notify'
-            headers = {
-                'Authorization': f'Bearer {token}'
-            }
-            data = {
-                'message': f"\n🔔 Network Monitor Alert\n\n{message}\n\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            }
-            
-            response = requests.post(url, headers=headers, data=data, timeout=10)
-            
-            if response.status_code == 200:
-                return {'success': True}
-            elif response.status_code == 401:
-                return {'success': False, 'error': 'Invalid LINE Notify token'}
-            else:
-                return {'success': False, 'error': f'LINE API error: {response.status_code}'}
-                
-        except requests.exceptions.Timeout:
-            return {'success': False, 'error': 'LINE Notify timeout'}
-        except Exception as e:
-            return {'success': False, 'error': str(e)}
+        return {'success': False, 'error': _LINE_NOTIFY_DISCONTINUED}
     
     def send_telegram(self, message, recipient=None):
         """
@@ -173,33 +352,31 @@ This is an automated message from Network Monitor.
         chat_ids = [id.strip() for id in chat_id_str.split(',') if id.strip()]
         
         if not chat_ids:
-             return {'success': False, 'error': 'No valid Telegram Chat IDs found'}
-             
+            return {'success': False, 'error': 'No valid Telegram Chat IDs found'}
+        
         success_count = 0
+        deferred_count = 0
         errors = []
         
-        for chat_id in chat_ids:
+        # URL and message body are the same for every chat in this call
+        url = f'https://api.telegram.org/bot{bot_token}/sendMessage'
+        base_data = {
+            'text': f"🔔 *Network Monitor Alert*\n\n{message}\n\n⏰ {_now_str()}",
+            'parse_mode': 'Markdown'
+        }
+        
+        for index, chat_id in enumerate(chat_ids):
             try:
-                url = f'https://api.telegram.org/bot{bot_token}/sendMessage'
-                
-                # Format message with emoji
-                formatted_message = f"🔔 *Network Monitor Alert*\n\n{message}\n\n⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                data = {**base_data, 'chat_id': chat_id}
+                response, result = self._post_telegram(url, data)
                 
-                data = {
-                    'chat_id': chat_id,
-                    'text': formatted_message,
-                    'parse_mode': 'Markdown'
-                }
-                
-                response = requests.post(url, data=data, timeout=10)
-                result = response.json()
-
-                # Alert text can contain device names or event keys with Markdown
-                # control characters. Retry as plain text instead of dropping it.
-                if response.status_code == 400 and "can't parse entities" in result.get('description', ''):
-                    data.pop('parse_mode', None)
-                    response = requests.post(url, data=data, timeout=10)
-                    result = response.json()
+                if response.status_code == 429:
+                    # Still throttled after honoring retry_after: hand the rest
+                    # of the batch to the background sender instead of blocking.
+                    for pending_chat_id in chat_ids[index:]:
+                        self._defer_telegram(url, {**data, 'chat_id': pending_chat_id})
+                    deferred_count = len(chat_ids) - index
+                    break
                 
                 if response.status_code == 200 and result.get('ok'):
                     success_count += 1
@@ -214,12 +391,103 @@ This is an automated message from Network Monitor.
             except Exception as e:
                 errors.append(f"Error for {chat_id}: {str(e)}")
         
+        if deferred_count:
+            errors.append(f"Rate limited, {deferred_count} message(s) queued for retry")
+        
+        # Deferred messages are not delivered yet: report them as 'queued', never as success
         if success_count > 0:
+            result = {'success': True}
             if len(errors) > 0:
-                return {'success': True, 'warning': f"Sent to {success_count}/{len(chat_ids)}, Errors: {'; '.join(errors)}"}
-            return {'success': True}
-        else:
-            return {'success': False, 'error': f"All attempts failed: {'; '.join(errors)}"}
+                result['warning'] = f"Sent to {success_count}/{len(chat_ids)}, Errors: {'; '.join(errors)}"
+            if deferred_count:
+                result['queued'] = deferred_count
+            return result
+        if deferred_count:
+            return {'success': False, 'queued': deferred_count, 'error': '; '.join(errors)}
+        return {'success': False, 'error': f"All attempts failed: {'; '.join(errors)}"}
+    
+    def _post_telegram(self, url, data):
+        """
+        POST one sendMessage call, paced by the global and per-chat token buckets.
+        Retries once after a 429 (honoring retry_after) and once as plain text
+        after a Markdown parse error.
+        Returns: (response, parsed JSON body)
+        """
+        data = dict(data)
+        for attempt in range(2):
+            self._acquire_telegram(data.get('chat_id'))
+            response = _HTTP.post(url, data=data, timeout=10)
+            result = response.json()
+            
+            # Alert text can contain device names or event keys with Markdown
+            # control characters. Retry as plain text instead of dropping it.
+            if response.status_code == 400 and "can't parse entities" in result.get('description', ''):
+                data.pop('parse_mode', None)
+                self._acquire_telegram(data.get('chat_id'))
+                response = _HTTP.post(url, data=data, timeout=10)
+                result = response.json()
+            
+            if response.status_code != 429 or attempt:
+                break
+            time.sleep(self._telegram_retry_after(result))
+        return response, result
+    
+    def _acquire_telegram(self, chat_id):
+        """Wait for a send slot under both the bot-wide and the per-chat limit"""
+        self._tg_bucket.acquire()
+        now = time.monotonic()
+        with self._tg_per_chat_lock:
+            entry = self._tg_per_chat.pop(chat_id, None)
+            bucket = entry[0] if entry else TokenBucket(rate=1, burst=1)
+            self._tg_per_chat[chat_id] = (bucket, now)
+            while self._tg_per_chat:
+                _, (_, last_used) = next(iter(self._tg_per_chat.items()))
+                if len(self._tg_per_chat) <= self._tg_per_chat_max and now - last_used <= self._tg_per_chat_idle:
+                    break
+                self._tg_per_chat.popitem(last=False)
+        bucket.acquire()
+    
+    def _telegram_retry_after(self, result):
+        """Seconds Telegram asked us to wait after a 429"""
+        try:
+            return max(1, int((result.get('parameters') or {}).get('retry_after', 1)))
+        except (TypeError, ValueError):
+            return 1
+    
+    def _defer_telegram(self, url, data, attempts=0):
+        """Queue a throttled Telegram message for the background sender"""
+        with self._tg_worker_lock:
+            self._tg_deferred.put((url, data, attempts))
+            if self._tg_worker is None:
+                self._tg_worker = threading.Thread(
+                    target=self._drain_telegram_deferred,
+                    name='alerter-telegram-deferred',
+                    daemon=True
+                )
+                self._tg_worker.start()
+    
+    def _drain_telegram_deferred(self):
+        """Background loop that re-sends throttled Telegram messages"""
+        while True:
+            try:
+                url, data, attempts = self._tg_deferred.get(timeout=60)
+            except queue.Empty:
+                with self._tg_worker_lock:
+                    if self._tg_deferred.empty():
+                        self._tg_worker = None
+                        return
+                continue
+            try:
+                response, result = self._post_telegram(url, data)
+                if response.status_code == 429 and attempts < 3:
+                    time.sleep(self._telegram_retry_after(result))
+                    self._tg_deferred.put((url, data, attempts + 1))
+                elif not (response.status_code == 200 and result.get('ok')):
+                    print(f"[Alert] Deferred Telegram send failed for {data.get('chat_id')}: {result.get('description')}")
+            except Exception as e:
+                print(f"[Alert] Deferred Telegram send failed for {data.get('chat_id')}: {e}")
+            finally:
+                self._tg_deferred.task_done()
     
     def send_webhook(self, subject, message, device=None, event_type=None):
         """
@@ -274,16 +542,92 @@ This is an automated message from Network Monitor.
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
+    def _queue_alert_log(self, device_id, event_type, message, channel, status, error=None):
+        """Hand an alert_history row to the background writer (direct write if the queue is full)"""
+        entry = (device_id, event_type, message, channel, status, error, datetime.now().isoformat())
+        with self._log_writer_lock:
+            if self._log_writer is None:
+                self._log_writer = threading.Thread(
+                    target=self._alert_log_writer,
+                    name='alerter-log-writer',
+                    daemon=True
+                )
+                self._log_writer.start()
+        try:
+            self._log_q.put_nowait(entry)
+        except queue.Full:
+            self.db.log_alert(*entry[:6])
+    
+    def _alert_log_writer(self):
+        """Background loop: collect up to 50 log rows (or 200ms) and write them in one transaction"""
+        while True:
+            entry = self._log_q.get()
+            if entry is None:
+                self._log_q.task_done()
+                return
+            batch = [entry]
+            stop = False
+            deadline = time.monotonic() + 0.2
+            while len(batch) < 50:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._log_q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    stop = True
+                    break
+                batch.append(entry)
+            
+            try:
+                self.db.log_alerts_bulk(batch)
+            except Exception as e:
+                print(f"[Alert] Bulk alert log failed, writing rows individually: {e}")
+                for row in batch:
+                    try:
+                        self.db.log_alert(*row[:6])
+                    except Exception as row_error:
+                        print(f"[Alert] Failed to log alert: {row_error}")
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._log_q.task_done()
+            if stop:
+                return
+    
+    def flush_alert_log(self):
+        """Block until every queued alert log row has been written"""
+        self._log_q.join()
+    
+    def _stop_log_writer(self, timeout=5):
+        """Flush pending log rows and stop the background writer"""
+        with self._log_writer_lock:
+            writer = self._log_writer
+            self._log_writer = None
+        if writer is None:
+            return
+        self._log_q.put(None)
+        writer.join(timeout)
+    
     def should_alert(self, device_id, event_type):
         """
         Check if we should send an alert (rate limiting and maintenance check)
         Returns True if enough time has passed since last alert and device is not in maintenance
         """
-        now = datetime.now()
         alert_key = (device_id, event_type)
         
+        # First check in-memory lock (prevents race conditions, needs no DB I/O)
+        last_memory_time = self._recent_alerts.get(alert_key)
+        if last_memory_time is not None:
+            # Use shorter lock for recovery to ensure it gets through after escalation
+            lock_seconds = 10 if event_type == 'recovery' else self._alert_lock_seconds
+            if (time.monotonic() - last_memory_time) < lock_seconds:
+                print(f"[Alert] Skipping alert - in-memory lock active for {alert_key}")
+                return False
+        
         # Check if device is in maintenance mode
-        if self.db.is_device_in_maintenance(device_id):
+        if self._is_in_maintenance(device_id):
             print(f"[Alert] Skipping alert - device {device_id} is in maintenance mode")
             return False
         
@@ -294,15 +638,6 @@ This is an automated message from Network Monitor.
                 print(f"[Alert] Suppressing alert for device {device_id} - parent '{down_parent.get('name')}' (ID:{down_parent.get('id')}) is down")
                 return False
         
-        # First check in-memory lock (prevents race conditions)
-        if alert_key in self._recent_alerts:
-            last_memory_time = self._recent_alerts[alert_key]
-            # Use shorter lock for recovery to ensure it gets through after escalation
-            lock_duration = timedelta(seconds=10) if event_type == 'recovery' else self._alert_lock_duration
-            if (now - last_memory_time) < lock_duration:
-                print(f"[Alert] Skipping alert - in-memory lock active for {alert_key}")
-                return False
-        
         # Then check database cooldown
         # Bypass global cooldown for recovery alerts to ensure they always follow a down event
         if event_type == 'recovery':
@@ -319,29 +654,53 @@ This is an automated message from Network Monitor.
         
         try:
             last_time = datetime.fromisoformat(last_alert)
-            return (now - last_time).total_seconds() >= cooldown
+            return (datetime.now() - last_time).total_seconds() >= cooldown
         except:
             return True
 
+    def _is_in_maintenance(self, device_id):
+        """
+        Maintenance check against the device's not-yet-ended windows, cached for a few seconds
+        The cached start/end times are compared with the clock on every call, so a
+        window that opens or closes on schedule takes effect without waiting for the TTL.
+        """
+        now = time.monotonic()
+        cached = self._maintenance_cache.get(device_id)
+        if cached is None or (now - cached[0]) >= self._maintenance_cache_seconds:
+            windows = [(str(window['start_time']), str(window['end_time']))
+                       for window in self.db.get_pending_maintenance(device_id)]
+            cached = self._maintenance_cache[device_id] = (now, windows)
+        # Same ISO string comparison as Database.get_active_maintenance
+        wall_clock = datetime.now().isoformat()
+        return any(start <= wall_clock <= end for start, end in cached[1])
+
+    def invalidate_maintenance(self):
+        """Forget cached maintenance lookups (call after maintenance windows change)"""
+        self._maintenance_cache.clear()
+
     def _get_cooldown_seconds(self, setting_key, default_seconds):
         """Read a cooldown setting defensively, falling back to a safe default."""
+        return self._get_int_setting(setting_key, default_seconds)
+
+    def _get_int_setting(self, setting_key, default, minimum=0):
+        """Read an integer setting defensively, falling back to a safe default."""
         try:
-            cooldown = int(self._get_setting(setting_key, default_seconds))
+            value = int(self._get_setting(setting_key, default))
         except (TypeError, ValueError):
-            cooldown = default_seconds
-        return max(0, cooldown)
+            value = default
+        return max(minimum, value)
     
     def _mark_alert_sent(self, device_id, event_type):
         """Mark alert as sent in memory lock"""
         alert_key = (device_id, event_type)
-        self._recent_alerts[alert_key] = datetime.now()
+        now = time.monotonic()
+        self._recent_alerts[alert_key] = now
+        self._recent_alerts.move_to_end(alert_key)
         
-        # Clean up old entries (older than 10 minutes)
-        cutoff = datetime.now() - timedelta(minutes=10)
-        self._recent_alerts = {
-            k: v for k, v in self._recent_alerts.items() 
-            if v > cutoff
-        }
+        # Expire old entries from the front; insertion order == age order
+        cutoff = now - self._recent_alert_ttl
+        while self._recent_alerts and next(iter(self._recent_alerts.values())) < cutoff:
+            self._recent_alerts.popitem(last=False)
     
     def trigger_alert(self, device, event_type, message):
         """
@@ -359,10 +718,14 @@ This is an automated message from Network Monitor.
         # Immediately mark as sent to prevent race conditions
         self._mark_alert_sent(device_id, event_type)
         
+        # Snapshot settings once; everything below reads from this dict
+        settings = self._get_settings()
+        enabled = self._enabled_settings
+        
         # Check if alerts are enabled for this event type
-        alert_on_down = self._get_setting('alert_on_down', 'true').lower() == 'true'
-        alert_on_recovery = self._get_setting('alert_on_recovery', 'true').lower() == 'true'
-        alert_on_ssl = self._get_setting('alert_on_ssl_expiry', 'true').lower() == 'true'
+        alert_on_down = str(settings.get('alert_on_down', 'true')).lower() == 'true'
+        alert_on_recovery = str(settings.get('alert_on_recovery', 'true')).lower() == 'true'
+        alert_on_ssl = str(settings.get('alert_on_ssl_expiry', 'true')).lower() == 'true'
         
         if event_type == 'down' and not alert_on_down:
             return
@@ -403,10 +766,10 @@ This is an automated message from Network Monitor.
         assigned_telegram_ids = recipients.get('telegram_ids') or []
         
         # Get global recipients from settings
-        global_emails_str = self._get_setting('email_recipient', '').strip()
+        global_emails_str = (settings.get('email_recipient') or '').strip()
         global_emails = [r.strip() for r in global_emails_str.split(',') if r.strip()]
         
-        global_telegram_str = self._get_setting('telegram_chat_id', '').strip()
+        global_telegram_str = (settings.get('telegram_chat_id') or '').strip()
         global_telegram_ids = [r.strip() for r in global_telegram_str.split(',') if r.strip()]
         
         # Merge lists (using set to avoid duplicates if a user is in both)
@@ -415,51 +778,39 @@ This is an automated message from Network Monitor.
         
         sent_any = False
         
-        # Send via Email
-        if self.is_enabled('email'):
-            result = self.send_email(subject, full_message, recipient=target_emails)
-            self.db.log_alert(
-                device_id, event_type, message, 'email',
-                'sent' if result['success'] else 'failed',
-                result.get('error')
-            )
-            if result['success']:
-                sent_any = True
-                recipient_info = f"{len(target_emails)} recipients" if target_emails else "global"
-                print(f"[Alert] Email sent for {device_name}: {event_type} (to {recipient_info})")
-            else:
-                print(f"[Alert] Email failed for {device_name}: {result.get('error')}")
-        
-        # Send via LINE Notify (DEPRECATED)
-        if self.is_enabled('line'):
-            line_message = f"{subject}\n\n{full_message}"
-            result = self.send_line_notify(line_message)
-            self.db.log_alert(
-                device_id, event_type, message, 'line',
-                'sent' if result['success'] else 'failed',
-                result.get('error')
-            )
-            if result['success']:
-                sent_any = True
-                print(f"[Alert] LINE sent for {device_name}: {event_type}")
-            else:
-                print(f"[Alert] LINE failed for {device_name}: {result.get('error')}")
+        # (channel, label, recipient info, send callable) for every enabled channel
+        channel_sends = []
+        if 'email_enabled' in enabled:
+            channel_sends.append((
+                'email', 'Email',
+                f"{len(target_emails)} recipients" if target_emails else "global",
+                lambda: self.send_email(subject, full_message, recipient=target_emails)
+            ))
+        if 'telegram_enabled' in enabled:
+            channel_sends.append((
+                'telegram', 'Telegram',
+                f"{len(target_telegram_ids)} chat(s)" if target_telegram_ids else "global",
+                lambda: self.send_telegram(f"{subject}\n\n{full_message}", recipient=target_telegram_ids)
+            ))
         
-        # Send via Telegram
-        if self.is_enabled('telegram'):
-            telegram_message = f"{subject}\n\n{full_message}"
-            result = self.send_telegram(telegram_message, recipient=target_telegram_ids)
-            self.db.log_alert(
-                device_id, event_type, message, 'telegram',
-                'sent' if result['success'] else 'failed',
+        futures = {self._exec.submit(send): (channel, label, info) for channel, label, info, send in channel_sends}
+        for future in as_completed(futures):
+            channel, label, recipient_info = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            self._queue_alert_log(
+                device_id, event_type, message, channel,
+                _delivery_status(result),
                 result.get('error')
             )
             if result['success']:
                 sent_any = True
-                recipient_info = f"{len(target_telegram_ids)} chat(s)" if target_telegram_ids else "global"
-                print(f"[Alert] Telegram sent for {device_name}: {event_type} (to {recipient_info})")
+                suffix = f" (to {recipient_info})" if recipient_info else ""
+                print(f"[Alert] {label} sent for {device_name}: {event_type}{suffix}")
             else:
-                print(f"[Alert] Telegram failed for {device_name}: {result.get('error')}")
+                print(f"[Alert] {label} failed for {device_name}: {result.get('error')}")
 
         integration_result = self._send_integration_plugins(
             subject=subject,
@@ -491,17 +842,10 @@ This is an automated message from Network Monitor.
         escalation_email = self._get_setting('escalation_email_recipient', '')
         escalation_telegram = self._get_setting('escalation_telegram_chat_id', '')
         
-        # Force cache refresh so we can modify it below safely
-        self._get_settings()
-        
+        # Escalation recipients are passed explicitly; the shared settings cache is never modified
         # Send via email
         if self._get_setting('escalation_channel_email', 'false').lower() == 'true' and escalation_email:
-            original_recipient = self._settings_cache.get('email_recipient', '')
-            self._settings_cache['email_recipient'] = escalation_email
-            
-            result = self.send_email(subject, full_message)
-            
-            self._settings_cache['email_recipient'] = original_recipient
+            result = self.send_email(subject, full_message, recipient=escalation_email)
             
             self.db.log_alert(
                 device_id, 'escalation', f"Down for {downtime_minutes}m", 'email',
@@ -516,17 +860,12 @@ This is an automated message from Network Monitor.
 
         # Send via Telegram
         if self._get_setting('escalation_channel_telegram', 'false').lower() == 'true' and escalation_telegram:
-            original_chat_id = self._settings_cache.get('telegram_chat_id', '')
-            self._settings_cache['telegram_chat_id'] = escalation_telegram
-            
             telegram_message = f"{subject}\n\n{full_message}"
-            result = self.send_telegram(telegram_message)
-            
-            self._settings_cache['telegram_chat_id'] = original_chat_id
+            result = self.send_telegram(telegram_message, recipient=escalation_telegram)
             
             self.db.log_alert(
                 device_id, 'escalation', f"Down for {downtime_minutes}m", 'telegram',
-                'sent' if result['success'] else 'failed',
+                _delivery_status(result),
                 result.get('error')
             )
             if result['success']:
@@ -559,13 +898,9 @@ This is an automated message from Network Monitor.
         sent_any = False
         escalation_email = self._get_setting('escalation_email_recipient', '')
         escalation_telegram = self._get_setting('escalation_telegram_chat_id', '')
-        self._get_settings()
 
         if self._get_setting('escalation_channel_email', 'false').lower() == 'true' and escalation_email:
-            original = self._settings_cache.get('email_recipient', '')
-            self._settings_cache['email_recipient'] = escalation_email
-            result = self.send_email(subject, message)
-            self._settings_cache['email_recipient'] = original
+            result = self.send_email(subject, message, recipient=escalation_email)
             self.db.log_alert(
                 device_id, 'resource_escalation', detail, 'email',
                 'sent' if result['success'] else 'failed', result.get('error')
@@ -573,13 +908,10 @@ This is an automated message from Network Monitor.
             sent_any = sent_any or result['success']
 
         if self._get_setting('escalation_channel_telegram', 'false').lower() == 'true' and escalation_telegram:
-            original = self._settings_cache.get('telegram_chat_id', '')
-            self._settings_cache['telegram_chat_id'] = escalation_telegram
-            result = self.send_telegram(f"{subject}\n\n{message}")
-            self._settings_cache['telegram_chat_id'] = original
+            result = self.send_telegram(f"{subject}\n\n{message}", recipient=escalation_telegram)
             self.db.log_alert(
                 device_id, 'resource_escalation', detail, 'telegram',
-                'sent' if result['success'] else 'failed', result.get('error')
+                _delivery_status(result), result.get('error')
             )
             sent_any = sent_any or result['success']
 
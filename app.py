@@ -7,6 +7,11 @@ async_runtime.monkey_patch(all=True)
 
 import asyncio
 import sys
+if __name__ == '__main__':
+    # `python app.py` loads this file as __main__; alias it so a later
+    # `import app` reuses this module instead of building a second set of
+    # services (database pool, scheduler, Telegram polling, ...)
+    sys.modules.setdefault('app', sys.modules[__name__])
 if sys.platform == 'win32':
     # Force SelectorEventLoop so asyncio uses select(), which eventlet monkey-patches.
     # This prevents PySNMP (which uses asyncio) from deadlocking the server on Windows.
@@ -28,11 +33,13 @@ from snmp_trap_receiver import SnmpTrapReceiver
 from syslog_receiver import SyslogReceiver
 from plugin_manager import PluginManager
 from config import Config
+import json_codec
 import atexit
 import os
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = json_codec.OrjsonProvider(app)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
 app.config['UPLOAD_FOLDER'] = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload
@@ -44,7 +51,7 @@ if Config.CORS_ALLOWED_ORIGINS:
     CORS(app, resources={r"/api/*": {"origins": Config.CORS_ALLOWED_ORIGINS}})
 
 # Initialize SocketIO
-socketio_kwargs = {'async_mode': Config.SOCKETIO_ASYNC_MODE}
+socketio_kwargs = {'async_mode': Config.SOCKETIO_ASYNC_MODE, 'json': json_codec}
 if Config.SOCKETIO_CORS_ALLOWED_ORIGINS:
     socketio_kwargs['cors_allowed_origins'] = Config.SOCKETIO_CORS_ALLOWED_ORIGINS
 socketio = SocketIO(app, **socketio_kwargs)
@@ -95,6 +102,12 @@ app.config['PLUGIN_MANAGER'] = plugin_manager
 # ============================================================================
 
 from routes import ALL_BLUEPRINTS
+from routes.http_cache import TTLCache
+from routes.devices import get_statistics_cached, invalidate_device_caches
+
+# Snapshot sent to newly connected clients; shared by bursts of connects
+# and dropped after every sweep
+_connect_snapshot_cache = TTLCache(ttl=5, maxsize=1)
 
 for bp in ALL_BLUEPRINTS:
     app.register_blueprint(bp)
@@ -145,10 +158,16 @@ def monitor_devices():
     print(f"Running scheduled device check (workers={monitor.max_workers})...")
     results = monitor.check_all_devices()
     
-    for result in results:
-        socketio.emit('status_update', result, namespace='/')
+    # One frame for the whole sweep instead of one per device
+    socketio.emit('status_update_bulk', results, namespace='/')
+    # Pages that reload everything on an update only need to hear about status flips
+    changed = monitor.status_changes(results)
+    if changed:
+        socketio.emit('status_changed', changed, namespace='/')
     
-    stats = monitor.get_statistics()
+    invalidate_device_caches()
+    _connect_snapshot_cache.clear()
+    stats = get_statistics_cached(monitor)
     socketio.emit('statistics_update', stats, namespace='/')
     return results
 
@@ -331,21 +350,35 @@ task_scheduler.add_task('cleanup', 'Data Cleanup', scheduled_data_cleanup,
 
 # Service Manager — centralized lifecycle management
 manager = ServiceManager()
+# Services stop in reverse order: the DB pool goes last, after the alerter has
+# flushed its buffered alert log rows and everything that can raise alerts has stopped
+manager.register('db_pool', db, stop_fn='close_pool')
+manager.register('alerter', alerter, stop_fn='close')
 manager.register('task_scheduler', task_scheduler, start_fn='start', stop_fn='shutdown')
 manager.register('telegram_bot', telegram_bot, start_fn='start_polling', stop_fn='stop_polling')
 # manager.register('trap_receiver', trap_receiver, start_fn='start', stop_fn='stop')
 manager.register('syslog_receiver', syslog_receiver, start_fn='start', stop_fn='stop')
-manager.register('db_pool', db, stop_fn='close_pool')
-
-# Start all services
-manager.start_all()
 
 # Store for API access
 app.config['SERVICE_MANAGER'] = manager
 app.config['TASK_SCHEDULER'] = task_scheduler
 
-# Shutdown hook
-atexit.register(lambda: manager.stop_all())
+_services_started = False
+
+
+def start_services():
+    """
+    Start the scheduler, bot polling and receivers (once per process).
+    Called by the server entry points, so importing this module for tests or
+    scripts does not spin up background services.
+    """
+    global _services_started
+    if _services_started:
+        return
+    _services_started = True
+    manager.start_all()
+    # Shutdown hook
+    atexit.register(lambda: manager.stop_all())
 
 # ============================================================================
 # Service & Task Management API
@@ -396,31 +429,17 @@ def api_tasks_history():
 # WebSocket Events
 # ============================================================================
 
+def _build_status_snapshot():
+    """Compact per-device status list for the initial client sync"""
+    return db.get_device_status_snapshot()
+
 @socketio.on('connect')
 def handle_connect():
     """Handle client connection"""
     print('Client connected')
-    stats = monitor.get_statistics()
+    stats = get_statistics_cached(monitor)
     emit('statistics_update', stats)
-    
-    devices = db.get_all_devices()
-    for device in devices:
-        # Convert datetime to string for JSON serialization
-        last_check_val = device.get('last_check')
-        if hasattr(last_check_val, 'isoformat'):
-            last_check_val = last_check_val.isoformat()
-            
-        emit('status_update', {
-            'id': device['id'],
-            'name': device['name'],
-            'ip_address': device['ip_address'],
-            'device_type': device.get('device_type'),
-            'monitor_type': device.get('monitor_type', 'ping'),
-            'status': device['status'],
-            'response_time': device['response_time'],
-            'http_status_code': device.get('http_status_code'),
-            'last_check': last_check_val
-        })
+    emit('status_update_bulk', _connect_snapshot_cache.get_or_compute((), _build_status_snapshot))
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -431,7 +450,9 @@ def handle_disconnect():
 def handle_request_status():
     """Handle request for immediate status check"""
     print('Status check requested')
-    monitor_devices()
+    # Run the sweep as a hub task so this handler returns immediately;
+    # results reach every client through the usual bulk emit
+    socketio.start_background_task(monitor_devices)
 
 # ============================================================================
 # Main
@@ -450,6 +471,7 @@ if __name__ == '__main__':
     print(f"WSGI: {async_runtime.RUNTIME_LABEL}")
     print("=" * 60)
     
+    start_services()
     socketio.run(app, debug=Config.DEBUG, host=Config.SERVER_HOST,
                  port=Config.SERVER_PORT, use_reloader=False, log_output=True)
 
@@ -1004,7 +1004,21 @@ class AssistantService:
         if filters.get("device_type"):
             rows = [row for row in rows if filters["device_type"] in self._normalize(row.get("device_type") or "")]
 
-        with_data = [row for row in rows if row.get("uptime_percent") is not None]
+        # One pass for the counts, the uptime total and the breached rows
+        with_data = met = 0
+        uptime_total = 0.0
+        breached = []
+        for row in rows:
+            uptime = row.get("uptime_percent")
+            if uptime is None:
+                continue
+            with_data += 1
+            uptime_total += uptime
+            status = row.get("sla_status")
+            if status == "met":
+                met += 1
+            elif status == "breached":
+                breached.append(row)
         if not with_data:
             return self._response(
                 "sla_summary",
@@ -1012,13 +1026,11 @@ class AssistantService:
                 ["status_history"],
             )
 
-        met = [row for row in with_data if row.get("sla_status") == "met"]
-        breached = [row for row in with_data if row.get("sla_status") == "breached"]
-        average = round(sum(row.get("uptime_percent", 0) for row in with_data) / len(with_data), 4)
+        average = round(uptime_total / with_data, 4)
         answer = self._locale_text(
-            f"SLA \u0e22\u0e49\u0e2d\u0e19\u0e2b\u0e25\u0e31\u0e07 30 \u0e27\u0e31\u0e19: \u0e21\u0e35\u0e02\u0e49\u0e2d\u0e21\u0e39\u0e25 {len(with_data)} \u0e2d\u0e38\u0e1b\u0e01\u0e23\u0e13\u0e4c, "
-            f"\u0e1c\u0e48\u0e32\u0e19\u0e40\u0e1b\u0e49\u0e32\u0e2b\u0e21\u0e32\u0e22 {len(met)}, \u0e44\u0e21\u0e48\u0e1c\u0e48\u0e32\u0e19 {len(breached)}, uptime \u0e40\u0e09\u0e25\u0e35\u0e48\u0e22 {average}%",
-            f"SLA last 30 days: {len(with_data)} device(s) with data, {len(met)} met target, {len(breached)} breached, average uptime {average}%.",
+            f"SLA \u0e22\u0e49\u0e2d\u0e19\u0e2b\u0e25\u0e31\u0e07 30 \u0e27\u0e31\u0e19: \u0e21\u0e35\u0e02\u0e49\u0e2d\u0e21\u0e39\u0e25 {with_data} \u0e2d\u0e38\u0e1b\u0e01\u0e23\u0e13\u0e4c, "
+            f"\u0e1c\u0e48\u0e32\u0e19\u0e40\u0e1b\u0e49\u0e32\u0e2b\u0e21\u0e32\u0e22 {met}, \u0e44\u0e21\u0e48\u0e1c\u0e48\u0e32\u0e19 {len(breached)}, uptime \u0e40\u0e09\u0e25\u0e35\u0e48\u0e22 {average}%",
+            f"SLA last 30 days: {with_data} device(s) with data, {met} met target, {len(breached)} breached, average uptime {average}%.",
         )
         if breached:
             answer += self._locale_text(" \u0e15\u0e31\u0e27\u0e2d\u0e22\u0e48\u0e32\u0e07\u0e17\u0e35\u0e48\u0e44\u0e21\u0e48\u0e1c\u0e48\u0e32\u0e19: ", " Breached examples: ") + ", ".join(
@@ -1,14 +1,16 @@
 
 from app import app
-from database import Database
-import json
 import unittest
 
 class APITest(unittest.TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
+        # One client for the class; reuse the app's Database (and its pool)
+        # instead of opening a second one per test. Importing app does not
+        # start the scheduler or bot polling (see app.start_services)
         app.config['TESTING'] = True
-        self.client = app.test_client()
-        self.db = Database()
+        cls.client = app.test_client()
+        cls.db = app.config['DB']
 
     def login(self, username, password):
         return self.client.post('/login', data=dict(
@@ -33,12 +35,10 @@ class APITest(unittest.TestCase):
             "layout_config": [{"type": "test"}],
             "is_public": 1
         }
-        resp = self.client.post('/api/dashboards', 
-                        data=json.dumps(payload), 
-                        content_type='application/json')
+        resp = self.client.post('/api/dashboards', json=payload)
 
         self.assertEqual(resp.status_code, 200)
-        data = json.loads(resp.data)
+        data = resp.get_json()
         self.assertTrue(data['success'])
         print(f"[PASS] Create dashboard: ID {data['id']}")
         dash_id = data['id']
@@ -46,7 +46,7 @@ class APITest(unittest.TestCase):
         # 3. Get Dashboards
         resp = self.client.get('/api/dashboards')
         self.assertEqual(resp.status_code, 200)
-        data = json.loads(resp.data)
+        data = resp.get_json()
         found = False
         for d in data:
             if d['id'] == dash_id:
@@ -58,14 +58,14 @@ class APITest(unittest.TestCase):
         # 4. Get Single Dashboard
         resp = self.client.get(f'/api/dashboards/{dash_id}')
         self.assertEqual(resp.status_code, 200)
-        data = json.loads(resp.data)
+        data = resp.get_json()
         self.assertEqual(data['name'], "API Test Dashboard")
         print("[PASS] Get single dashboard")
 
         # 5. Delete Dashboard
         resp = self.client.delete(f'/api/dashboards/{dash_id}')
         self.assertEqual(resp.status_code, 200)
-        data = json.loads(resp.data)
+        data = resp.get_json()
         self.assertTrue(data['success'])
         print("[PASS] Delete dashboard")
 
@@ -1,45 +1,107 @@
 import sqlite3
 import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 db_path = 'network_monitor.db'
 
-def get_table_sizes():
+def count_rows_parallel(names, workers):
+    """
+    Exact COUNT(*) per table on a pool of reader connections, one per thread.
+    sqlite3 releases the GIL while a statement runs and WAL lets readers run
+    side by side, so wall time follows the largest table rather than the sum.
+    """
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def count(name):
+        conn = getattr(local, 'conn', None)
+        if conn is None:
+            conn = local.conn = sqlite3.connect(db_path, check_same_thread=False)
+            with lock:
+                connections.append(conn)
+        try:
+            return name, conn.execute("SELECT COUNT(*) FROM \"{}\"".format(name.replace('"', '""'))).fetchone()[0]
+        except Exception as e:
+            return name, e
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(pool.map(count, names))
+    finally:
+        for conn in connections:
+            conn.close()
+
+def get_table_sizes(exact=True, workers=0):
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
-    
-    # Get all tables
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = [row[0] for row in cursor.fetchall()]
-    
-    print(f"{'Table Name':<20} | {'Row Count':>15}")
-    print("-" * 38)
-    
-    for table in tables:
+
+    # sqlite_stat1 only exists once ANALYZE / PRAGMA optimize has run
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+    estimate_sql = ("(SELECT CAST(s.stat AS INTEGER) FROM sqlite_stat1 AS s WHERE s.tbl = m.name LIMIT 1)"
+                    if cursor.fetchone() else "NULL")
+
+    # Schema, index names and planner row estimate for every table in one pass
+    cursor.execute(f"""
+        SELECT m.name, m.sql,
+               (SELECT group_concat(il.name, char(10)) FROM pragma_index_list(m.name) AS il),
+               {estimate_sql}
+        FROM sqlite_master AS m
+        WHERE m.type = 'table'
+    """)
+    tables = cursor.fetchall()
+
+    # Exact row counts: one UNION ALL round-trip, or per table across reader threads
+    counts = {}
+    if tables and exact and workers > 1:
+        counts = count_rows_parallel([name for name, _, _, _ in tables], workers)
+    elif tables and exact:
+        sql = " UNION ALL ".join(
+            "SELECT ? AS name, COUNT(*) AS n FROM \"{}\"".format(name.replace('"', '""'))
+            for name, _, _, _ in tables
+        )
         try:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            count = cursor.fetchone()[0]
-            print(f"{table:<20} | {count:>15,}")
-            
-            # Print schema
-            cursor.execute(f"SELECT sql FROM sqlite_master WHERE name='{table}'")
-            sql = cursor.fetchone()[0]
-            print(f"Schema: {sql}")
-            
-            # Get indexes
-            cursor.execute(f"PRAGMA index_list('{table}')")
-            indexes = cursor.fetchall()
-            if indexes:
-                print("Indexes:")
-                for idx in indexes:
-                    print(f"  - {idx[1]}")
-            print("-" * 38)
+            cursor.execute(sql, [name for name, _, _, _ in tables])
+            counts = dict(cursor.fetchall())
         except Exception as e:
-            print(f"{table:<20} | Error: {e}")
-            
+            # One unreadable table fails the combined query; count the rest individually
+            print(f"Combined row count failed ({e}); counting tables one by one")
+            for name, _, _, _ in tables:
+                try:
+                    cursor.execute("SELECT COUNT(*) FROM \"{}\"".format(name.replace('"', '""')))
+                    counts[name] = cursor.fetchone()[0]
+                except Exception as table_error:
+                    counts[name] = table_error
+
+    print(f"{'Table Name':<20} | {'Row Count':>15} | {'Estimated':>15}")
+    print("-" * 56)
+
+    for table, schema, indexes, estimate in tables:
+        estimate_text = format(estimate, ',') if estimate is not None else '-'
+        count = counts.get(table)
+        if isinstance(count, int):
+            print(f"{table:<20} | {count:>15,} | {estimate_text:>15}")
+        elif exact:
+            print(f"{table:<20} | Error: {count if count is not None else 'not counted'}")
+        else:
+            print(f"{table:<20} | {'-':>15} | {estimate_text:>15}")
+        print(f"Schema: {schema}")
+        if indexes:
+            print("Indexes:")
+            for idx in indexes.split('\n'):
+                print(f"  - {idx}")
+        print("-" * 56)
+
     conn.close()
 
 if __name__ == "__main__":
     if os.path.exists(db_path):
-        get_table_sizes()
+        # --estimate skips the COUNT(*) scans and shows only sqlite_stat1 estimates;
+        # --parallel=N counts tables concurrently on N reader connections
+        args = sys.argv[1:]
+        workers = next((int(arg.split('=', 1)[1]) for arg in args if arg.startswith('--parallel=')), 0)
+        get_table_sizes(exact='--estimate' not in args, workers=workers)
     else:
         print("Database not found.")
@@ -1,9 +1,24 @@
+import json
 import sqlite3
+import sys
+
+# Wireless controllers and APs are stored with one of these device types;
+# filtering on device_type is a seek on idx_devices_type instead of a name scan
+WIRELESS_TYPES = ('wireless', 'wifi')
 
 try:
     conn = sqlite3.connect('network_monitor.db')
     cursor = conn.cursor()
-    cursor.execute("SELECT id, name, ip_address, device_type FROM devices WHERE name LIKE '%WLC%' OR name LIKE '%AP%'")
+    if '--by-name' in sys.argv[1:]:
+        # Legacy match for devices that were added without a wireless type
+        cursor.execute("SELECT id, name, ip_address, device_type FROM devices WHERE name LIKE '%WLC%' OR name LIKE '%AP%'")
+    else:
+        # Whole type list bound as one JSON parameter, same form as Database._in_list
+        cursor.execute(
+            "SELECT id, name, ip_address, device_type FROM devices "
+            "WHERE device_type IN (SELECT value FROM json_each(?))",
+            (json.dumps(WIRELESS_TYPES),)
+        )
     rows = cursor.fetchall()
     for row in rows:
         print(row)
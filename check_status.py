@@ -5,8 +5,13 @@ conn = db.get_connection()
 cursor = conn.cursor()
 
 print("Status distribution in status_history:")
-cursor.execute("SELECT status, COUNT(*) FROM status_history GROUP BY status")
+# Read from the daily rollup (one row per device/day/status) rather than every check
+cursor.execute(
+    "SELECT status, SUM(n) AS n, "
+    "ROUND(100.0 * SUM(n) / SUM(SUM(n)) OVER (), 2) AS pct "
+    "FROM status_history_daily GROUP BY status"
+)
 for row in cursor.fetchall():
-    print(f"{row['status']}: {row[1]}")
+    print(f"{row['status']}: {row['n']} ({row['pct']}%)")
 
 conn.close()
@@ -6,20 +6,37 @@ def get_status_history_info():
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
+    # Table schema plus every index with its column list in one query
+    cursor.execute("""
+        SELECT m.type, m.name, m.sql,
+               (SELECT group_concat(ii.name, ', ') FROM pragma_index_info(m.name) AS ii)
+        FROM sqlite_master AS m
+        WHERE m.tbl_name = 'status_history'
+        ORDER BY m.type DESC, m.name
+    """)
+    rows = cursor.fetchall()
+    
     print("Schema for status_history:")
-    cursor.execute("SELECT sql FROM sqlite_master WHERE name='status_history'")
-    print(cursor.fetchone()[0])
+    for kind, _, sql, _ in rows:
+        if kind == 'table':
+            print(sql)
     
     print("\nIndexes for status_history:")
-    cursor.execute("PRAGMA index_list('status_history')")
-    indexes = cursor.fetchall()
-    for idx in indexes:
-        idx_name = idx[1]
-        print(f"\nIndex: {idx_name}")
-        cursor.execute(f"PRAGMA index_info('{idx_name}')")
-        cols = cursor.fetchall()
-        for col in cols:
-            print(f"  - Column: {col[2]}")
+    for kind, name, _, columns in rows:
+        if kind != 'index':
+            continue
+        print(f"\nIndex: {name}")
+        for col in (columns or '').split(', '):
+            if col:
+                print(f"  - Column: {col}")
+    
+    print("\nQuery plan for latest checks:")
+    cursor.execute("EXPLAIN QUERY PLAN SELECT checked_at, response_time, status "
+                   "FROM status_history ORDER BY checked_at DESC LIMIT 5")
+    plan = ' | '.join(row[-1] for row in cursor.fetchall())
+    print(f"  {plan}")
+    if 'USING COVERING INDEX' not in plan:
+        print("  WARNING: not served by a covering index")
             
     conn.close()
 
@@ -6,7 +6,7 @@ cursor = conn.cursor()
 
 print("Checking 'checked_at' format (last 5 entries):")
 cursor.execute("SELECT checked_at, response_time, status FROM status_history ORDER BY checked_at DESC LIMIT 5")
-for row in cursor.fetchall():
-    print(dict(row))
+for checked_at, response_time, status in cursor.fetchall():
+    print(f"{checked_at} | {status} | {response_time}")
 
 conn.close()
@@ -18,6 +18,16 @@ def _env_list(name, default=''):
     return [item.strip() for item in str(value).split(',') if item.strip()]
 
 
+def _env_dict(name, default):
+    """Overlay comma-separated key=value pairs from the environment onto default."""
+    result = dict(default)
+    for item in _env_list(name):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            result[key.strip()] = value.strip()
+    return result
+
+
 def _load_env_file():
     """Load key=value pairs from a local .env file if present."""
     env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
@@ -58,7 +68,24 @@ class Config:
     # Database settings
     DB_TYPE = os.environ.get('DB_TYPE') or 'postgresql'  # 'sqlite' or 'postgresql'
     DATABASE_PATH = 'network_monitor.db'  # SQLite fallback path
+    SQLITE_POOL_SIZE = int(os.environ.get('SQLITE_POOL_SIZE') or 8)  # idle connections kept open
+    # Parsed statements kept per pooled connection (sqlite3 default is 128)
+    SQLITE_CACHED_STATEMENTS = int(os.environ.get('SQLITE_CACHED_STATEMENTS') or 512)
+    # Applied to every SQLite connection, in order; override with SQLITE_PRAGMAS="cache_size=-32768,..."
+    SQLITE_PRAGMAS = _env_dict('SQLITE_PRAGMAS', {
+        'journal_mode': 'WAL',
+        # WAL keeps the database consistent with NORMAL sync; only the
+        # last commits can be lost on power failure, never corrupted
+        'synchronous': 'NORMAL',
+        'temp_store': 'MEMORY',
+        'mmap_size': '268435456',
+        # Page cache of up to 64 MiB (negative = KiB); grows only as pages are read
+        'cache_size': '-65536',
+        # Checkpoint the WAL back into the database every ~1000 pages (4 MiB)
+        'wal_autocheckpoint': '1000',
+    })
     RETENTION_DAYS = 30 # Keep 30 days of history
+    RETENTION_DELETE_BATCH = int(os.environ.get('RETENTION_DELETE_BATCH') or 5000)  # rows per pruning transaction
     
     # PostgreSQL settings
     PG_HOST = os.environ.get('PG_HOST') or 'localhost'
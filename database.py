@@ -2,11 +2,16 @@
 Database management for Network Monitor
 Supports PostgreSQL (primary) and SQLite (fallback)
 """
+import functools
+import queue
+import random
 import sqlite3
 import hashlib
 import json
 import math
+import time
 from datetime import datetime, timedelta
+from werkzeug.security import check_password_hash, generate_password_hash
 from config import Config
 
 # PostgreSQL support
@@ -19,8 +24,31 @@ try:
 except ImportError:
     PG_AVAILABLE = False
 
+
+def _retry_on_busy(attempts=5, base_delay=0.01):
+    """
+    Retry a write when SQLite reports the database as locked/busy.
+    busy_timeout already waits for the lock, but a read transaction that tries
+    to upgrade to a write while another writer commits fails immediately;
+    retrying with a fresh transaction resolves it. Backoff is exponential with jitter.
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return f(*args, **kwargs)
+                except sqlite3.OperationalError as e:
+                    message = str(e).lower()
+                    if attempt == attempts - 1 or ('locked' not in message and 'busy' not in message):
+                        raise
+                    time.sleep(base_delay * (2 ** attempt) * (1 + random.random()))
+        return wrapper
+    return decorator
+
 class Database:
     _pool = None  # Class-level pool (shared across instances)
+    _USER_ROLES = frozenset({'admin', 'operator', 'viewer'})
     
     def __init__(self, db_path=None):
         self.db_type = Config.DB_TYPE
@@ -48,6 +76,28 @@ class Database:
                 self.db_type = 'sqlite'
                 Database._pool = None
         
+        # SQLite connections are kept open and reused rather than reopened per call
+        self._sqlite_pool = queue.LifoQueue(maxsize=Config.SQLITE_POOL_SIZE)
+        # Bumped on every alert_settings write so in-process caches (Alerter) can tell they are stale
+        self.alert_settings_version = 0
+        
+        # Alert logging is on the alert hot path; build its SQL once
+        self._log_alert_sql = f'''
+            INSERT INTO alert_history (device_id, event_type, message, channel, status, error_message, created_at)
+            VALUES ({self._ph(7)})
+        '''
+        self._status_history_sql = f'''
+            INSERT INTO status_history (device_id, status, response_time, checked_at)
+            VALUES ({self._ph(4)})
+        '''
+        self._status_rollup_sql = f'''
+            INSERT INTO status_history_daily (device_id, day, status, n, sum_rt)
+            VALUES ({self._ph(5)})
+            ON CONFLICT(device_id, day, status) DO UPDATE SET
+                n = status_history_daily.n + excluded.n,
+                sum_rt = COALESCE(status_history_daily.sum_rt, 0) + COALESCE(excluded.sum_rt, 0)
+        '''
+        
         self.init_db()
     
     def get_connection(self):
@@ -68,28 +118,40 @@ class Database:
             conn.autocommit = False
             return conn
         else:
-            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                return self._sqlite_pool.get_nowait()
+            except queue.Empty:
+                pass
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False,
+                                   cached_statements=Config.SQLITE_CACHED_STATEMENTS)
             conn.row_factory = sqlite3.Row
-            conn.execute('PRAGMA journal_mode=WAL')
+            for pragma, value in Config.SQLITE_PRAGMAS.items():
+                conn.execute(f'PRAGMA {pragma}={value}')
             return conn
     
     def release_connection(self, conn):
-        """Return connection to pool (PostgreSQL) or close it (SQLite)"""
+        """Return connection to its pool (closed if the pool is full or it is unusable)"""
         if conn is None:
             return
         if self.db_type == 'postgresql' and Database._pool:
             try:
                 Database._pool.putconn(conn)
+                return
             except Exception:
-                try:
-                    conn.close()
-                except Exception:
-                    pass
-        else:
+                pass
+        elif self.db_type == 'sqlite':
             try:
-                conn.close()
+                # Discard uncommitted work, as closing the connection used to
+                if conn.in_transaction:
+                    conn.rollback()
+                self._sqlite_pool.put_nowait(conn)
+                return
             except Exception:
                 pass
+        try:
+            conn.close()
+        except Exception:
+            pass
     
     def close_pool(self):
         """Close all connections in the pool (call on shutdown)"""
@@ -97,6 +159,30 @@ class Database:
             Database._pool.closeall()
             Database._pool = None
             print("[DB] Connection pool closed")
+        while True:
+            try:
+                self._sqlite_pool.get_nowait().close()
+            except queue.Empty:
+                break
+    
+    def backup_to(self, path, pages=64):
+        """
+        Snapshot the SQLite database to path with the online backup API.
+        Copies pages chunks at a time and yields between them, so the monitor
+        keeps writing while the snapshot runs and the copy is still consistent.
+        """
+        if self.db_type == 'postgresql':
+            return {'success': False, 'error': 'Use pg_dump to back up PostgreSQL'}
+        conn = self.get_connection()
+        target = sqlite3.connect(path)
+        try:
+            conn.backup(target, pages=pages, sleep=0.005)
+            return {'success': True, 'path': path}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+        finally:
+            target.close()
+            self.release_connection(conn)
     
     def _cursor(self, conn):
         """Get appropriate cursor"""
@@ -133,7 +219,17 @@ class Database:
     
     def _rows_to_dicts(self, rows):
         """Convert rows to list of dicts"""
-        return [self._row_to_dict(r) for r in rows]
+        if self.db_type == 'postgresql':
+            return [self._row_to_dict(r) for r in rows]
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return []
+        # sqlite3 returns no datetime objects (no detect_types), so plain rows only
+        # need their column names: look them up once and zip each row tuple
+        keys = rows[0].keys()
+        if 'plugin_config_json' in keys:
+            return [self._row_to_dict(r) for r in rows]
+        return [dict(zip(keys, r)) for r in rows]
     
     def _ph(self, count=1):
         """Get placeholder(s) for parameterized queries"""
@@ -142,6 +238,17 @@ class Database:
             return ph
         return ', '.join([ph] * count)
 
+    def _in_list(self, column, values):
+        """
+        "column IN (...)" condition bound to a single parameter.
+        The SQL text is the same for any number of values, and long lists
+        don't run into SQLite's bound-variable limit.
+        Returns: (sql, param)
+        """
+        if self.db_type == 'postgresql':
+            return f'{column} = ANY({self._ph()})', list(values)
+        return f'{column} IN (SELECT value FROM json_each({self._ph()}))', json.dumps(list(values))
+    
     def _safe_rollback(self, conn):
         """Rollback only when the current connection is still usable."""
         if conn is None:
@@ -153,23 +260,73 @@ class Database:
         except Exception:
             pass
 
-    def _add_column_if_missing(self, conn, cursor, table_name, col_name, col_type):
-        """Run idempotent ADD COLUMN migrations without crashing on closed connections."""
+    def _add_missing_columns(self, conn, cursor, table_name, columns):
+        """
+        Idempotent ADD COLUMN migration for [(col_name, col_type), ...] in one transaction
+        SQLite reads the table's columns once and only alters for the missing ones;
+        PostgreSQL adds them all in a single ALTER TABLE ... ADD COLUMN IF NOT EXISTS.
+        Returns False if the migration failed (it is rolled back and retried on the next start).
+        """
         try:
             if self.db_type == 'postgresql':
                 self._safe_rollback(conn)
-                cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS {col_name} {col_type}')
+                cursor.execute(f'ALTER TABLE {table_name} ' + ', '.join(
+                    f'ADD COLUMN IF NOT EXISTS {col_name} {col_type}' for col_name, col_type in columns))
                 conn.commit()
-            else:
+                return True
+            cursor.execute(f'PRAGMA table_info({table_name})')
+            existing = {row[1] for row in cursor.fetchall()}
+            missing = [(col_name, col_type) for col_name, col_type in columns if col_name not in existing]
+            if not missing:
+                return True
+            if not conn.in_transaction:
+                cursor.execute('BEGIN')
+            for col_name, col_type in missing:
                 cursor.execute(f'ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type}')
-        except Exception:
+            conn.commit()
+            return True
+        except Exception as e:
             self._safe_rollback(conn)
+            print(f"[DB] Column migration for {table_name} failed: {e}")
+            return False
 
+    # Stored in SQLite's PRAGMA user_version once init_db has run; bump it whenever
+    # _create_schema changes (tables, columns, indexes or seed rows)
+    SCHEMA_VERSION = 1
+    
     def init_db(self):
         """Initialize database tables"""
         conn = self.get_connection()
         cursor = self._cursor(conn)
         
+        # An SQLite file already at this schema version skips the table/column probing
+        schema_current = False
+        if self.db_type == 'sqlite':
+            cursor.execute('PRAGMA user_version')
+            schema_current = cursor.fetchone()[0] == self.SCHEMA_VERSION
+        
+        # The version is only recorded once every migration succeeded, so a failed one is retried
+        if not schema_current and self._create_schema(conn, cursor) and self.db_type == 'sqlite':
+            cursor.execute(f'PRAGMA user_version = {int(self.SCHEMA_VERSION)}')
+        
+        # Refresh planner statistics so the history/SLA queries pick the indexes
+        try:
+            if self.db_type == 'postgresql':
+                cursor.execute('ANALYZE status_history')
+            else:
+                # Only re-analyzes tables whose statistics are missing or stale
+                cursor.execute('PRAGMA optimize')
+            conn.commit()
+        except Exception as e:
+            self._safe_rollback(conn)
+            print(f"[DB] Planner statistics refresh skipped: {e}")
+        self.release_connection(conn)
+    
+    def _create_schema(self, conn, cursor):
+        """
+        Create tables and indexes, apply column migrations and seed default rows
+        Returns False if any column migration failed.
+        """
         # Use appropriate syntax
         serial_type = 'SERIAL' if self.db_type == 'postgresql' else 'INTEGER'
         autoincrement = '' if self.db_type == 'postgresql' else 'AUTOINCREMENT'
@@ -178,6 +335,8 @@ class Database:
         bool_default_true = 'TRUE' if self.db_type == 'postgresql' else '1'
         bool_default_false = 'FALSE' if self.db_type == 'postgresql' else '0'
         timestamp_default = 'CURRENT_TIMESTAMP'
+        ph = self._ph()
+        migrations_ok = True
         
         # Devices table
         cursor.execute(f'''
@@ -249,47 +408,24 @@ class Database:
             )
         ''')
         
-        # Migration: Add SNMP v3 columns to existing devices table
-        snmp_v3_columns = [
+        # Migration: columns added to devices after the first release
+        migrations_ok &= self._add_missing_columns(conn, cursor, 'devices', [
+            # SNMP v3
             ('snmp_v3_username', 'TEXT'),
             ('snmp_v3_auth_protocol', "TEXT DEFAULT 'SHA'"),
             ('snmp_v3_auth_password', 'TEXT'),
             ('snmp_v3_priv_protocol', "TEXT DEFAULT 'AES128'"),
             ('snmp_v3_priv_password', 'TEXT'),
-        ]
-        for col_name, col_type in snmp_v3_columns:
-            self._add_column_if_missing(conn, cursor, 'devices', col_name, col_type)
-        
-        # Migration: Add latitude and longitude columns to existing devices table
-        location_columns = [
+            # Map location
             ('latitude', 'REAL'),
             ('longitude', 'REAL'),
-        ]
-        for col_name, col_type in location_columns:
-            self._add_column_if_missing(conn, cursor, 'devices', col_name, col_type)
-
-        # Migration: Add escalation columns
-        escalation_columns = [
+            # Escalation
             ('last_status_change', 'TIMESTAMP'),
             ('escalation_level', 'INTEGER DEFAULT 0'),
-        ]
-        for col_name, col_type in escalation_columns:
-            self._add_column_if_missing(conn, cursor, 'devices', col_name, col_type)
-        
-        # Migration: Add is_enabled column to existing devices table
-        self._add_column_if_missing(conn, cursor, 'devices', 'is_enabled', f'{bool_type} DEFAULT {bool_default_true}')
-        
-        # Migration: Add parent_device_id column for Alert Dependencies
-        self._add_column_if_missing(
-            conn,
-            cursor,
-            'devices',
-            'parent_device_id',
-            'INTEGER REFERENCES devices(id) ON DELETE SET NULL'
-        )
-        
-        # Migration: Add SSH/WMI and Metrics columns
-        metrics_columns = [
+            ('is_enabled', f'{bool_type} DEFAULT {bool_default_true}'),
+            # Alert dependencies
+            ('parent_device_id', 'INTEGER REFERENCES devices(id) ON DELETE SET NULL'),
+            # SSH/WMI and metrics
             ('ssh_username', 'TEXT'),
             ('ssh_password', 'TEXT'),
             ('ssh_port', 'INTEGER DEFAULT 22'),
@@ -323,9 +459,7 @@ class Database:
             ('disk_details_json', 'TEXT'),
             ('service_status_json', 'TEXT'),
             ('service_summary_json', 'TEXT'),
-        ]
-        for col_name, col_type in metrics_columns:
-            self._add_column_if_missing(conn, cursor, 'devices', col_name, col_type)
+        ])
         
         # Default Alert Escalation Settings Let's ensure these exist 
         default_escalation_settings = {
@@ -374,6 +508,31 @@ class Database:
             )
         ''')
         
+        # Per-device daily check counts by status, kept current on every history insert
+        # so status breakdowns read ~1 row per device/day instead of every check
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS status_history_daily (
+                device_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                status TEXT NOT NULL,
+                n INTEGER NOT NULL DEFAULT 0,
+                sum_rt REAL,
+                PRIMARY KEY (device_id, day, status)
+            ){'' if self.db_type == 'postgresql' else ' WITHOUT ROWID'}
+        ''')
+        cursor.execute('SELECT 1 FROM status_history_daily LIMIT 1')
+        if cursor.fetchone() is None:
+            # One-time backfill for history recorded before the rollup existed
+            day_expr = ("to_char(checked_at, 'YYYY-MM-DD')" if self.db_type == 'postgresql'
+                        else 'substr(checked_at, 1, 10)')
+            cursor.execute(f'''
+                INSERT INTO status_history_daily (device_id, day, status, n, sum_rt)
+                SELECT device_id, {day_expr}, status, COUNT(*), SUM(response_time)
+                FROM status_history
+                WHERE device_id IS NOT NULL AND status IS NOT NULL AND checked_at IS NOT NULL
+                GROUP BY device_id, {day_expr}, status
+            ''')
+        
         # Alert settings table
         cursor.execute(f'''
             CREATE TABLE IF NOT EXISTS alert_settings (
@@ -557,75 +716,21 @@ class Database:
         # Commit baseline schema before PostgreSQL migration blocks that may rollback.
         conn.commit()
 
-        # Migration: Add telegram_chat_id to users table
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS telegram_chat_id TEXT")
-                conn.commit()
-            else:
-                cursor.execute("ALTER TABLE users ADD COLUMN telegram_chat_id TEXT")
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
-
-        # Migration: Add incident owner columns
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute("ALTER TABLE incident_states ADD COLUMN IF NOT EXISTS owner_user_id INTEGER REFERENCES users(id)")
-                cursor.execute("ALTER TABLE incident_states ADD COLUMN IF NOT EXISTS owner_username TEXT")
-                conn.commit()
-            else:
-                cursor.execute("ALTER TABLE incident_states ADD COLUMN owner_user_id INTEGER")
-                cursor.execute("ALTER TABLE incident_states ADD COLUMN owner_username TEXT")
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
-
-        # Migration: Add anomaly owner columns
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute("ALTER TABLE anomaly_states ADD COLUMN IF NOT EXISTS owner_user_id INTEGER REFERENCES users(id)")
-                cursor.execute("ALTER TABLE anomaly_states ADD COLUMN IF NOT EXISTS owner_username TEXT")
-                conn.commit()
-            else:
-                cursor.execute("ALTER TABLE anomaly_states ADD COLUMN owner_user_id INTEGER")
-                cursor.execute("ALTER TABLE anomaly_states ADD COLUMN owner_username TEXT")
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
-
-        # Migration: Add auth_type column to users table
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS auth_type TEXT DEFAULT 'local'")
-                conn.commit()
-            else:
-                cursor.execute("ALTER TABLE users ADD COLUMN auth_type TEXT DEFAULT 'local'")
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
-            # Column likely exists
-
-        # Migration: Add MFA columns to users table
-        mfa_columns = [
+        # Migration: users columns (Telegram, auth type, MFA)
+        migrations_ok &= self._add_missing_columns(conn, cursor, 'users', [
+            ('telegram_chat_id', 'TEXT'),
+            ('auth_type', "TEXT DEFAULT 'local'"),
             ('mfa_secret', 'TEXT'),
             ('mfa_enabled', f'{bool_type} DEFAULT {bool_default_false}'),
+        ])
+
+        # Migration: incident and anomaly owner columns
+        owner_columns = [
+            ('owner_user_id', 'INTEGER REFERENCES users(id)' if self.db_type == 'postgresql' else 'INTEGER'),
+            ('owner_username', 'TEXT'),
         ]
-        for col_name, col_type in mfa_columns:
-            try:
-                if self.db_type == 'postgresql':
-                    self._safe_rollback(conn)
-                    cursor.execute(f'ALTER TABLE users ADD COLUMN IF NOT EXISTS {col_name} {col_type}')
-                    conn.commit()
-                else:
-                    cursor.execute(f'ALTER TABLE users ADD COLUMN {col_name} {col_type}')
-            except Exception:
-                self._safe_rollback(conn)
-                # Column already exists — ignore
+        migrations_ok &= self._add_missing_columns(conn, cursor, 'incident_states', owner_columns)
+        migrations_ok &= self._add_missing_columns(conn, cursor, 'anomaly_states', owner_columns)
 
         # Dashboards table
         cursor.execute(f'''
@@ -644,17 +749,7 @@ class Database:
         ''')
         
         # Migration: Add display_order to dashboards if missing
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute('ALTER TABLE dashboards ADD COLUMN IF NOT EXISTS display_order INTEGER DEFAULT 0')
-                conn.commit()
-            else:
-                cursor.execute('ALTER TABLE dashboards ADD COLUMN display_order INTEGER DEFAULT 0')
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
-            # Column likely exists
+        migrations_ok &= self._add_missing_columns(conn, cursor, 'dashboards', [('display_order', 'INTEGER DEFAULT 0')])
         
         # Dashboard Templates table
         cursor.execute(f'''
@@ -690,29 +785,11 @@ class Database:
             )
         ''')
 
-        # Migration: Add theme_mode
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute("ALTER TABLE sub_topologies ADD COLUMN IF NOT EXISTS theme_mode TEXT DEFAULT 'standard'")
-                conn.commit()
-            else:
-                cursor.execute("ALTER TABLE sub_topologies ADD COLUMN theme_mode TEXT DEFAULT 'standard'")
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
-
-        # Migration: Add decorations
-        try:
-            if self.db_type == 'postgresql':
-                self._safe_rollback(conn)
-                cursor.execute("ALTER TABLE sub_topologies ADD COLUMN IF NOT EXISTS decorations TEXT")
-                conn.commit()
-            else:
-                cursor.execute("ALTER TABLE sub_topologies ADD COLUMN decorations TEXT")
-                conn.commit()
-        except Exception:
-            self._safe_rollback(conn)
+        # Migration: sub-topology theme and decorations
+        migrations_ok &= self._add_missing_columns(conn, cursor, 'sub_topologies', [
+            ('theme_mode', "TEXT DEFAULT 'standard'"),
+            ('decorations', 'TEXT'),
+        ])
 
         # LDAP settings table
         cursor.execute(f'''
@@ -909,34 +986,24 @@ class Database:
             )
         ''')
         
-        # Create default users if not exists
-        from werkzeug.security import generate_password_hash
-        
-        ph = self._ph()
-        
-        # Default admin user (password: admin)
-        cursor.execute(f'SELECT id FROM users WHERE username = {ph}', ('admin',))
-        if not cursor.fetchone():
-            cursor.execute(f'''
-                INSERT INTO users (username, password_hash, role, display_name)
-                VALUES ({self._ph(4)})
-            ''', ('admin', generate_password_hash('admin'), 'admin', 'Administrator'))
-        
-        # Default operator user (password: operator)
-        cursor.execute(f'SELECT id FROM users WHERE username = {ph}', ('operator',))
-        if not cursor.fetchone():
-            cursor.execute(f'''
-                INSERT INTO users (username, password_hash, role, display_name)
-                VALUES ({self._ph(4)})
-            ''', ('operator', generate_password_hash('operator'), 'operator', 'Operator User'))
-        
-        # Default viewer user (password: viewer)
-        cursor.execute(f'SELECT id FROM users WHERE username = {ph}', ('viewer',))
-        if not cursor.fetchone():
-            cursor.execute(f'''
+        # Create default users if not exists (passwords match the usernames)
+        default_users = [
+            ('admin', 'admin', 'Administrator'),
+            ('operator', 'operator', 'Operator User'),
+            ('viewer', 'viewer', 'Viewer User'),
+        ]
+        # One lookup for all of them; password hashing is deliberately slow, so only hash the missing ones
+        in_sql, in_param = self._in_list('username', [username for username, _, _ in default_users])
+        cursor.execute(f'SELECT username FROM users WHERE {in_sql}', (in_param,))
+        existing = {row['username'] for row in cursor.fetchall()}
+        missing = [(username, generate_password_hash(username), role, display_name)
+                   for username, role, display_name in default_users if username not in existing]
+        if missing:
+            cursor.executemany(f'''
                 INSERT INTO users (username, password_hash, role, display_name)
                 VALUES ({self._ph(4)})
-            ''', ('viewer', generate_password_hash('viewer'), 'viewer', 'Viewer User'))
+                ON CONFLICT (username) DO NOTHING
+            ''', missing)
         
         # Custom Reports table
         cursor.execute(f'''
@@ -972,7 +1039,10 @@ class Database:
         # =========================================================================
         
         # status_history indexes (critical for time-series queries)
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sh_checked_at ON status_history(checked_at)')
+        # Covers the "latest N checks" reads (ORDER BY checked_at DESC) without touching the table;
+        # it also serves every checked_at range scan, so the plain checked_at index is redundant
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_sh_checked_at_cover ON status_history(checked_at DESC, status, response_time)')
+        cursor.execute('DROP INDEX IF EXISTS idx_sh_checked_at')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sh_device_checked ON status_history(device_id, checked_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_sh_device_status ON status_history(device_id, status, checked_at)')
         
@@ -991,6 +1061,13 @@ class Database:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_devices_type ON devices(device_type)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_devices_status ON devices(status)')
         
+        # topology foreign keys (device deletes and per-device link lookups match either end)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_topology_device ON topology(device_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_topology_connected ON topology(connected_to)')
+        # UNIQUE(sub_topology_id, device_id) already covers lookups by sub-topology
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_subtop_devices_device ON sub_topology_devices(device_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_subtop_conn_subtop ON sub_topology_connections(sub_topology_id)')
+        
         # bandwidth_history indexes
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_bw_device_sampled ON bandwidth_history(device_id, sampled_at)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_bw_sampled_at ON bandwidth_history(sampled_at)')
@@ -1005,7 +1082,71 @@ class Database:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_audit_category ON audit_logs(category, created_at)')
         
         conn.commit()
-        self.release_connection(conn)
+        return migrations_ok
+    
+    _DEVICE_INSERT_COLUMNS = (
+        'name', 'ip_address', 'device_type', 'location',
+        'status', 'monitor_type', 'expected_status_code',
+        'snmp_community', 'snmp_port', 'snmp_version',
+        'snmp_v3_username', 'snmp_v3_auth_protocol',
+        'snmp_v3_auth_password', 'snmp_v3_priv_protocol',
+        'snmp_v3_priv_password',
+        'tcp_port', 'dns_query_domain', 'location_type',
+        'latitude', 'longitude', 'is_enabled', 'parent_device_id',
+        'ssh_username', 'ssh_password', 'ssh_port',
+        'wmi_username', 'wmi_password', 'expected_ports',
+        'monitored_services', 'cpu_threshold', 'ram_threshold',
+        'disk_threshold', 'swap_threshold', 'threshold_duration_minutes',
+        'plugin_config_json',
+    )
+    _DUPLICATE_DEVICE_ERROR = 'Device with this IP/URL, monitor type, and device type already exists'
+    
+    def _device_insert_sql(self):
+        """INSERT statement for a new device row (values from _device_insert_values)"""
+        return f'''
+            INSERT INTO devices ({', '.join(self._DEVICE_INSERT_COLUMNS)})
+            VALUES ({self._ph(len(self._DEVICE_INSERT_COLUMNS))})
+        '''
+    
+    def _device_insert_values(self, name, ip_address, device_type=None, location=None, 
+                              monitor_type='ping', expected_status_code=200,
+                              snmp_community='public', snmp_port=161, snmp_version='2c',
+                              snmp_v3_username=None, snmp_v3_auth_protocol='SHA',
+                              snmp_v3_auth_password=None, snmp_v3_priv_protocol='AES128',
+                              snmp_v3_priv_password=None,
+                              tcp_port=80, dns_query_domain='google.com', location_type='on-premise',
+                              latitude=None, longitude=None, is_enabled=True, parent_device_id=None,
+                              ssh_username=None, ssh_password=None, ssh_port=22,
+                              wmi_username=None, wmi_password=None, expected_ports=None,
+                              monitored_services=None, cpu_threshold=85, ram_threshold=90,
+                              disk_threshold=90, swap_threshold=80, threshold_duration_minutes=5,
+                              plugin_config_json=None):
+        """Build the parameter tuple for _device_insert_sql() (same defaults as add_device)"""
+        # Strip whitespace from IP address to prevent ping failures
+        ip_address = ip_address.strip() if ip_address else ip_address
+        name = name.strip() if name else name
+        status_init = 'disabled' if not is_enabled else 'unknown'
+        if self.db_type != 'postgresql':
+            is_enabled = 1 if is_enabled else 0
+        return (name, ip_address, device_type or Config.DEFAULT_DEVICE_TYPE, 
+                location or Config.DEFAULT_LOCATION, status_init, monitor_type, expected_status_code,
+                snmp_community, snmp_port, snmp_version,
+                snmp_v3_username, snmp_v3_auth_protocol,
+                snmp_v3_auth_password, snmp_v3_priv_protocol,
+                snmp_v3_priv_password,
+                tcp_port, dns_query_domain,
+                location_type or Config.DEFAULT_LOCATION_TYPE,
+                latitude, longitude, is_enabled, parent_device_id,
+                ssh_username, ssh_password, ssh_port,
+                wmi_username, wmi_password, expected_ports,
+                monitored_services, cpu_threshold, ram_threshold,
+                disk_threshold, swap_threshold, threshold_duration_minutes,
+                plugin_config_json)
+    
+    @staticmethod
+    def _is_duplicate_device_error(error):
+        message = str(error)
+        return 'unique' in message.lower() or 'duplicate' in message.lower() or 'UNIQUE constraint' in message
     
     def add_device(self, name, ip_address, device_type=None, location=None, 
                    monitor_type='ping', expected_status_code=200,
@@ -1021,89 +1162,95 @@ class Database:
                    disk_threshold=90, swap_threshold=80, threshold_duration_minutes=5,
                    plugin_config_json=None):
         """Add a new device"""
+        values = self._device_insert_values(
+            name, ip_address, device_type=device_type, location=location,
+            monitor_type=monitor_type, expected_status_code=expected_status_code,
+            snmp_community=snmp_community, snmp_port=snmp_port, snmp_version=snmp_version,
+            snmp_v3_username=snmp_v3_username, snmp_v3_auth_protocol=snmp_v3_auth_protocol,
+            snmp_v3_auth_password=snmp_v3_auth_password, snmp_v3_priv_protocol=snmp_v3_priv_protocol,
+            snmp_v3_priv_password=snmp_v3_priv_password,
+            tcp_port=tcp_port, dns_query_domain=dns_query_domain, location_type=location_type,
+            latitude=latitude, longitude=longitude, is_enabled=is_enabled, parent_device_id=parent_device_id,
+            ssh_username=ssh_username, ssh_password=ssh_password, ssh_port=ssh_port,
+            wmi_username=wmi_username, wmi_password=wmi_password, expected_ports=expected_ports,
+            monitored_services=monitored_services, cpu_threshold=cpu_threshold, ram_threshold=ram_threshold,
+            disk_threshold=disk_threshold, swap_threshold=swap_threshold,
+            threshold_duration_minutes=threshold_duration_minutes,
+            plugin_config_json=plugin_config_json
+        )
+        
         conn = self.get_connection()
         cursor = self._cursor(conn)
-        
-        # Strip whitespace from IP address to prevent ping failures
-        ip_address = ip_address.strip() if ip_address else ip_address
-        name = name.strip() if name else name
-        
         try:
             if self.db_type == 'postgresql':
-                status_init = 'disabled' if not is_enabled else 'unknown'
-                cursor.execute('''
-                    INSERT INTO devices (name, ip_address, device_type, location, 
-                                       status, monitor_type, expected_status_code,
-                                       snmp_community, snmp_port, snmp_version,
-                                       snmp_v3_username, snmp_v3_auth_protocol,
-                                       snmp_v3_auth_password, snmp_v3_priv_protocol,
-                                       snmp_v3_priv_password,
-                                       tcp_port, dns_query_domain, location_type,
-                                       latitude, longitude, is_enabled, parent_device_id,
-                                       ssh_username, ssh_password, ssh_port,
-                                       wmi_username, wmi_password, expected_ports,
-                                       monitored_services, cpu_threshold, ram_threshold,
-                                       disk_threshold, swap_threshold, threshold_duration_minutes,
-                                       plugin_config_json)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING id
-                ''', (name, ip_address, device_type or Config.DEFAULT_DEVICE_TYPE, 
-                      location or Config.DEFAULT_LOCATION, status_init, monitor_type, expected_status_code,
-                      snmp_community, snmp_port, snmp_version,
-                      snmp_v3_username, snmp_v3_auth_protocol,
-                      snmp_v3_auth_password, snmp_v3_priv_protocol,
-                      snmp_v3_priv_password,
-                      tcp_port, dns_query_domain,
-                      location_type or Config.DEFAULT_LOCATION_TYPE,
-                      latitude, longitude, is_enabled, parent_device_id,
-                      ssh_username, ssh_password, ssh_port,
-                      wmi_username, wmi_password, expected_ports,
-                      monitored_services, cpu_threshold, ram_threshold,
-                      disk_threshold, swap_threshold, threshold_duration_minutes,
-                      plugin_config_json))
-                device_id = cursor.fetchone()['id']
+                cursor.execute(self._device_insert_sql() + ' RETURNING *', values)
+                device = self._row_to_dict(cursor.fetchone())
             else:
-                status_init = 'disabled' if not is_enabled else 'unknown'
-                cursor.execute('''
-                    INSERT INTO devices (name, ip_address, device_type, location, 
-                                       status, monitor_type, expected_status_code,
-                                       snmp_community, snmp_port, snmp_version,
-                                       snmp_v3_username, snmp_v3_auth_protocol,
-                                       snmp_v3_auth_password, snmp_v3_priv_protocol,
-                                       snmp_v3_priv_password,
-                                       tcp_port, dns_query_domain, location_type,
-                                       latitude, longitude, is_enabled, parent_device_id,
-                                       ssh_username, ssh_password, ssh_port,
-                                       wmi_username, wmi_password, expected_ports,
-                                       monitored_services, cpu_threshold, ram_threshold,
-                                       disk_threshold, swap_threshold, threshold_duration_minutes,
-                                       plugin_config_json)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (name, ip_address, device_type or Config.DEFAULT_DEVICE_TYPE, 
-                      location or Config.DEFAULT_LOCATION, status_init, monitor_type, expected_status_code,
-                      snmp_community, snmp_port, snmp_version,
-                      snmp_v3_username, snmp_v3_auth_protocol,
-                      snmp_v3_auth_password, snmp_v3_priv_protocol,
-                      snmp_v3_priv_password,
-                      tcp_port, dns_query_domain,
-                      location_type or Config.DEFAULT_LOCATION_TYPE,
-                      latitude, longitude, 1 if is_enabled else 0, parent_device_id,
-                      ssh_username, ssh_password, ssh_port,
-                      wmi_username, wmi_password, expected_ports,
-                      monitored_services, cpu_threshold, ram_threshold,
-                      disk_threshold, swap_threshold, threshold_duration_minutes,
-                      plugin_config_json))
-                device_id = cursor.lastrowid
+                cursor.execute(self._device_insert_sql(), values)
+                cursor.execute('SELECT * FROM devices WHERE id = ?', (cursor.lastrowid,))
+                device = self._row_to_dict(cursor.fetchone())
             conn.commit()
-            return {'success': True, 'id': device_id}
+            return {'success': True, 'id': device['id'], 'device': device}
         except (sqlite3.IntegrityError, Exception) as e:
             self._safe_rollback(conn)
-            if 'unique' in str(e).lower() or 'duplicate' in str(e).lower() or 'UNIQUE constraint' in str(e):
-                return {'success': False, 'error': 'Device with this IP/URL, monitor type, and device type already exists'}
+            if self._is_duplicate_device_error(e):
+                return {'success': False, 'error': self._DUPLICATE_DEVICE_ERROR}
             return {'success': False, 'error': str(e)}
         finally:
             self.release_connection(conn)
     
+    def add_devices_bulk(self, devices):
+        """
+        Add many devices in one transaction (used by CSV import)
+        devices: list of keyword-argument dicts accepted by add_device
+        Returns: list of {'success': ...} results aligned with the input
+        """
+        results = [None] * len(devices)
+        if not devices:
+            return results
+        
+        conn = self.get_connection()
+        cursor = self._cursor(conn)
+        try:
+            # Reject duplicates up front so one bad row doesn't abort the batch
+            cursor.execute('SELECT ip_address, monitor_type, device_type FROM devices')
+            existing = {
+                (row['ip_address'], row['monitor_type'], row['device_type'])
+                for row in cursor.fetchall()
+            }
+            
+            pending = []
+            for index, device in enumerate(devices):
+                try:
+                    values = self._device_insert_values(**device)
+                except Exception as e:
+                    results[index] = {'success': False, 'error': str(e)}
+                    continue
+                key = (values[1], values[5], values[2])
+                if key in existing:
+                    results[index] = {'success': False, 'error': self._DUPLICATE_DEVICE_ERROR}
+                    continue
+                existing.add(key)
+                pending.append((index, values))
+            
+            if pending:
+                cursor.executemany(self._device_insert_sql(), [values for _, values in pending])
+            conn.commit()
+            for index, _ in pending:
+                results[index] = {'success': True}
+            return results
+        except Exception as e:
+            self._safe_rollback(conn)
+            print(f"[DB] Bulk device insert failed, inserting rows individually: {e}")
+        finally:
+            self.release_connection(conn)
+        
+        # Batch rolled back (e.g. a concurrent insert): fall back to row-by-row
+        for index, device in enumerate(devices):
+            if results[index] is None:
+                results[index] = self.add_device(**device)
+        return results
+    
     def get_all_devices(self):
         """Get all devices"""
         conn = self.get_connection()
@@ -1115,6 +1262,83 @@ class Database:
         finally:
             self.release_connection(conn)
     
+    def get_enabled_devices(self):
+        """Get devices with monitoring enabled"""
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.execute('SELECT * FROM devices WHERE is_enabled ORDER BY id')
+            return self._rows_to_dicts(cursor.fetchall())
+        finally:
+            self.release_connection(conn)
+    
+    _STATUS_SNAPSHOT_COLUMNS = (
+        'id', 'name', 'ip_address', 'device_type', 'monitor_type',
+        'status', 'response_time', 'http_status_code', 'last_check',
+    )
+    
+    def get_device_status_snapshot(self):
+        """
+        Lightweight status rows for every device (only the columns live views need)
+        last_check is returned as an ISO string on both backends.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.execute(f"SELECT {', '.join(self._STATUS_SNAPSHOT_COLUMNS)} FROM devices ORDER BY id")
+            rows = self._rows_to_dicts(cursor.fetchall())
+            for row in rows:
+                last_check = row['last_check']
+                if hasattr(last_check, 'isoformat'):
+                    row['last_check'] = last_check.isoformat()
+                if row['monitor_type'] is None:
+                    row['monitor_type'] = 'ping'
+            return rows
+        finally:
+            self.release_connection(conn)
+    
+    def get_device_status_summary(self):
+        """Aggregate device counts by status and the average response time in one query"""
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.execute('''
+                SELECT
+                    COUNT(*) as total,
+                    SUM(CASE WHEN status = 'up' THEN 1 ELSE 0 END) as up,
+                    SUM(CASE WHEN status = 'slow' THEN 1 ELSE 0 END) as slow,
+                    SUM(CASE WHEN status = 'down' THEN 1 ELSE 0 END) as down,
+                    SUM(CASE WHEN status = 'unknown' THEN 1 ELSE 0 END) as unknown,
+                    SUM(CASE WHEN is_enabled THEN 0 ELSE 1 END) as disabled,
+                    AVG(response_time) as avg_response_time
+                FROM devices
+            ''')
+            row = self._row_to_dict(cursor.fetchone()) or {}
+            summary = {key: int(row.get(key) or 0) for key in ('total', 'up', 'slow', 'down', 'unknown', 'disabled')}
+            avg = row.get('avg_response_time')
+            summary['avg_response_time'] = float(avg) if avg is not None else None
+            return summary
+        finally:
+            self.release_connection(conn)
+    
+    def iter_all_devices(self, batch_size=500):
+        """
+        Yield all devices one at a time, fetching them in batches.
+        The connection is held until the generator is exhausted or closed.
+        """
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.execute('SELECT * FROM devices ORDER BY id')
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_dict(row)
+        finally:
+            self.release_connection(conn)
+    
     def get_device(self, device_id):
         """Get a specific device"""
         conn = self.get_connection()
@@ -1597,6 +1821,7 @@ class Database:
             
             # History
             cursor.execute(f'DELETE FROM status_history WHERE device_id = {ph}', (device_id,))
+            cursor.execute(f'DELETE FROM status_history_daily WHERE device_id = {ph}', (device_id,))
             cursor.execute(f'DELETE FROM alert_history WHERE device_id = {ph}', (device_id,))
             
             # Sub-topology references
@@ -1624,11 +1849,78 @@ class Database:
         finally:
             self.release_connection(conn)
     
+    _STATUS_EXTRA_COLUMNS = (
+        'snmp_uptime', 'snmp_sysname', 'snmp_sysdescr', 'snmp_syslocation', 'snmp_syscontact',
+        'ssl_expiry_date', 'ssl_days_left', 'ssl_issuer', 'ssl_status',
+    )
+    
+    def _status_update(self, device_id, current, status, response_time, http_status_code, extra, now):
+        """
+        Build the devices UPDATE for one status check
+        current: mapping with the device's status, escalation_level and is_enabled (or None)
+        extra: optional SNMP/SSL column values; None values are left untouched
+        Returns (sql, params, db_state).
+        """
+        ph = self._ph()
+        if current:
+            old_status = current.get('status')
+            old_escalation_level = current.get('escalation_level') or 0
+            is_enabled = bool(current.get('is_enabled', True))
+        else:
+            old_status = 'unknown'
+            old_escalation_level = 0
+            is_enabled = True
+        
+        # Force status to 'disabled' if device is disabled
+        if not is_enabled:
+            status = 'disabled'
+            response_time = None
+            http_status_code = None
+        
+        # Build update query dynamically based on provided values
+        update_parts = [f'status = {ph}', f'response_time = {ph}', f'last_check = {ph}', f'http_status_code = {ph}']
+        params = [status, response_time, now, http_status_code]
+        
+        # Reset escalation track and record the state timestamp if device status transitioned
+        if status != old_status:
+            update_parts.append(f'last_status_change = {ph}')
+            params.append(now)
+            update_parts.append(f'escalation_level = {ph}')
+            params.append(0)
+        
+        for column in self._STATUS_EXTRA_COLUMNS:
+            value = extra.get(column)
+            if value is not None:
+                update_parts.append(f'{column} = {ph}')
+                params.append(value)
+        
+        params.append(device_id)
+        sql = f"UPDATE devices SET {', '.join(update_parts)} WHERE id = {ph}"
+        
+        return sql, params, {
+            'old_status': old_status,
+            'old_escalation_level': old_escalation_level,
+            'new_status': status,
+            'response_time': response_time,
+            'checked_at': now
+        }
+    
     def update_device_status(self, device_id, status, response_time=None, http_status_code=None,
                              snmp_uptime=None, snmp_sysname=None, snmp_sysdescr=None,
                              snmp_syslocation=None, snmp_syscontact=None,
-                             ssl_expiry_date=None, ssl_days_left=None, ssl_issuer=None, ssl_status=None):
-        """Update device status"""
+                             ssl_expiry_date=None, ssl_days_left=None, ssl_issuer=None, ssl_status=None,
+                             record_history=True):
+        """
+        Update device status
+        With record_history=False the status_history row is left to the caller
+        (see record_status_history_bulk); the returned dict carries its values.
+        """
+        extra = {
+            'snmp_uptime': snmp_uptime, 'snmp_sysname': snmp_sysname, 'snmp_sysdescr': snmp_sysdescr,
+            'snmp_syslocation': snmp_syslocation, 'snmp_syscontact': snmp_syscontact,
+            'ssl_expiry_date': ssl_expiry_date, 'ssl_days_left': ssl_days_left,
+            'ssl_issuer': ssl_issuer, 'ssl_status': ssl_status,
+        }
         conn = self.get_connection()
         try:
             cursor = self._cursor(conn)
@@ -1638,88 +1930,61 @@ class Database:
             
             # Get old status, escalation level and enabled state to detect changes accurately
             cursor.execute(f'SELECT status, escalation_level, is_enabled FROM devices WHERE id = {ph}', (device_id,))
-            current_row = cursor.fetchone()
-            if current_row:
-                old_status = current_row['status']
-                old_escalation_level = current_row.get('escalation_level', 0)
-                is_enabled = bool(current_row.get('is_enabled', True))
-            else:
-                old_status = 'unknown'
-                old_escalation_level = 0
-                is_enabled = True
+            current_row = self._row_to_dict(cursor.fetchone())
             
-            # Force status to 'disabled' if device is disabled
-            if not is_enabled:
-                status = 'disabled'
-                response_time = None
-                http_status_code = None
-            
-            # Build update query dynamically based on provided values
-            update_parts = [f'status = {ph}', f'response_time = {ph}', f'last_check = {ph}', f'http_status_code = {ph}']
-            params = [status, response_time, now, http_status_code]
-            
-            # Reset escalation track and record the state timestamp if device status transitioned
-            if status != old_status:
-                update_parts.append(f'last_status_change = {ph}')
-                params.append(now)
-                update_parts.append(f'escalation_level = {ph}')
-                params.append(0)
-            
-            if snmp_uptime is not None:
-                update_parts.append(f'snmp_uptime = {ph}')
-                params.append(snmp_uptime)
-            if snmp_sysname is not None:
-                update_parts.append(f'snmp_sysname = {ph}')
-                params.append(snmp_sysname)
-            if snmp_sysdescr is not None:
-                update_parts.append(f'snmp_sysdescr = {ph}')
-                params.append(snmp_sysdescr)
-            if snmp_syslocation is not None:
-                update_parts.append(f'snmp_syslocation = {ph}')
-                params.append(snmp_syslocation)
-            if snmp_syscontact is not None:
-                update_parts.append(f'snmp_syscontact = {ph}')
-                params.append(snmp_syscontact)
-            if ssl_expiry_date is not None:
-                update_parts.append(f'ssl_expiry_date = {ph}')
-                params.append(ssl_expiry_date)
-            if ssl_days_left is not None:
-                update_parts.append(f'ssl_days_left = {ph}')
-                params.append(ssl_days_left)
-            if ssl_issuer is not None:
-                update_parts.append(f'ssl_issuer = {ph}')
-                params.append(ssl_issuer)
-            if ssl_status is not None:
-                update_parts.append(f'ssl_status = {ph}')
-                params.append(ssl_status)
-            
-            params.append(device_id)
-            
-            cursor.execute(f'''
-                UPDATE devices 
-                SET {', '.join(update_parts)}
-                WHERE id = {ph}
-            ''', params)
+            sql, params, db_state = self._status_update(
+                device_id, current_row, status, response_time, http_status_code, extra, now)
+            cursor.execute(sql, params)
             
             # Log to history
-            cursor.execute(f'''
-                INSERT INTO status_history (device_id, status, response_time, checked_at)
-                VALUES ({self._ph(4)})
-            ''', (device_id, status, response_time, now))
+            if record_history:
+                row = (device_id, db_state['new_status'], db_state['response_time'], now)
+                cursor.execute(self._status_history_sql, row)
+                self._rollup_status_history(cursor, [row])
             
             conn.commit()
             
-            return {
-                'old_status': old_status,
-                'old_escalation_level': old_escalation_level,
-                'new_status': status
-            }
+            return db_state
         except Exception as e:
             self._safe_rollback(conn)
             raise e
         finally:
             self.release_connection(conn)
     
+    def _rollup_status_history(self, cursor, rows):
+        """Add status_history rows (device_id, status, response_time, checked_at) to status_history_daily"""
+        totals = {}
+        for device_id, status, response_time, checked_at in rows:
+            key = (device_id, str(checked_at)[:10], status)
+            n, sum_rt = totals.get(key, (0, None))
+            if response_time is not None:
+                sum_rt = (sum_rt or 0) + response_time
+            totals[key] = (n + 1, sum_rt)
+        cursor.executemany(self._status_rollup_sql,
+                           [key + value for key, value in totals.items()])
+    
+    @_retry_on_busy()
+    def record_status_history_bulk(self, rows):
+        """
+        Append several status_history rows in one transaction
+        rows: iterable of (device_id, status, response_time, checked_at)
+        """
+        rows = [tuple(row) for row in rows]
+        if not rows:
+            return 0
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.executemany(self._status_history_sql, rows)
+            self._rollup_status_history(cursor, rows)
+            conn.commit()
+            return len(rows)
+        except Exception:
+            self._safe_rollback(conn)
+            raise
+        finally:
+            self.release_connection(conn)
+    
     def get_topology(self):
         """Get topology connections"""
         conn = self.get_connection()
@@ -1731,6 +1996,19 @@ class Database:
         finally:
             self.release_connection(conn)
     
+    def get_topology_snapshot(self):
+        """Devices and topology connections read on one connection (for /api/topology)"""
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.execute('SELECT * FROM devices ORDER BY id')
+            devices = self._rows_to_dicts(cursor.fetchall())
+            cursor.execute('SELECT * FROM topology')
+            connections = self._rows_to_dicts(cursor.fetchall())
+            return {'devices': devices, 'connections': connections}
+        finally:
+            self.release_connection(conn)
+    
     def add_topology_connection(self, device_id, connected_to, view_type='standard'):
         """Add a topology connection"""
         conn = self.get_connection()
@@ -1749,19 +2027,7 @@ class Database:
             if cursor.fetchone():
                 return {'success': False, 'error': 'Connection already exists in this view'}
             
-            if self.db_type == 'postgresql':
-                cursor.execute(f'''
-                    INSERT INTO topology (device_id, connected_to, view_type)
-                    VALUES ({self._ph(3)})
-                    RETURNING id
-                ''', (device_id, connected_to, view_type))
-                connection_id = cursor.fetchone()['id']
-            else:
-                cursor.execute(f'''
-                    INSERT INTO topology (device_id, connected_to, view_type)
-                    VALuES ({self._ph(3)})
-                ''', (device_id, connected_to, view_type))
-                connection_id = cursor.lastrowid
+            connection_id = self._insert_topology_row(cursor, (device_id, connected_to, view_type))
             conn.commit()
             return {'success': True, 'id': connection_id}
         except Exception as e:
@@ -1770,6 +2036,63 @@ class Database:
         finally:
             self.release_connection(conn)
     
+    def _insert_topology_row(self, cursor, values):
+        """Insert one (device_id, connected_to, view_type) row and return its id"""
+        sql = f'INSERT INTO topology (device_id, connected_to, view_type) VALUES ({self._ph(3)})'
+        if self.db_type == 'postgresql':
+            cursor.execute(sql + ' RETURNING id', values)
+            return cursor.fetchone()['id']
+        cursor.execute(sql, values)
+        return cursor.lastrowid
+    
+    def add_topology_connections_bulk(self, connections):
+        """
+        Add many topology connections in one transaction
+        connections: list of {'device_id', 'connected_to', 'view_type'} dicts
+        Returns: list of {'success': ..., 'id': ...} results aligned with the input
+        """
+        results = [None] * len(connections)
+        if not connections:
+            return results
+        
+        conn = self.get_connection()
+        cursor = self._cursor(conn)
+        try:
+            # Same duplicate rule as add_topology_connection: either direction,
+            # same view (rows without a view_type clash with every view)
+            cursor.execute('SELECT device_id, connected_to, view_type FROM topology')
+            existing = set()
+            for row in cursor.fetchall():
+                existing.add((row['device_id'], row['connected_to'], row['view_type']))
+                existing.add((row['connected_to'], row['device_id'], row['view_type']))
+            
+            pending = []
+            for index, item in enumerate(connections):
+                a, b = item['device_id'], item['connected_to']
+                view_type = item.get('view_type', 'standard')
+                if {(a, b, view_type), (a, b, None)} & existing:
+                    results[index] = {'success': False, 'error': 'Connection already exists in this view'}
+                    continue
+                existing.update({(a, b, view_type), (b, a, view_type)})
+                pending.append((index, (a, b, view_type)))
+            
+            # One statement text reused for every row, one commit for the batch
+            for index, values in pending:
+                results[index] = {'success': True, 'id': self._insert_topology_row(cursor, values)}
+            conn.commit()
+            return results
+        except Exception as e:
+            self._safe_rollback(conn)
+            print(f"[DB] Bulk topology insert failed, inserting rows individually: {e}")
+        finally:
+            self.release_connection(conn)
+        
+        return [
+            self.add_topology_connection(item['device_id'], item['connected_to'], item.get('view_type', 'standard'))
+            if result is None or result.get('success') else result
+            for item, result in zip(connections, results)
+        ]
+    
     def delete_topology_connection(self, connection_id=None, device_id=None, connected_to=None):
         """Delete a topology connection by ID or by device pair"""
         conn = self.get_connection()
@@ -1894,6 +2217,30 @@ class Database:
         finally:
             self.release_connection(conn)
 
+    def get_device_history_marker(self, device_id, minutes=None):
+        """
+        (newest, oldest checked_at) of a device's history, optionally within the
+        last N minutes. Changes whenever get_device_history's rows would: new
+        checks move the newest, retention or the moving window moves the oldest.
+        Each bound is a single seek on idx_sh_device_checked, unlike COUNT(*).
+        """
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            where_clause = f"WHERE device_id = {self._ph()}"
+            if minutes:
+                if self.db_type == 'postgresql':
+                    where_clause += " AND checked_at >= NOW() - INTERVAL '%s minutes'" % int(minutes)
+                else:
+                    where_clause += " AND checked_at >= datetime('now', '-%d minutes')" % int(minutes)
+            cursor.execute(f'SELECT (SELECT MAX(checked_at) FROM status_history {where_clause}) AS last_checked, '
+                           f'(SELECT MIN(checked_at) FROM status_history {where_clause}) AS first_checked',
+                           (device_id, device_id))
+            row = cursor.fetchone()
+            return (row['last_checked'], row['first_checked'])
+        finally:
+            self.release_connection(conn)
+    
     def get_server_response_time_series(self, minutes=360, sample_count=60):
         """Get response time buckets per SSH/WinRM/WMI server device."""
         conn = self.get_connection()
@@ -2033,9 +2380,9 @@ class Database:
             query += f' AND h.checked_at <= {ph}'
             params.append(end_date)
         if device_ids and len(device_ids) > 0:
-            placeholders = ','.join([ph for _ in device_ids])
-            query += f' AND h.device_id IN ({placeholders})'
-            params.extend(device_ids)
+            condition, param = self._in_list('h.device_id', device_ids)
+            query += f' AND {condition}'
+            params.append(param)
         
         query += ' ORDER BY h.checked_at ASC'
         
@@ -2137,30 +2484,32 @@ class Database:
     
     def save_alert_setting(self, key, value):
         """Save or update an alert setting"""
-        conn = self.get_connection()
-        cursor = self._cursor(conn)
-        ph = self._ph()
+        return self.save_alert_settings_bulk({key: value})
+    
+    def save_alert_settings_bulk(self, settings):
+        """Save or update several alert settings in one transaction"""
+        if not settings:
+            return {'success': True}
         
-        if self.db_type == 'postgresql':
-            cursor.execute('''
-                INSERT INTO alert_settings (setting_key, setting_value, updated_at)
-                VALUES (%s, %s, %s)
-                ON CONFLICT(setting_key) DO UPDATE SET 
-                    setting_value = EXCLUDED.setting_value,
-                    updated_at = EXCLUDED.updated_at
-            ''', (key, value, datetime.now().isoformat()))
-        else:
-            cursor.execute('''
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            now = datetime.now().isoformat()
+            cursor.executemany(f'''
                 INSERT INTO alert_settings (setting_key, setting_value, updated_at)
-                VALUES (?, ?, ?)
+                VALUES ({self._ph(3)})
                 ON CONFLICT(setting_key) DO UPDATE SET 
                     setting_value = excluded.setting_value,
                     updated_at = excluded.updated_at
-            ''', (key, value, datetime.now().isoformat()))
-        
-        conn.commit()
-        self.release_connection(conn)
-        return {'success': True}
+            ''', [(key, value, now) for key, value in settings.items()])
+            conn.commit()
+            self.alert_settings_version += 1
+            return {'success': True}
+        except Exception:
+            self._safe_rollback(conn)
+            raise
+        finally:
+            self.release_connection(conn)
     
     def get_alert_setting(self, key):
         """Get a single alert setting"""
@@ -2188,14 +2537,31 @@ class Database:
         conn = self.get_connection()
         cursor = self._cursor(conn)
         
-        cursor.execute(f'''
-            INSERT INTO alert_history (device_id, event_type, message, channel, status, error_message, created_at)
-            VALUES ({self._ph(7)})
-        ''', (device_id, event_type, message, channel, status, error, datetime.now().isoformat()))
+        cursor.execute(self._log_alert_sql,
+                       (device_id, event_type, message, channel, status, error, datetime.now().isoformat()))
         
         conn.commit()
         self.release_connection(conn)
     
+    def log_alerts_bulk(self, entries):
+        """
+        Log several alerts in one transaction
+        entries: iterable of (device_id, event_type, message, channel, status, error, created_at)
+        """
+        rows = [tuple(entry) for entry in entries]
+        if not rows:
+            return
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            cursor.executemany(self._log_alert_sql, rows)
+            conn.commit()
+        except Exception:
+            self._safe_rollback(conn)
+            raise
+        finally:
+            self.release_connection(conn)
+    
     def get_last_alert_time(self, device_id, event_type):
         """Get the last alert time for a device and event type (for cooldown)"""
         conn = self.get_connection()
@@ -3906,6 +4272,21 @@ class Database:
         self.release_connection(conn)
         return windows
     
+    def get_pending_maintenance(self, device_id):
+        """Maintenance windows for a device (or all devices) that are active or have not started yet"""
+        conn = self.get_connection()
+        try:
+            cursor = self._cursor(conn)
+            ph = self._ph()
+            cursor.execute(f'''
+                SELECT start_time, end_time FROM maintenance_windows
+                WHERE (device_id = {ph} OR device_id IS NULL)
+                  AND end_time >= {ph}
+            ''', (device_id, datetime.now().isoformat()))
+            return self._rows_to_dicts(cursor.fetchall())
+        finally:
+            self.release_connection(conn)
+    
     def is_device_in_maintenance(self, device_id):
         """Check if a device is currently in maintenance window"""
         windows = self.get_active_maintenance(device_id)
@@ -4078,33 +4459,46 @@ class Database:
         
         return result
     
-    def cleanup_old_data(self):
+    def _delete_older_than(self, conn, table, column, cutoff, batch_size):
+        """
+        Delete rows with column < cutoff in batches of batch_size, committing after
+        each one so the writer lock (and the WAL) never covers the whole purge.
+        Returns the number of rows deleted.
+        """
+        cursor = self._cursor(conn)
+        ph = self._ph()
+        sql = (f'DELETE FROM {table} WHERE id IN '
+               f'(SELECT id FROM {table} WHERE {column} < {ph} LIMIT {ph})')
+        deleted = 0
+        while True:
+            cursor.execute(sql, (cutoff, batch_size))
+            conn.commit()
+            count = cursor.rowcount
+            deleted += max(count, 0)
+            if count < batch_size:
+                return deleted
+            # Let queued readers and the monitor's writes in between batches
+            time.sleep(0.01)
+    
+    def cleanup_old_data(self, batch_size=None):
         """Remove old data beyond retention period (works with both SQLite and PostgreSQL)"""
+        batch_size = batch_size or Config.RETENTION_DELETE_BATCH
         conn = self.get_connection()
         cursor = self._cursor(conn)
-        ph = self._ph()
         
         cutoff_date = (datetime.now() - timedelta(days=Config.RETENTION_DAYS)).isoformat()
+        # Bandwidth samples keep a shorter, 7-day retention
+        bw_cutoff = (datetime.now() - timedelta(days=7)).isoformat()
         
         try:
-            # Delete old status history
-            cursor.execute(f'DELETE FROM status_history WHERE checked_at < {ph}', (cutoff_date,))
-            deleted_history = cursor.rowcount
-            
-            # Delete old alert history  
-            cursor.execute(f'DELETE FROM alert_history WHERE created_at < {ph}', (cutoff_date,))
-            deleted_alerts = cursor.rowcount
-            
-            # Delete old bandwidth history (7-day retention for bandwidth data)
-            bw_cutoff = (datetime.now() - timedelta(days=7)).isoformat()
-            cursor.execute(f'DELETE FROM bandwidth_history WHERE sampled_at < {ph}', (bw_cutoff,))
-            deleted_bw = cursor.rowcount
-
-            # Delete old server performance samples using the global retention policy.
-            cursor.execute(f'DELETE FROM system_metrics_history WHERE timestamp < {ph}', (cutoff_date,))
-            deleted_metrics = cursor.rowcount
-            
+            deleted_history = self._delete_older_than(conn, 'status_history', 'checked_at', cutoff_date, batch_size)
+            # Rollup days are whole days; the cutoff day itself is kept
+            cursor.execute(f'DELETE FROM status_history_daily WHERE day < {self._ph()}', (cutoff_date[:10],))
             conn.commit()
+            deleted_alerts = self._delete_older_than(conn, 'alert_history', 'created_at', cutoff_date, batch_size)
+            deleted_bw = self._delete_older_than(conn, 'bandwidth_history', 'sampled_at', bw_cutoff, batch_size)
+            # Server performance samples follow the global retention policy
+            deleted_metrics = self._delete_older_than(conn, 'system_metrics_history', 'timestamp', cutoff_date, batch_size)
             
             # PostgreSQL: VACUUM ANALYZE for space reclaim and stats update
             if self.db_type == 'postgresql':
@@ -4113,6 +4507,9 @@ class Database:
                 cursor.execute('VACUUM ANALYZE alert_history')
                 cursor.execute('VACUUM ANALYZE system_metrics_history')
                 conn.autocommit = False
+            else:
+                # Fold the purge back into the main file and shrink the WAL
+                cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
             
             print(
                 f"[DB Cleanup] Deleted {deleted_history} old status records, "
@@ -4443,8 +4840,6 @@ class Database:
 
     def authenticate_user(self, username, password):
         """Authenticate a user and return user data if successful"""
-        from werkzeug.security import check_password_hash
-        
         user = self.get_user_by_username(username)
         
         # 1. Try Local Authentication first if user exists
@@ -4612,9 +5007,7 @@ class Database:
     
     def add_user(self, username, password, role='viewer', display_name=None, email=None, telegram_chat_id=None, auth_type='local'):
         """Add a new user"""
-        from werkzeug.security import generate_password_hash
-        
-        if role not in ['admin', 'operator', 'viewer']:
+        if role not in self._USER_ROLES:
             return {'success': False, 'error': 'Invalid role. Must be admin, operator, or viewer'}
         
         conn = self.get_connection()
@@ -4660,7 +5053,7 @@ class Database:
         params = []
         
         if role is not None:
-            if role not in ['admin', 'operator', 'viewer']:
+            if role not in self._USER_ROLES:
                 self.release_connection(conn)
                 return {'success': False, 'error': 'Invalid role'}
             updates.append(f'role = {ph}')
@@ -4690,7 +5083,6 @@ class Database:
                 params.append(1 if is_active else 0)
         
         if password is not None:
-            from werkzeug.security import generate_password_hash
             updates.append(f'password_hash = {ph}')
             params.append(generate_password_hash(password))
         
@@ -4742,29 +5134,35 @@ class Database:
     # Dashboard Methods
     # =========================================================================
     
+    @_retry_on_busy()
     def create_dashboard(self, name, layout_config, description=None, created_by=None, is_public=0):
         """Create a new dashboard"""
         conn = self.get_connection()
-        cursor = self._cursor(conn)
-        
-        if self.db_type == 'postgresql':
-            is_public_val = bool(is_public)
-            cursor.execute('''
-                INSERT INTO dashboards (name, layout_config, description, created_by, is_public, display_order)
-                VALUES (%s, %s, %s, %s, %s, (SELECT COALESCE(MAX(display_order), 0) + 1 FROM dashboards))
-                RETURNING id
-            ''', (name, layout_config, description, created_by, is_public_val))
-            dashboard_id = cursor.fetchone()['id']
-        else:
-            cursor.execute('''
-                INSERT INTO dashboards (name, layout_config, description, created_by, is_public, display_order)
-                VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(display_order), 0) + 1 FROM dashboards))
-            ''', (name, layout_config, description, created_by, is_public))
-            dashboard_id = cursor.lastrowid
-        
-        conn.commit()
-        self.release_connection(conn)
-        return {'success': True, 'id': dashboard_id}
+        try:
+            cursor = self._cursor(conn)
+            
+            if self.db_type == 'postgresql':
+                is_public_val = bool(is_public)
+                cursor.execute('''
+                    INSERT INTO dashboards (name, layout_config, description, created_by, is_public, display_order)
+                    VALUES (%s, %s, %s, %s, %s, (SELECT COALESCE(MAX(display_order), 0) + 1 FROM dashboards))
+                    RETURNING id
+                ''', (name, layout_config, description, created_by, is_public_val))
+                dashboard_id = cursor.fetchone()['id']
+            else:
+                cursor.execute('''
+                    INSERT INTO dashboards (name, layout_config, description, created_by, is_public, display_order)
+                    VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(display_order), 0) + 1 FROM dashboards))
+                ''', (name, layout_config, description, created_by, is_public))
+                dashboard_id = cursor.lastrowid
+            
+            conn.commit()
+            return {'success': True, 'id': dashboard_id}
+        except Exception:
+            self._safe_rollback(conn)
+            raise
+        finally:
+            self.release_connection(conn)
     
     def get_dashboards(self, user_id=None):
         """Get all dashboards visible to a user"""
@@ -4817,6 +5215,7 @@ class Database:
         self.release_connection(conn)
         return self._row_to_dict(result)
     
+    @_retry_on_busy()
     def update_dashboard(self, dashboard_id, name=None, layout_config=None, description=None, is_public=None):
         """Update a dashboard"""
         conn = self.get_connection()
@@ -4845,7 +5244,7 @@ class Database:
         updates.append(f'updated_at = {ph}')
         params.append(datetime.now().isoformat())
         
-        if updates:
+        try:
             params.append(dashboard_id)
             cursor.execute(f'''
                 UPDATE dashboards 
@@ -4853,18 +5252,27 @@ class Database:
                 WHERE id = {ph}
             ''', params)
             conn.commit()
-            
-        self.release_connection(conn)
-        return {'success': True}
+            return {'success': True}
+        except Exception:
+            self._safe_rollback(conn)
+            raise
+        finally:
+            self.release_connection(conn)
     
+    @_retry_on_busy()
     def delete_dashboard(self, dashboard_id):
         """Delete a dashboard"""
         conn = self.get_connection()
-        cursor = self._cursor(conn)
-        cursor.execute(f'DELETE FROM dashboards WHERE id = {self._ph()}', (dashboard_id,))
-        conn.commit()
-        self.release_connection(conn)
-        return {'success': True}
+        try:
+            cursor = self._cursor(conn)
+            cursor.execute(f'DELETE FROM dashboards WHERE id = {self._ph()}', (dashboard_id,))
+            conn.commit()
+            return {'success': True}
+        except Exception:
+            self._safe_rollback(conn)
+            raise
+        finally:
+            self.release_connection(conn)
 
     def reorder_dashboards(self, dashboard_ids):
         """Update display order for dashboards"""
@@ -0,0 +1,27 @@
+"""
+Gunicorn settings for running Network Monitor on Linux hosts
+
+    gunicorn -c gunicorn_conf.py app:app
+
+Windows hosts keep using run_production.py (eventlet's own WSGI server);
+Gunicorn does not run there.
+"""
+import os
+
+from config import Config
+
+bind = f"{Config.SERVER_HOST}:{Config.SERVER_PORT}"
+# Same cooperative runtime as run_production.py (see async_runtime)
+worker_class = 'eventlet'
+# Socket.IO sessions and the in-process scheduler/caches need a single worker;
+# concurrency comes from green threads, not processes
+workers = 1
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS') or 1000)
+timeout = 120
+accesslog = '-'
+
+
+def post_worker_init(worker):
+    """Start the scheduler, bot polling and receivers inside the serving worker"""
+    from app import start_services
+    start_services()
@@ -0,0 +1,79 @@
+"""
+JSON encoding helpers for Network Monitor
+Uses orjson when it is installed and falls back to the standard library
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if ORJSON_AVAILABLE else 0
+# Flask's jsonify sorts keys and renders datetimes as HTTP dates; keep that output
+_PROVIDER_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if ORJSON_AVAILABLE else 0
+)
+
+
+def dumps(obj, **kwargs):
+    """
+    Serialize obj to a JSON string.
+    Values JSON cannot represent (datetime, Decimal, ...) are converted with str().
+    Extra keyword arguments (e.g. separators) are accepted for compatibility;
+    orjson always produces compact output.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode('utf-8')
+    kwargs.setdefault('default', str)
+    return json.dumps(obj, **kwargs)
+
+
+def loads(data, **kwargs):
+    """Deserialize a JSON string or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data, **kwargs)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes with orjson.
+    Output is equivalent to DefaultJSONProvider (sorted keys, same handling of
+    dates, Decimal, UUID and dataclasses) except that non-ASCII text is sent
+    as UTF-8 rather than \\u escapes. Values orjson can't encode (e.g. ints
+    beyond 64 bits) and indented debug output fall back to the default path.
+    """
+    
+    def _orjson_dumps(self, obj):
+        try:
+            return orjson.dumps(obj, default=self.default, option=_PROVIDER_OPTIONS).decode('utf-8')
+        except TypeError:
+            return None
+    
+    def dumps(self, obj, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            text = self._orjson_dumps(obj)
+            if text is not None:
+                return text
+        return super().dumps(obj, **kwargs)
+    
+    def loads(self, s, **kwargs):
+        if ORJSON_AVAILABLE and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+    
+    def response(self, *args, **kwargs):
+        indented = (self.compact is None and self._app.debug) or self.compact is False
+        if not ORJSON_AVAILABLE or indented:
+            return super().response(*args, **kwargs)
+        
+        obj = self._prepare_response_obj(args, kwargs)
+        text = self._orjson_dumps(obj)
+        if text is None:
+            text = super().dumps(obj, separators=(',', ':'))
+        return self._app.response_class(f"{text}\n", mimetype=self.mimetype)
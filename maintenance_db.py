@@ -33,6 +33,10 @@ def run_maintenance():
         deleted_history = cursor.rowcount
         print(f"Successfully deleted {deleted_history:,} history records.")
         
+        # Keep the daily rollup (check_status.py) in step with the pruned history
+        cursor.execute("DELETE FROM status_history_daily WHERE day < %s", (history_cutoff[:10],))
+        print(f"Deleted {cursor.rowcount:,} daily rollup rows.")
+        
         # 3. Prune alert_history
         print(f"Pruning alert_history records older than {alert_cutoff}...")
         cursor.execute("DELETE FROM alert_history WHERE created_at < %s", (alert_cutoff,))
@@ -13,6 +13,8 @@ from urllib.parse import urlparse
 import asyncio
 import socket
 import threading
+import itertools
+from concurrent.futures import Future
 import sys
 import ssl
 import json
@@ -60,6 +62,13 @@ class NetworkMonitor:
         self.plugin_manager = None  # Will be set by app.py
         self.max_workers = Config.MONITOR_MAX_WORKERS
         
+        # Single-flight registry: device_id -> Future of the probe in progress
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Status per device as of the last full sweep (see status_changes)
+        self._last_statuses = {}
+        
         # Dedicated Asyncio thread for SNMP (Stable Architecture)
         self._loop = None
         self._thread = None
@@ -1373,11 +1382,43 @@ class NetworkMonitor:
                     message
                 )
     
-    def check_device(self, device):
+    def check_device(self, device, history=None):
         """
         Check a single device using its configured monitor type.
         Returns a dictionary with the check results.
+        
+        Concurrent callers for the same device (manual checks, WS refreshes,
+        the scheduled sweep) share one in-flight probe instead of each
+        hitting the target.
+        
+        The devices row is always updated right away (alert dependencies read it
+        during the same sweep). When a history list is given the status_history
+        row is appended to it for the caller to write in bulk.
         """
+        device_id = device.get('id')
+        with self._inflight_lock:
+            future = self._inflight.get(device_id)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[device_id] = future
+        
+        if not owner:
+            return future.result()
+        
+        try:
+            result = self._check_device(device, history=history)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(device_id, None)
+    
+    def _check_device(self, device, history=None):
+        """Run the probe for a single device (see check_device)"""
         # Safety Guard: Do not check disabled devices
         if not device.get('is_enabled'):
             # Ensure status is 'disabled' in the database
@@ -1602,8 +1643,12 @@ class NetworkMonitor:
             result.get('ssl_expiry_date'),
             result.get('ssl_days_left'),
             result.get('ssl_issuer'),
-            result.get('ssl_status')
+            result.get('ssl_status'),
+            record_history=history is None
         )
+        if history is not None:
+            history.append((device['id'], db_state['new_status'],
+                            db_state['response_time'], db_state['checked_at']))
         
         # ==== Alert Triggers ====
         if self.alerter:
@@ -1684,56 +1729,85 @@ class NetworkMonitor:
     
     def check_all_devices(self):
         """Check all devices in parallel using eventlet GreenPool"""
-        all_devices = self.db.get_all_devices()
-        # Filter for enabled devices only
-        devices = [d for d in all_devices if d.get('is_enabled')]
+        # Disabled devices are filtered out in SQL rather than loaded and discarded
+        return self.check_devices(self.db.get_enabled_devices())
+    
+    def check_devices(self, devices):
+        """Check the given devices concurrently; returns results for the checks that completed"""
         results = []
         
         if not devices:
             return results
         
         # Use GreenPool for cooperative multitasking (standard for Eventlet)
-        pool = async_runtime.GreenPool(size=self.max_workers)
+        pool = async_runtime.GreenPool(size=min(self.max_workers, len(devices)))
         
-        # Use imap to run checks and collect results as they complete
-        for result in pool.imap(self._safe_check_device, devices):
+        # History rows belong to this call only and are written in one transaction at the end;
+        # the devices rows themselves are updated as each check completes
+        history = []
+        for result in pool.imap(self._safe_check_device, devices, itertools.repeat(history)):
             if result is not None:
                 results.append(result)
         
+        self._write_history(history)
+        
         return results
     
-    def _safe_check_device(self, device):
+    def _write_history(self, history):
+        """Write a sweep's status_history rows, falling back to one row at a time if the batch fails"""
+        if not history:
+            return
+        try:
+            self.db.record_status_history_bulk(history)
+            return
+        except Exception as e:
+            print(f"[ERROR] Failed to record status history for {len(history)} checks, retrying per row: {e}")
+        failed = 0
+        for row in history:
+            try:
+                self.db.record_status_history_bulk([row])
+            except Exception:
+                failed += 1
+        if failed:
+            print(f"[ERROR] Lost {failed} of {len(history)} status history rows")
+    
+    def _safe_check_device(self, device, history=None):
         """Check device with error isolation — failures don't crash other checks"""
         try:
-            return self.check_device(device)
+            return self.check_device(device, history)
         except Exception as e:
             print(f"[ERROR] Failed to check {device.get('name', 'unknown')}: {e}")
             return None
     
+    def status_changes(self, results):
+        """
+        Results of a full sweep whose status differs from the previous sweep
+        (new devices included). Devices missing from the sweep are forgotten.
+        """
+        previous = self._last_statuses
+        self._last_statuses = {result['id']: result.get('status') for result in results}
+        return [result for result in results
+                if previous.get(result['id']) != result.get('status')]
+    
     def get_statistics(self):
         """Get overall network statistics"""
-        devices = self.db.get_all_devices()
-        
-        total = len(devices)
-        up = sum(1 for d in devices if d['status'] == 'up')
-        slow = sum(1 for d in devices if d['status'] == 'slow')
-        down = sum(1 for d in devices if d['status'] == 'down')
-        unknown = sum(1 for d in devices if d['status'] == 'unknown')
+        # Counts and averages come from one aggregate query rather than every device row
+        summary = self.db.get_device_status_summary()
         
-        # Calculate average response time for devices that are up
-        response_times = [d['response_time'] for d in devices 
-                         if d['response_time'] is not None]
-        avg_response = round(sum(response_times) / len(response_times), 2) if response_times else 0
+        up = summary['up']
+        slow = summary['slow']
+        down = summary['down']
+        avg_response = summary['avg_response_time']
         
         return {
-            'total_devices': total,
+            'total_devices': summary['total'],
             'devices_up': up,
             'devices_slow': slow,
             'devices_down': down,
-            'devices_unknown': unknown,
-            'devices_disabled': sum(1 for d in devices if not d.get('is_enabled')),
+            'devices_unknown': summary['unknown'],
+            'devices_disabled': summary['disabled'],
             'uptime_percentage': round((up / (up + slow + down) * 100), 2) if (up + slow + down) > 0 else 0,
-            'average_response_time': avg_response
+            'average_response_time': round(avg_response, 2) if avg_response is not None else 0
         }
 
     async def _get_snmp_interfaces_async(self, ip_address, community='public', port=161, version='2c',
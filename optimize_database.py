@@ -31,19 +31,25 @@ def optimize_sqlite():
         print("--- Step 1: Creating Indexes ---")
         
         indexes = [
-            ("idx_sh_checked_at", "status_history(checked_at)"),
+            ("idx_sh_checked_at_cover", "status_history(checked_at DESC, status, response_time)"),
             ("idx_sh_device_checked", "status_history(device_id, checked_at)"),
             ("idx_sh_device_status", "status_history(device_id, status, checked_at)"),
             ("idx_ah_device_event", "alert_history(device_id, event_type, created_at)"),
             ("idx_ah_created_at", "alert_history(created_at)"),
             ("idx_devices_type", "devices(device_type)"),
             ("idx_devices_status", "devices(status)"),
+            ("idx_topology_device", "topology(device_id)"),
+            ("idx_topology_connected", "topology(connected_to)"),
+            ("idx_subtop_devices_device", "sub_topology_devices(device_id)"),
+            ("idx_subtop_conn_subtop", "sub_topology_connections(sub_topology_id)"),
         ]
         
         for idx_name, idx_def in indexes:
             s = time.time()
             cursor.execute(f"CREATE INDEX IF NOT EXISTS {idx_name} ON {idx_def}")
             print(f"  {idx_name}: {time.time() - s:.2f}s")
+        # Superseded by idx_sh_checked_at_cover
+        cursor.execute("DROP INDEX IF EXISTS idx_sh_checked_at")
 
         # 2. Prune Old Data
         print("--- Step 2: Pruning Old Data ---")
@@ -54,6 +60,12 @@ def optimize_sqlite():
         cursor.execute("DELETE FROM status_history WHERE checked_at < ?;", (cutoff_date,))
         print(f"  status_history: deleted {cursor.rowcount:,} rows in {time.time() - s:.2f}s")
         
+        # Keep the daily rollup in step with the raw rows (same day cutoff as Database.cleanup_old_data)
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'status_history_daily'")
+        if cursor.fetchone():
+            cursor.execute("DELETE FROM status_history_daily WHERE day < ?;", (cutoff_date[:10],))
+            print(f"  status_history_daily: deleted {cursor.rowcount:,} rows")
+        
         cursor.execute("DELETE FROM alert_history WHERE created_at < ?;", (cutoff_date,))
         print(f"  alert_history: deleted {cursor.rowcount:,} rows")
 
@@ -110,19 +122,25 @@ def optimize_postgresql():
         # 1. Create Indexes
         print("--- Step 1: Creating/Verifying Indexes ---")
         indexes = [
-            ("idx_sh_checked_at", "status_history(checked_at)"),
+            ("idx_sh_checked_at_cover", "status_history(checked_at DESC, status, response_time)"),
             ("idx_sh_device_checked", "status_history(device_id, checked_at)"),
             ("idx_sh_device_status", "status_history(device_id, status, checked_at)"),
             ("idx_ah_device_event", "alert_history(device_id, event_type, created_at)"),
             ("idx_ah_created_at", "alert_history(created_at)"),
             ("idx_devices_type", "devices(device_type)"),
             ("idx_devices_status", "devices(status)"),
+            ("idx_topology_device", "topology(device_id)"),
+            ("idx_topology_connected", "topology(connected_to)"),
+            ("idx_subtop_devices_device", "sub_topology_devices(device_id)"),
+            ("idx_subtop_conn_subtop", "sub_topology_connections(sub_topology_id)"),
         ]
         
         for idx_name, idx_def in indexes:
             s = time.time()
             cursor.execute(f"CREATE INDEX IF NOT EXISTS {idx_name} ON {idx_def}")
             print(f"  {idx_name}: {time.time() - s:.2f}s")
+        # Superseded by idx_sh_checked_at_cover
+        cursor.execute("DROP INDEX IF EXISTS idx_sh_checked_at")
         conn.commit()
         
         # 2. Prune Old Data
@@ -134,6 +152,12 @@ def optimize_postgresql():
         cursor.execute("DELETE FROM status_history WHERE checked_at < %s", (cutoff_date,))
         print(f"  status_history: deleted {cursor.rowcount:,} rows in {time.time() - s:.2f}s")
         
+        # Keep the daily rollup in step with the raw rows (same day cutoff as Database.cleanup_old_data)
+        cursor.execute("SELECT to_regclass('status_history_daily')")
+        if cursor.fetchone()[0]:
+            cursor.execute("DELETE FROM status_history_daily WHERE day < %s", (cutoff_date[:10],))
+            print(f"  status_history_daily: deleted {cursor.rowcount:,} rows")
+        
         cursor.execute("DELETE FROM alert_history WHERE created_at < %s", (cutoff_date,))
         print(f"  alert_history: deleted {cursor.rowcount:,} rows")
         conn.commit()
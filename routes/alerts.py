@@ -3,9 +3,12 @@ Alert settings and history API routes
 """
 from flask import Blueprint, jsonify, request, current_app, session
 from .auth import operator_required
+from .http_cache import etag
 
 alerts_bp = Blueprint('alerts', __name__)
 
+_TEST_ALERT_CHANNELS = frozenset({'email', 'line', 'telegram'})
+
 
 def _get_db():
     return current_app.config['DB']
@@ -20,9 +23,8 @@ def _get_report_generator():
 @alerts_bp.route('/api/alert-settings', methods=['GET'])
 def get_alert_settings():
     """Get all alert settings"""
-    settings = _get_db().get_all_alert_settings()
-    settings_dict = {s['setting_key']: s['setting_value'] for s in settings}
-    return jsonify(settings_dict)
+    # Served from the alerter's cache; saves below invalidate it
+    return jsonify(_get_alerter().get_settings())
 
 
 @alerts_bp.route('/api/alert-settings', methods=['POST'])
@@ -33,13 +35,10 @@ def save_alert_settings():
     if not data:
         return jsonify({'success': False, 'error': 'No data provided'}), 400
     
-    db = _get_db()
-    for key, value in data.items():
-        db.save_alert_setting(key, str(value))
+    _get_db().save_alert_settings_bulk({key: str(value) for key, value in data.items()})
     
     # Clear alerter cache to pick up new settings
-    alerter = _get_alerter()
-    alerter._cache_time = None
+    _get_alerter().invalidate_settings()
     
     return jsonify({'success': True})
 
@@ -48,7 +47,7 @@ def save_alert_settings():
 @operator_required
 def test_alert(channel):
     """Send a test alert to verify configuration"""
-    if channel not in ['email', 'line', 'telegram']:
+    if channel not in _TEST_ALERT_CHANNELS:
         return jsonify({'success': False, 'error': 'Unknown channel'}), 400
     
     result = _get_alerter().send_test_alert(channel)
@@ -56,6 +55,7 @@ def test_alert(channel):
 
 
 @alerts_bp.route('/api/alert-history', methods=['GET'])
+@etag
 def get_alert_history():
     """Get alert history"""
     limit = request.args.get('limit', 100, type=int)
@@ -1,17 +1,33 @@
 """
 Authentication and RBAC routes
 """
-from flask import Blueprint, session, redirect, url_for, render_template, request, jsonify
+from flask import Blueprint, session, redirect, url_for, render_template, request, jsonify, current_app, g
 from functools import wraps
 
 auth_bp = Blueprint('auth', __name__)
 
+_OPERATOR_ROLES = frozenset({'admin', 'operator'})
+_ANONYMOUS = (False, None)
+
+
+def _session_identity():
+    """
+    (logged_in, role) for the current request.
+    Read from the session once and kept on g, so stacked auth decorators
+    don't each go back to the session.
+    """
+    identity = g.get('_auth_identity')
+    if identity is None:
+        identity = ('logged_in' in session, session.get('role')) if session else _ANONYMOUS
+        g._auth_identity = identity
+    return identity
+
 
 def login_required(f):
     """Decorator to require login for routes"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'logged_in' not in session:
+        if not _session_identity()[0]:
             return redirect(url_for('auth.login'))
         return f(*args, **kwargs)
     return decorated_function
@@ -21,9 +37,10 @@ def admin_required(f):
     """Decorator to require admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'logged_in' not in session:
+        logged_in, role = _session_identity()
+        if not logged_in:
             return redirect(url_for('auth.login'))
-        if session.get('role') != 'admin':
+        if role != 'admin':
             return jsonify({'error': 'Admin access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
@@ -33,16 +50,16 @@ def operator_required(f):
     """Decorator to require operator or admin role"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        if 'logged_in' not in session:
+        logged_in, role = _session_identity()
+        if not logged_in:
             return redirect(url_for('auth.login'))
-        if session.get('role') not in ['admin', 'operator']:
+        if role not in _OPERATOR_ROLES:
             return jsonify({'error': 'Operator access required'}), 403
         return f(*args, **kwargs)
     return decorated_function
 
 
 def _get_db():
-    from flask import current_app
     return current_app.config['DB']
 
 
@@ -2,33 +2,70 @@
 Dashboard management API routes
 """
 from flask import Blueprint, jsonify, request, session, current_app
-import json
+import json_codec
 from .auth import login_required, admin_required
 from .audit import log_audit
+from .http_cache import TTLCache
 
 dashboards_bp = Blueprint('dashboards', __name__)
 
+# Encoded dashboard lists per user, dropped on every dashboard write; the TTL
+# only bounds staleness from writers in other processes
+_dashboard_list_cache = TTLCache(ttl=60)
+
+
+def invalidate_dashboard_cache():
+    """Forget cached dashboard lists after a dashboard is created, changed or removed"""
+    _dashboard_list_cache.clear()
+
+
+@dashboards_bp.after_request
+def _invalidate_after_write(response):
+    if request.method != 'GET' and response.status_code < 400:
+        invalidate_dashboard_cache()
+    return response
+
 
 def _get_db():
     return current_app.config['DB']
 
 
+def _decode_json(value, default):
+    """Decode a stored JSON column, falling back to default for empty or legacy bad values"""
+    if not value:
+        return default
+    try:
+        return json_codec.loads(value)
+    except ValueError:
+        return default
+
+
+def _encode_json(value):
+    """
+    Serialize a JSON column for storage.
+    Strings are stored as given but must parse, so reads can't hit bad JSON.
+    """
+    if isinstance(value, (dict, list)):
+        return json_codec.dumps(value)
+    if isinstance(value, str) and value:
+        json_codec.loads(value)
+    return value
+
+
 @dashboards_bp.route('/api/dashboards', methods=['GET'])
 @login_required
 def get_dashboards():
     """Get all dashboards"""
-    db = _get_db()
     user_id = session.get('user_id')
-    dashboards = db.get_dashboards(user_id)
     
-    for d in dashboards:
-        try:
-            if d['layout_config']:
-                d['layout_config'] = json.loads(d['layout_config'])
-        except:
-            d['layout_config'] = []
-            
-    return jsonify(dashboards)
+    def build():
+        dashboards = _get_db().get_dashboards(user_id)
+        for d in dashboards:
+            d['layout_config'] = _decode_json(d['layout_config'], [])
+        return jsonify(dashboards).get_data()
+    
+    body = _dashboard_list_cache.get_or_compute(user_id, build)
+    return current_app.response_class(body, mimetype='application/json')
 
 
 @dashboards_bp.route('/api/dashboards', methods=['POST'])
@@ -40,9 +77,10 @@ def create_dashboard():
     if not data.get('name'):
         return jsonify({'success': False, 'error': 'Name is required'}), 400
         
-    layout_config = data.get('layout_config')
-    if isinstance(layout_config, (dict, list)):
-        layout_config = json.dumps(layout_config)
+    try:
+        layout_config = _encode_json(data.get('layout_config'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'layout_config is not valid JSON'}), 400
     
     result = _get_db().create_dashboard(
         name=data['name'],
@@ -68,11 +106,7 @@ def get_dashboard(dashboard_id):
     if not dashboard['is_public'] and dashboard['created_by'] != session.get('user_id'):
         return jsonify({'error': 'Access denied'}), 403
         
-    try:
-        if dashboard['layout_config']:
-            dashboard['layout_config'] = json.loads(dashboard['layout_config'])
-    except:
-        dashboard['layout_config'] = []
+    dashboard['layout_config'] = _decode_json(dashboard['layout_config'], [])
         
     return jsonify(dashboard)
 
@@ -88,9 +122,10 @@ def update_dashboard(dashboard_id):
     if not dashboard:
         return jsonify({'error': 'Dashboard not found'}), 404
 
-    layout_config = data.get('layout_config')
-    if layout_config is not None and isinstance(layout_config, (dict, list)):
-        layout_config = json.dumps(layout_config)
+    try:
+        layout_config = _encode_json(data.get('layout_config'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'layout_config is not valid JSON'}), 400
         
     result = db.update_dashboard(
         dashboard_id,
@@ -140,16 +175,8 @@ def get_templates():
     templates = _get_db().get_dashboard_templates(category)
     
     for t in templates:
-        try:
-            if t['layout_config']:
-                t['layout_config'] = json.loads(t['layout_config'])
-        except:
-            t['layout_config'] = {}
-        try:
-            if t.get('variables'):
-                t['variables'] = json.loads(t['variables'])
-        except:
-            t['variables'] = {}
+        t['layout_config'] = _decode_json(t['layout_config'], {})
+        t['variables'] = _decode_json(t.get('variables'), {})
     
     return jsonify(templates)
 
@@ -163,13 +190,11 @@ def create_template():
     if not data.get('name'):
         return jsonify({'success': False, 'error': 'Name is required'}), 400
     
-    layout_config = data.get('layout_config')
-    if isinstance(layout_config, (dict, list)):
-        layout_config = json.dumps(layout_config)
-    
-    variables = data.get('variables')
-    if isinstance(variables, dict):
-        variables = json.dumps(variables)
+    try:
+        layout_config = _encode_json(data.get('layout_config'))
+        variables = _encode_json(data.get('variables'))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'layout_config and variables must be valid JSON'}), 400
     
     result = _get_db().create_dashboard_template(
         name=data['name'],
@@ -1,7 +1,8 @@
 """
 Device management API routes
 """
-from flask import Blueprint, jsonify, request, Response, current_app, session
+from flask import Blueprint, jsonify, request, Response, current_app, session, stream_with_context
+import codecs
 import csv
 import io
 import os
@@ -9,9 +10,35 @@ import json
 from datetime import datetime
 from .auth import login_required, operator_required
 from .audit import log_audit
+from .http_cache import etag, cached_response, json_array_response, TTLCache
 
 devices_bp = Blueprint('devices', __name__)
 
+# Dashboards poll statistics from every open tab; share one computation
+_statistics_cache = TTLCache(ttl=5)
+# Encoded device/status/topology bodies, dropped on every change and sweep
+device_response_cache = TTLCache(ttl=5)
+# SNMP interface walks are slow; reuse a walk for the same target for 30s
+_snmp_interfaces_cache = TTLCache(ttl=30)
+
+
+def get_statistics_cached(monitor):
+    """Network statistics, shared for a few seconds across tabs, sockets and the sweep"""
+    return _statistics_cache.get_or_compute((), monitor.get_statistics)
+
+
+def invalidate_device_caches():
+    """Forget cached device reads after devices, statuses or topology change"""
+    _statistics_cache.clear()
+    device_response_cache.clear()
+
+
+@devices_bp.after_request
+def _invalidate_after_write(response):
+    if request.method != 'GET' and response.status_code < 400:
+        invalidate_device_caches()
+    return response
+
 
 def _device_notes_dir():
     """Return the directory used for per-device text notes."""
@@ -105,13 +132,17 @@ def _get_plugin_manager():
 
 
 @devices_bp.route('/api/devices', methods=['GET'])
+@etag
+@cached_response(device_response_cache)
 def get_devices():
     """Get all devices"""
-    devices = _get_db().get_all_devices()
-    for device in devices:
-        if device.get('id') is not None:
-            device['device_note'] = _read_device_note(device['id'])
-    return jsonify(devices)
+    def with_notes(devices):
+        for device in devices:
+            if device.get('id') is not None:
+                device['device_note'] = _read_device_note(device['id'])
+            yield device
+    
+    return json_array_response(with_notes(_get_db().iter_all_devices()))
 
 
 @devices_bp.route('/api/devices', methods=['POST'])
@@ -177,13 +208,14 @@ def add_device():
     )
     
     if result['success']:
+        # add_device hands back the inserted row; keep it out of the response body
+        device = result.pop('device')
         try:
             _write_device_note(result['id'], data.get('device_note', ''))
         except Exception as e:
             current_app.logger.exception('Failed to save note for device %s', result['id'])
             return jsonify({'success': False, 'error': f'Device added but note could not be saved: {e}'}), 500
 
-        device = db.get_device(result['id'])
         # Only run initial check if monitoring is enabled
         if device.get('is_enabled'):
             monitor = _get_monitor()
@@ -317,16 +349,17 @@ def get_device_children(device_id):
 
 
 @devices_bp.route('/api/status', methods=['GET'])
+@etag
+@cached_response(device_response_cache)
 def get_status():
     """Get current status of all devices"""
-    devices = _get_db().get_all_devices()
-    return jsonify(devices)
+    return json_array_response(_get_db().iter_all_devices())
 
 
 @devices_bp.route('/api/statistics', methods=['GET'])
 def get_statistics():
     """Get network statistics"""
-    stats = _get_monitor().get_statistics()
+    stats = get_statistics_cached(_get_monitor())
     return jsonify(stats)
 
 
@@ -342,17 +375,24 @@ def get_snmp_interfaces(device_id):
         return jsonify({'error': 'Device is not SNMP monitored'}), 400
     
     monitor = _get_monitor()
-    interfaces = monitor.get_snmp_interfaces(
+    target = (
         device['ip_address'],
         device.get('snmp_community', 'public'),
         device.get('snmp_port', 161),
         device.get('snmp_version', '2c'),
+    )
+    v3_options = dict(
         snmp_v3_username=device.get('snmp_v3_username'),
         snmp_v3_auth_protocol=device.get('snmp_v3_auth_protocol', 'SHA'),
         snmp_v3_auth_password=device.get('snmp_v3_auth_password'),
         snmp_v3_priv_protocol=device.get('snmp_v3_priv_protocol', 'AES128'),
         snmp_v3_priv_password=device.get('snmp_v3_priv_password')
     )
+    # Keyed on the full SNMP config so an edited device is walked afresh
+    interfaces = _snmp_interfaces_cache.get_or_compute(
+        (device_id, target, tuple(v3_options.values())),
+        lambda: monitor.get_snmp_interfaces(*target, **v3_options)
+    )
     
     return jsonify({
         'device_id': device_id,
@@ -1056,10 +1096,20 @@ def unlink_anomaly_incident(anomaly_key):
 # CSV Import/Export
 # ============================================================================
 
+_EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+class _Echo:
+    """File-like object whose write() hands the line back, for streaming csv.writer output"""
+    
+    def write(self, value):
+        return value
+
+
 @devices_bp.route('/api/devices/export/csv', methods=['GET'])
 def export_devices_csv():
-    """Export all devices as CSV"""
-    devices = _get_db().get_all_devices()
+    """Export all devices as CSV (streamed in chunks)"""
+    db = _get_db()
     
     fieldnames = [
         'name', 'ip_address', 'device_type', 'location', 'location_type',
@@ -1068,23 +1118,43 @@ def export_devices_csv():
         'tcp_port', 'dns_query_domain', 'expected_status_code'
     ]
     
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
-    
-    for device in devices:
-        row = {k: device.get(k, '') for k in fieldnames}
-        writer.writerow(row)
+    def generate():
+        # DictWriter picks the export columns itself; no per-row dict copy needed
+        writer = csv.DictWriter(_Echo(), fieldnames=fieldnames, restval='', extrasaction='ignore')
+        # Rows are sent in ~64 KiB UTF-8 chunks rather than one socket write each
+        pending = [writer.writeheader()]
+        size = 0
+        
+        count = 0
+        for device in db.iter_all_devices():
+            count += 1
+            line = writer.writerow(device)
+            pending.append(line)
+            size += len(line)
+            if size >= _EXPORT_CHUNK_SIZE:
+                yield ''.join(pending).encode('utf-8')
+                pending.clear()
+                size = 0
+        yield ''.join(pending).encode('utf-8')
+        
+        log_audit('export', 'device', details={'format': 'csv', 'count': count})
     
-    output.seek(0)
-    log_audit('export', 'device', details={'format': 'csv', 'count': len(devices)})
     return Response(
-        output.getvalue(),
+        stream_with_context(generate()),
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment; filename=devices_export.csv'}
     )
 
 
+def _check_new_devices(db, monitor, socketio):
+    """Run first checks for enabled devices that were never checked (e.g. after an import)"""
+    devices = [device for device in db.get_enabled_devices() if not device.get('last_check')]
+    statuses = monitor.check_devices(devices)
+    if statuses:
+        invalidate_device_caches()
+        socketio.emit('status_update_bulk', statuses, namespace='/')
+
+
 @devices_bp.route('/api/devices/import/csv', methods=['POST'])
 @operator_required
 def import_devices_csv():
@@ -1100,8 +1170,11 @@ def import_devices_csv():
         return jsonify({'success': False, 'error': 'File must be a CSV'}), 400
     
     try:
-        content = file.stream.read().decode('utf-8')
-        reader = csv.DictReader(io.StringIO(content))
+        # Decode and parse straight off the upload stream instead of buffering the body.
+        # A codecs reader works on every upload stream type; TextIOWrapper needs readable(),
+        # which SpooledTemporaryFile only gained in Python 3.11.
+        text = codecs.getreader('utf-8')(file.stream)
+        reader = csv.DictReader(text)
         
         db = _get_db()
         results = {
@@ -1111,6 +1184,17 @@ def import_devices_csv():
             'errors': []
         }
         
+        batch = []  # (row number, add_device kwargs)
+        
+        def flush():
+            for (row_number, _), result in zip(batch, db.add_devices_bulk([kwargs for _, kwargs in batch])):
+                if result['success']:
+                    results['imported'] += 1
+                else:
+                    results['failed'] += 1
+                    results['errors'].append(f"Row {row_number}: {result.get('error', 'Unknown error')}")
+            batch.clear()
+        
         for i, row in enumerate(reader, start=2):
             name = row.get('name', '').strip()
             ip_address = row.get('ip_address', '').strip()
@@ -1127,29 +1211,36 @@ def import_devices_csv():
             else:
                 is_enabled = is_enabled_raw in ('true', '1', 'yes', 'on', 'enabled')
 
-            result = db.add_device(
-                name=name,
-                ip_address=ip_address,
-                device_type=row.get('device_type', '').strip() or 'server',
-                location=row.get('location', '').strip() or None,
-                location_type=row.get('location_type', '').strip() or 'on-premise',
-                monitor_type=row.get('monitor_type', '').strip() or 'ping',
-                snmp_community=row.get('snmp_community', '').strip() or 'public',
-                snmp_port=int(row.get('snmp_port') or 161),
-                snmp_version=row.get('snmp_version', '').strip() or '2c',
-                tcp_port=int(row.get('tcp_port') or 80),
-                dns_query_domain=row.get('dns_query_domain', '').strip() or 'google.com',
-                expected_status_code=int(row.get('expected_status_code') or 200),
-                is_enabled=is_enabled
-            )
-            
-            if result['success']:
-                results['imported'] += 1
-            else:
+            try:
+                batch.append((i, dict(
+                    name=name,
+                    ip_address=ip_address,
+                    device_type=row.get('device_type', '').strip() or 'server',
+                    location=row.get('location', '').strip() or None,
+                    location_type=row.get('location_type', '').strip() or 'on-premise',
+                    monitor_type=row.get('monitor_type', '').strip() or 'ping',
+                    snmp_community=row.get('snmp_community', '').strip() or 'public',
+                    snmp_port=int(row.get('snmp_port') or 161),
+                    snmp_version=row.get('snmp_version', '').strip() or '2c',
+                    tcp_port=int(row.get('tcp_port') or 80),
+                    dns_query_domain=row.get('dns_query_domain', '').strip() or 'google.com',
+                    expected_status_code=int(row.get('expected_status_code') or 200),
+                    is_enabled=is_enabled
+                )))
+            except ValueError as e:
                 results['failed'] += 1
-                results['errors'].append(f"Row {i}: {result.get('error', 'Unknown error')}")
+                results['errors'].append(f"Row {i}: {e}")
+                continue
+            
+            # One transaction per 1000 rows keeps memory bounded on large files
+            if len(batch) >= 1000:
+                flush()
+        flush()
         
         log_audit('import', 'device', details={'imported': results['imported'], 'failed': results['failed']})
+        if results['imported']:
+            socketio = _get_socketio()
+            socketio.start_background_task(_check_new_devices, db, _get_monitor(), socketio)
         return jsonify(results)
         
     except Exception as e:
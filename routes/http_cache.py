@@ -0,0 +1,171 @@
+"""
+Caching and response helpers for read-only API routes
+"""
+import hashlib
+import threading
+import time
+from functools import wraps
+from flask import request, make_response, current_app, stream_with_context
+
+# JSON array bodies larger than this are streamed instead of buffered
+STREAM_THRESHOLD_BYTES = 256 * 1024
+
+
+def etag(f):
+    """
+    Decorator adding a strong ETag (hash of the JSON body) to GET responses.
+    A matching If-None-Match gets 304 Not Modified with no body, so polling
+    clients skip the download when nothing changed.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        if request.method != 'GET' or response.status_code != 200 or response.is_streamed:
+            return response
+        
+        response.set_etag(hashlib.blake2b(response.get_data(), digest_size=16).hexdigest())
+        response.headers['Cache-Control'] = 'private, must-revalidate'
+        return response.make_conditional(request)
+    return decorated_function
+
+
+def etag_from(marker):
+    """
+    Decorator for GET routes whose body is determined by a cheap marker,
+    e.g. the newest row timestamp. marker(*args, **kwargs) is called first;
+    when its ETag matches If-None-Match the route body is never built.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            state = (request.full_path, marker(*args, **kwargs))
+            tag = hashlib.blake2b(repr(state).encode('utf-8'), digest_size=16).hexdigest()
+            if request.if_none_match.contains(tag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag)
+            response.headers['Cache-Control'] = 'private, must-revalidate'
+            return response
+        return decorated_function
+    return decorator
+
+
+def cached_response(cache):
+    """
+    Decorator keeping successful GET bodies in a TTLCache, keyed by path and
+    query string. Repeat polls within the TTL skip the DB and the encode;
+    place it under @etag so cached bodies still answer 304s.
+    Streamed and non-200 responses are passed through uncached.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            fresh = []
+            
+            def compute():
+                response = make_response(f(*args, **kwargs))
+                fresh.append(response)
+                if response.status_code != 200 or response.is_streamed:
+                    return None
+                return response.get_data(), response.mimetype
+            
+            entry = cache.get_or_compute(request.full_path, compute)
+            if fresh:
+                return fresh[0]
+            if entry is None:
+                return f(*args, **kwargs)
+            body, mimetype = entry
+            return current_app.response_class(body, mimetype=mimetype)
+        return decorated_function
+    return decorator
+
+
+def _encode_json_array(rows, dumps):
+    """Yield a JSON array one encoded row at a time"""
+    try:
+        yield '['
+        separator = ''
+        for row in rows:
+            yield separator + dumps(row)
+            separator = ','
+        yield ']\n'
+    finally:
+        close = getattr(rows, 'close', None)
+        if close:
+            close()
+
+
+def json_array_response(rows, threshold=STREAM_THRESHOLD_BYTES):
+    """
+    Build a JSON array response from an iterable of rows.
+    Small results are buffered so @etag can still answer 304s; once the
+    encoded body passes threshold bytes the rest is streamed, so large
+    fleets never hold the whole list (or its encoding) in memory.
+    """
+    chunks = _encode_json_array(rows, current_app.json.dumps)
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= threshold:
+            def body():
+                try:
+                    yield from head
+                    yield from chunks
+                finally:
+                    chunks.close()
+            return current_app.response_class(stream_with_context(body()), mimetype='application/json')
+    return current_app.response_class(''.join(head), mimetype='application/json')
+
+
+class TTLCache:
+    """
+    Small in-process cache for expensive, shared read results.
+    Entries expire after ttl seconds. Concurrent misses on the same key
+    are single-flighted: one caller computes while the others wait for it.
+    """
+    
+    def __init__(self, ttl, maxsize=128, stripes=16):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._compute_locks = [threading.Lock() for _ in range(stripes)]
+    
+    def _lookup(self, key, now):
+        with self._lock:
+            entry = self._data.get(key)
+        if entry and entry[0] > now:
+            return True, entry[1]
+        return False, None
+    
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, calling compute() on a miss"""
+        hit, value = self._lookup(key, time.monotonic())
+        if hit:
+            return value
+        
+        with self._compute_locks[hash(key) % len(self._compute_locks)]:
+            # Another caller may have filled the entry while we waited
+            hit, value = self._lookup(key, time.monotonic())
+            if hit:
+                return value
+            value = compute()
+            now = time.monotonic()
+            with self._lock:
+                if len(self._data) >= self.maxsize:
+                    for stale in [k for k, (expires, _) in self._data.items() if expires <= now]:
+                        del self._data[stale]
+                    if len(self._data) >= self.maxsize:
+                        self._data.pop(next(iter(self._data)))
+                self._data[key] = (now + self.ttl, value)
+            return value
+    
+    def clear(self):
+        """Drop every cached entry"""
+        with self._lock:
+            self._data.clear()
@@ -4,6 +4,7 @@ Maintenance windows API routes
 from flask import Blueprint, jsonify, request, current_app
 from .auth import operator_required
 from .audit import log_audit
+from .http_cache import etag
 
 maintenance_bp = Blueprint('maintenance', __name__)
 
@@ -11,8 +12,12 @@ maintenance_bp = Blueprint('maintenance', __name__)
 def _get_db():
     return current_app.config['DB']
 
+def _get_alerter():
+    return current_app.config['ALERTER']
+
 
 @maintenance_bp.route('/api/maintenance', methods=['GET'])
+@etag
 def get_maintenance_windows():
     """Get all maintenance windows"""
     windows = _get_db().get_all_maintenance_windows()
@@ -38,6 +43,7 @@ def add_maintenance_window():
     )
     
     if result['success']:
+        _get_alerter().invalidate_maintenance()
         log_audit('create', 'maintenance', 'maintenance', result.get('id'), data['name'])
         return jsonify(result), 201
     return jsonify(result), 400
@@ -48,6 +54,7 @@ def add_maintenance_window():
 def delete_maintenance_window(window_id):
     """Delete a maintenance window"""
     result = _get_db().delete_maintenance_window(window_id)
+    _get_alerter().invalidate_maintenance()
     log_audit('delete', 'maintenance', 'maintenance', window_id)
     return jsonify(result)
 
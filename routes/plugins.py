@@ -135,20 +135,19 @@ def save_plugin_integration_settings(plugin_id):
     for key in secret_keys:
         normalized_config.pop(key, None)
 
-    db.save_alert_setting(f'plugin_integration_{plugin_id}_enabled', 'true' if enabled else 'false')
-    db.save_alert_setting(
-        f'plugin_integration_{plugin_id}_config_json',
-        json.dumps(normalized_config, ensure_ascii=False)
-    )
-
+    settings = {
+        f'plugin_integration_{plugin_id}_enabled': 'true' if enabled else 'false',
+        f'plugin_integration_{plugin_id}_config_json': json.dumps(normalized_config, ensure_ascii=False),
+    }
     for key in secret_keys:
         secret_setting_key = _integration_secret_setting_key(plugin_id, key)
         if key in secrets_to_clear:
-            db.save_alert_setting(secret_setting_key, '')
+            settings[secret_setting_key] = ''
         elif key in secrets_to_store:
-            db.save_alert_setting(secret_setting_key, encrypt_secret(secrets_to_store[key]))
+            settings[secret_setting_key] = encrypt_secret(secrets_to_store[key])
+    db.save_alert_settings_bulk(settings)
 
-    _get_alerter()._cache_time = None
+    _get_alerter().invalidate_settings()
     runtime = _load_integration_runtime(plugin)
     return jsonify({
         'success': True,
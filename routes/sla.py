@@ -1,16 +1,40 @@
 """
 SLA and historical data API routes
 """
+import calendar
+import re
+from datetime import datetime
 from flask import Blueprint, jsonify, request, current_app
+from .http_cache import etag, etag_from, TTLCache
 
 sla_bp = Blueprint('sla', __name__)
 
+# SLA aggregates scan N days of history; recompute at most once a minute per query
+_sla_cache = TTLCache(ttl=60)
+
+# Comma-separated device ids; entries that aren't plain integers are skipped
+_DEVICE_IDS_RE = re.compile(r'(?:^|,)\s*(\d+)\s*(?=,|$)', re.ASCII)
+_MAX_DEVICE_IDS_LEN = 64 * 1024
+
 
 def _get_db():
     return current_app.config['DB']
 
 
+def _device_history_marker(device_id):
+    """Cheap state for the history ETag: newest and oldest row in the window"""
+    minutes = request.args.get('minutes', type=int)
+    sample_count = request.args.get('sample', type=int)
+    marker = _get_db().get_device_history_marker(device_id, minutes)
+    if minutes and sample_count:
+        # Sampled series are padded up to the current bucket, so they also move with time
+        bucket_size_sec = max(1, (minutes * 60) / sample_count)
+        marker += (int(calendar.timegm(datetime.now().timetuple()) / bucket_size_sec),)
+    return marker
+
+
 @sla_bp.route('/api/devices/<int:device_id>/history', methods=['GET'])
+@etag_from(_device_history_marker)
 def get_device_history(device_id):
     """Get status history for a device"""
     limit = request.args.get('limit', 150, type=int)
@@ -19,7 +43,6 @@ def get_device_history(device_id):
     history = _get_db().get_device_history(device_id, limit, minutes, sample_count)
     
     # Normalize datetime objects to ISO strings to prevent Flask from appending 'GMT' and shifting timezones
-    from datetime import datetime
     for item in history:
         if isinstance(item.get('checked_at'), datetime):
             item['checked_at'] = item['checked_at'].isoformat()
@@ -28,6 +51,7 @@ def get_device_history(device_id):
 
 
 @sla_bp.route('/api/history', methods=['GET'])
+@etag
 def get_historical_data():
     """Get historical data with optional filters"""
     db = _get_db()
@@ -38,7 +62,9 @@ def get_historical_data():
     device_type = request.args.get('device_type')
     
     if device_ids:
-        device_id_list = [int(x.strip()) for x in device_ids.split(',') if x.strip().isdigit()]
+        if len(device_ids) > _MAX_DEVICE_IDS_LEN:
+            return jsonify({'error': 'device_ids is too long'}), 400
+        device_id_list = list(map(int, _DEVICE_IDS_RE.findall(device_ids)))
         history = db.get_historical_data_multi(start_date, end_date, device_id_list)
     else:
         history = db.get_historical_data(start_date, end_date, device_id, device_type)
@@ -55,27 +81,47 @@ def get_historical_stats():
 
 
 @sla_bp.route('/api/sla', methods=['GET'])
+@etag
 def get_sla_data():
     """Get SLA data for all devices"""
-    db = _get_db()
     days = request.args.get('days', 30, type=int)
     sla_target = request.args.get('target', 99.9, type=float)
-    
+    return jsonify(build_sla_payload(_get_db(), days, sla_target))
+
+
+def build_sla_payload(db, days, sla_target):
+    """SLA payload for the given window and target, shared for a minute across callers"""
+    return _sla_cache.get_or_compute((days, sla_target), lambda: _build_sla_payload(db, days, sla_target))
+
+
+def _build_sla_payload(db, days, sla_target):
+    """Aggregate SLA data for all devices plus the fleet summary"""
     sla_data = db.get_all_devices_sla(days=days, sla_target=sla_target)
     
-    devices_with_data = [d for d in sla_data if d['uptime_percent'] is not None]
+    # Single pass over the device list for all summary figures
+    counts = {'met': 0, 'warning': 0, 'breached': 0}
+    with_data = 0
+    uptime_total = 0.0
+    for d in sla_data:
+        if d['uptime_percent'] is None:
+            continue
+        with_data += 1
+        uptime_total += d['uptime_percent']
+        if d['sla_status'] in counts:
+            counts[d['sla_status']] += 1
+    
     summary = {
         'total_devices': len(sla_data),
-        'devices_with_data': len(devices_with_data),
-        'sla_met': len([d for d in devices_with_data if d['sla_status'] == 'met']),
-        'sla_warning': len([d for d in devices_with_data if d['sla_status'] == 'warning']),
-        'sla_breached': len([d for d in devices_with_data if d['sla_status'] == 'breached']),
-        'average_uptime': round(sum(d['uptime_percent'] for d in devices_with_data) / len(devices_with_data), 4) if devices_with_data else None,
+        'devices_with_data': with_data,
+        'sla_met': counts['met'],
+        'sla_warning': counts['warning'],
+        'sla_breached': counts['breached'],
+        'average_uptime': round(uptime_total / with_data, 4) if with_data else None,
         'days': days,
         'sla_target': sla_target
     }
     
-    return jsonify({'summary': summary, 'devices': sla_data})
+    return {'summary': summary, 'devices': sla_data}
 
 
 @sla_bp.route('/api/sla/<int:device_id>', methods=['GET'])
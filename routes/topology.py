@@ -6,6 +6,8 @@ import os
 import uuid
 from .auth import login_required, operator_required
 from .audit import log_audit
+from .http_cache import etag, cached_response
+from .devices import device_response_cache, invalidate_device_caches
 
 topology_bp = Blueprint('topology', __name__)
 
@@ -17,13 +19,19 @@ def _get_socketio():
     return current_app.config['SOCKETIO']
 
 
+@topology_bp.after_request
+def _invalidate_after_write(response):
+    if request.method != 'GET' and response.status_code < 400:
+        invalidate_device_caches()
+    return response
+
+
 @topology_bp.route('/api/topology', methods=['GET'])
+@etag
+@cached_response(device_response_cache)
 def get_topology():
     """Get topology configuration"""
-    db = _get_db()
-    devices = db.get_all_devices()
-    connections = db.get_topology()
-    return jsonify({'devices': devices, 'connections': connections})
+    return jsonify(_get_db().get_topology_snapshot())
 
 
 @topology_bp.route('/api/topology/connection', methods=['POST'])
@@ -57,6 +65,45 @@ def add_topology_connection():
         return jsonify(result), 400
 
 
+@topology_bp.route('/api/topology/connections', methods=['POST'])
+@operator_required
+def add_topology_connections():
+    """Add many topology connections at once (e.g. when importing a layout)"""
+    data = request.json
+    if not isinstance(data, list):
+        return jsonify({'success': False, 'error': 'Expected a list of connections'}), 400
+    
+    connections = []
+    for item in data:
+        if not isinstance(item, dict) or not item.get('device_id') or not item.get('connected_to'):
+            return jsonify({'success': False, 'error': 'device_id and connected_to are required'}), 400
+        connections.append({
+            'device_id': item['device_id'],
+            'connected_to': item['connected_to'],
+            'view_type': item.get('view_type', 'standard')
+        })
+    
+    results = _get_db().add_topology_connections_bulk(connections)
+    added = [
+        dict(connection, id=result['id'])
+        for connection, result in zip(connections, results) if result.get('success')
+    ]
+    
+    if added:
+        _get_socketio().emit('topology_updated', {
+            'action': 'add_bulk',
+            'connections': added
+        }, namespace='/')
+        log_audit('create', 'topology', 'connections', details={'count': len(added)})
+    
+    return jsonify({
+        'success': True,
+        'added': len(added),
+        'failed': len(results) - len(added),
+        'results': results
+    }), 201 if added else 200
+
+
 @topology_bp.route('/api/topology/connection/<int:connection_id>', methods=['DELETE'])
 @operator_required
 def delete_topology_connection(connection_id):
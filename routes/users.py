@@ -2,6 +2,7 @@
 User management API routes (Admin only)
 """
 from flask import Blueprint, jsonify, request, session, current_app
+from werkzeug.security import check_password_hash
 from .auth import login_required, admin_required, operator_required
 from .audit import log_audit
 import pyotp
@@ -124,7 +125,6 @@ def change_my_password():
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
     
-    from werkzeug.security import check_password_hash
     if not check_password_hash(user['password_hash'], data['current_password']):
         return jsonify({'success': False, 'error': 'Current password incorrect'}), 401
     
@@ -219,7 +219,6 @@ def mfa_disable():
     if not user:
         return jsonify({'success': False, 'error': 'User not found'}), 404
     
-    from werkzeug.security import check_password_hash
     if not check_password_hash(user['password_hash'], password):
         return jsonify({'success': False, 'error': 'Password incorrect'}), 401
     
@@ -20,7 +20,7 @@ logging.basicConfig(
 logger = logging.getLogger('NetworkMonitor')
 
 # Import app after monkey patching
-from app import app, socketio
+from app import app, socketio, start_services
 from config import Config
 
 if __name__ == '__main__':
@@ -35,6 +35,7 @@ if __name__ == '__main__':
     logger.info(f"Started at: {datetime.now().isoformat()}")
     logger.info("=" * 60)
     
+    start_services()
     socketio.run(
         app,
         host=Config.SERVER_HOST,
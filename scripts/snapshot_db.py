@@ -0,0 +1,34 @@
+"""
+Take a consistent copy of the SQLite database while the server is running
+
+    python scripts/snapshot_db.py [target.db]
+
+Copying network_monitor.db with the file system during a live run can catch a
+half-written page or miss rows still in the WAL; the backup API does not.
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database
+
+
+def snapshot(target=None):
+    target = target or f"network_monitor_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+    db = Database()
+    try:
+        result = db.backup_to(target)
+    finally:
+        db.close_pool()
+    if result['success']:
+        print(f"Snapshot written to {result['path']}")
+    else:
+        print(f"Snapshot failed: {result['error']}")
+    return result
+
+
+if __name__ == '__main__':
+    result = snapshot(sys.argv[1] if len(sys.argv) > 1 else None)
+    sys.exit(0 if result['success'] else 1)
@@ -1183,7 +1183,7 @@ function setupSocketListeners() {
     });
 
     let debounceTimer;
-    socket.on('status_update', (data) => {
+    const applyStatus = (data) => {
         // Prevent console spam
         // console.log('Status update:', data);
 
@@ -1205,7 +1205,10 @@ function setupSocketListeners() {
         debounceTimer = setTimeout(() => {
             filterDevices(); // Re-render table with updated status
         }, 500);
-    });
+    };
+
+    socket.on('status_update', applyStatus);
+    socket.on('status_update_bulk', (payload) => payload.forEach(applyStatus));
 
     socket.on('device_deleted', (data) => {
         console.log('Device deleted:', data);
@@ -543,7 +543,9 @@ async function loadAlertHistory() {
             const eventBadge = getEventBadge(alert.event_type);
             const statusBadge = alert.status === 'sent'
                 ? '<span class="status-badge status-up">Sent</span>'
-                : '<span class="status-badge status-down">Failed</span>';
+                : alert.status === 'queued'
+                    ? '<span class="status-badge status-slow">Queued</span>'
+                    : '<span class="status-badge status-down">Failed</span>';
             const channelIcon = getChannelIcon(alert.channel);
 
             html += `
@@ -626,7 +626,7 @@ function handleSubTopoFullscreenChange() {
 function setupSocketListeners() {
     let debounceTimer;
 
-    socket.on('status_update', (data) => {
+    const applyStatus = (data) => {
         if (!subTopoData) return;
         const device = subTopoData.devices.find(d => d.id === data.id);
         if (!device) return;
@@ -688,7 +688,10 @@ function setupSocketListeners() {
         debounceTimer = setTimeout(() => {
             updateStats();
         }, 300);
-    });
+    };
+
+    socket.on('status_update', applyStatus);
+    socket.on('status_update_bulk', (payload) => payload.forEach(applyStatus));
 }
 
 // ========================================
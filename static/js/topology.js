@@ -989,6 +989,10 @@ function setupSocketListeners() {
         updateNodeStatus(data);
     });
 
+    socket.on('status_update_bulk', (payload) => {
+        payload.forEach(updateNodeStatus);
+    });
+
     socket.on('device_deleted', (data) => {
         console.log('Device deleted:', data);
         nodes.remove(data.id);
@@ -3,20 +3,40 @@ Enhanced Task Scheduler for Network Monitor
 Wraps APScheduler with job management, history tracking, and admin API support
 """
 from apscheduler.schedulers.blocking import BlockingScheduler
-from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.executors.base import BaseExecutor, run_job
 from datetime import datetime
+import sys
 import traceback
 import async_runtime
 
 
+class GreenletExecutor(BaseExecutor):
+    """
+    APScheduler executor that runs each job as a greenlet on the shared hub.
+    Jobs (and their SocketIO emits) run next to the web server instead of
+    being handed to a separate worker pool.
+    """
+    
+    def _do_submit_job(self, job, run_times):
+        def callback(green_thread):
+            try:
+                events = green_thread.wait()
+            except BaseException:
+                self._run_job_error(job.id, *sys.exc_info()[1:])
+            else:
+                self._run_job_success(job.id, events)
+        
+        async_runtime.spawn(run_job, job, job._jobstore_alias, run_times, self._logger.name).link(callback)
+
+
 class TaskScheduler:
     """Enhanced scheduler with job management and execution history"""
     
     def __init__(self, db):
-        # Use BlockingScheduler with a single-thread executor to ensure all jobs
-        # run within the same greenlet context, avoiding thread-switching errors
+        # Use BlockingScheduler with a greenlet executor so all jobs run
+        # within the same hub as SocketIO, avoiding thread-switching errors
         executors = {
-            'default': ThreadPoolExecutor(2)
+            'default': GreenletExecutor()
         }
         job_defaults = {
             'coalesce': True,
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta
 import unittest
+from unittest.mock import patch
 
 from alerter import Alerter
 
@@ -8,6 +9,8 @@ class FakeAlertDB:
     def __init__(self):
         self.settings = {}
         self.last_alerts = {}
+        self.maintenance_checks = 0
+        self.maintenance = []
 
     def get_all_alert_settings(self):
         return [
@@ -15,8 +18,9 @@ class FakeAlertDB:
             for key, value in self.settings.items()
         ]
 
-    def is_device_in_maintenance(self, device_id):
-        return False
+    def get_pending_maintenance(self, device_id):
+        self.maintenance_checks += 1
+        return list(self.maintenance)
 
     def is_parent_device_down(self, device_id):
         return None
@@ -47,6 +51,53 @@ class AlertCooldownTests(unittest.TestCase):
 
         self.assertTrue(self.alerter.should_alert(1, 'ssl_expiry'))
 
+    def test_in_memory_lock_blocks_repeat_and_expires_old_entries(self):
+        self.alerter._mark_alert_sent(1, 'down')
+
+        self.assertFalse(self.alerter.should_alert(1, 'down'))
+
+        self.alerter._recent_alerts[(1, 'down')] -= self.alerter._recent_alert_ttl + 1
+        self.alerter._mark_alert_sent(2, 'down')
+
+        self.assertNotIn((1, 'down'), self.alerter._recent_alerts)
+        self.assertIn((2, 'down'), self.alerter._recent_alerts)
+
+    def test_in_memory_lock_short_circuits_before_database_checks(self):
+        self.alerter._mark_alert_sent(1, 'down')
+
+        self.assertFalse(self.alerter.should_alert(1, 'down'))
+        self.assertEqual(self.db.maintenance_checks, 0)
+
+    def test_maintenance_lookup_is_cached_until_invalidated(self):
+        self.assertTrue(self.alerter.should_alert(1, 'down'))
+        self.assertTrue(self.alerter.should_alert(1, 'down'))
+        self.assertEqual(self.db.maintenance_checks, 1)
+
+        self.alerter.invalidate_maintenance()
+        self.assertTrue(self.alerter.should_alert(1, 'down'))
+        self.assertEqual(self.db.maintenance_checks, 2)
+
+    def test_cached_window_takes_effect_when_it_starts(self):
+        start = datetime(2026, 1, 1, 2, 0)
+        self.db.maintenance.append({
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(hours=1)).isoformat(),
+        })
+        clock = [start - timedelta(seconds=5)]
+
+        class FakeDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock[0]
+
+        with patch('alerter.datetime', FakeDatetime):
+            self.assertFalse(self.alerter._is_in_maintenance(1))
+            clock[0] = start + timedelta(seconds=1)
+            self.assertTrue(self.alerter._is_in_maintenance(1))
+            clock[0] = start + timedelta(hours=2)
+            self.assertFalse(self.alerter._is_in_maintenance(1))
+
+        self.assertEqual(self.db.maintenance_checks, 1)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,418 @@
+import smtplib
+
+from alerter import Alerter
+
+
+class FakeDB:
+    def __init__(self, settings=None):
+        self.settings = settings or {}
+
+    def get_all_alert_settings(self):
+        return [
+            {'setting_key': key, 'setting_value': value}
+            for key, value in self.settings.items()
+        ]
+
+
+def test_settings_are_cached_until_invalidated():
+    class CountingDB(FakeDB):
+        reads = 0
+
+        def get_all_alert_settings(self):
+            self.reads += 1
+            return super().get_all_alert_settings()
+
+    db = CountingDB({'email_enabled': 'true'})
+    alerter = Alerter(db)
+
+    assert alerter.get_settings() == {'email_enabled': 'true'}
+    alerter.get_settings()['email_enabled'] = 'false'
+    assert alerter.get_settings() == {'email_enabled': 'true'}
+    assert db.reads == 1
+
+    db.settings['email_enabled'] = 'false'
+    alerter.invalidate_settings()
+    assert alerter.get_settings() == {'email_enabled': 'false'}
+    assert db.reads == 2
+
+
+
+def test_settings_cache_follows_database_writes(tmp_path, monkeypatch):
+    from config import Config
+    from database import Database
+
+    monkeypatch.setattr(Config, 'DB_TYPE', 'sqlite')
+    db = Database(str(tmp_path / 'monitor.db'))
+    alerter = Alerter(db)
+    assert alerter.get_settings().get('last_daily_report_date') is None
+
+    # Written outside the alert-settings routes, e.g. by the report scheduler
+    db.save_alert_setting('last_daily_report_date', '2026-01-01')
+
+    assert alerter.get_settings()['last_daily_report_date'] == '2026-01-01'
+    db.close_pool()
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.port = port
+        self.sent = []
+        self.logins = 0
+        self.closed = False
+        self.noop_code = 250
+        self.refused = set()
+        FakeSMTP.instances.append(self)
+
+    def ehlo(self):
+        return (250, b'ok')
+
+    def starttls(self):
+        return (220, b'ok')
+
+    def login(self, user, password):
+        self.logins += 1
+
+    def noop(self):
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected('closed')
+        return (self.noop_code, b'ok')
+
+    def sendmail(self, from_addr, to_addrs, msg):
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected('closed')
+        self.sent.append(msg)
+        return {addr: (550, b'No such user') for addr in to_addrs if addr in self.refused}
+
+    def quit(self):
+        self.closed = True
+
+    def close(self):
+        self.closed = True
+
+
+def _email_settings():
+    return {
+        'smtp_server': 'smtp.example.com',
+        'smtp_port': '587',
+        'smtp_user': 'alerts@example.com',
+        'smtp_password': 'secret',
+        'email_recipient': 'ops@example.com',
+    }
+
+
+def test_send_email_reuses_authenticated_smtp_session(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr('alerter.smtplib.SMTP', FakeSMTP)
+    alerter = Alerter(FakeDB(_email_settings()))
+
+    assert alerter.send_email('one', 'first')['success'] is True
+    assert alerter.send_email('two', 'second')['success'] is True
+
+    assert len(FakeSMTP.instances) == 1
+    assert FakeSMTP.instances[0].logins == 1
+    assert len(FakeSMTP.instances[0].sent) == 2
+
+
+def test_send_email_reports_partially_refused_recipients(monkeypatch):
+    class RefusingSMTP(FakeSMTP):
+        def __init__(self, host, port, timeout=None):
+            super().__init__(host, port, timeout)
+            self.refused = {'bad@example.com'}
+
+    FakeSMTP.instances = []
+    monkeypatch.setattr('alerter.smtplib.SMTP', RefusingSMTP)
+    alerter = Alerter(FakeDB(_email_settings()))
+
+    result = alerter.send_email('one', 'first', recipient='ops@example.com, bad@example.com')
+
+    assert result['success'] is True
+    assert result['partial'] == ['bad@example.com']
+    assert len(FakeSMTP.instances[0].sent) == 1
+    assert isinstance(FakeSMTP.instances[0].sent[0], bytes)
+
+
+def test_send_email_reconnects_when_cached_session_is_dropped(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr('alerter.smtplib.SMTP', FakeSMTP)
+    alerter = Alerter(FakeDB(_email_settings()))
+
+    assert alerter.send_email('one', 'first')['success'] is True
+    FakeSMTP.instances[0].closed = True
+    assert alerter.send_email('two', 'second')['success'] is True
+
+    assert len(FakeSMTP.instances) == 2
+    assert len(FakeSMTP.instances[1].sent) == 1
+
+    alerter.close()
+    assert FakeSMTP.instances[1].closed is True
+
+
+def test_send_email_does_not_resend_after_server_rejects_data(monkeypatch):
+    class RejectingSMTP(FakeSMTP):
+        def sendmail(self, from_addr, to_addrs, msg):
+            self.sent.append(msg)
+            raise smtplib.SMTPDataError(554, b'Message rejected')
+
+    FakeSMTP.instances = []
+    monkeypatch.setattr('alerter.smtplib.SMTP', RejectingSMTP)
+    alerter = Alerter(FakeDB(_email_settings()))
+
+    result = alerter.send_email('one', 'first')
+
+    assert result['success'] is False
+    assert 'SMTP error' in result['error']
+    assert len(FakeSMTP.instances) == 1
+    assert len(FakeSMTP.instances[0].sent) == 1
+
+
+def test_send_email_rotates_session_after_message_cap(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr('alerter.smtplib.SMTP', FakeSMTP)
+    settings = _email_settings()
+    settings['smtp_max_per_conn'] = '2'
+    alerter = Alerter(FakeDB(settings))
+
+    for index in range(3):
+        assert alerter.send_email(f'alert {index}', 'body')['success'] is True
+
+    assert len(FakeSMTP.instances) == 2
+    assert FakeSMTP.instances[0].closed is True
+    assert len(FakeSMTP.instances[0].sent) == 2
+    assert len(FakeSMTP.instances[1].sent) == 1
+
+
+def test_send_email_rotates_idle_session(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr('alerter.smtplib.SMTP', FakeSMTP)
+    settings = _email_settings()
+    settings['smtp_idle_seconds'] = '120'
+    alerter = Alerter(FakeDB(settings))
+
+    assert alerter.send_email('one', 'first')['success'] is True
+    alerter._smtp_last_used -= 121
+    assert alerter.send_email('two', 'second')['success'] is True
+
+    assert len(FakeSMTP.instances) == 2
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload):
+        self.status_code = status_code
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def test_telegram_waits_retry_after_and_retries_once_on_429(monkeypatch):
+    calls = []
+    sleeps = []
+
+    def fake_post(url, data, timeout):
+        calls.append(dict(data))
+        if len(calls) == 1:
+            return FakeResponse(429, {'ok': False, 'parameters': {'retry_after': 3}})
+        return FakeResponse(200, {'ok': True})
+
+    monkeypatch.setattr('alerter._HTTP.post', fake_post)
+    monkeypatch.setattr('alerter.time.sleep', sleeps.append)
+    alerter = Alerter(FakeDB({'telegram_bot_token': 'token', 'telegram_chat_id': '12345'}))
+
+    result = alerter.send_telegram('device down')
+
+    assert result == {'success': True}
+    assert len(calls) == 2
+    assert 3 in sleeps
+
+
+def test_token_bucket_blocks_once_burst_is_spent(monkeypatch):
+    from alerter import TokenBucket
+
+    clock = [100.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr('alerter.time.monotonic', lambda: clock[0])
+    monkeypatch.setattr('alerter.time.sleep', fake_sleep)
+    bucket = TokenBucket(rate=1, burst=2)
+
+    bucket.acquire()
+    bucket.acquire()
+    assert sleeps == []
+
+    bucket.acquire()
+    assert sleeps and abs(sum(sleeps) - 1.0) < 1e-6
+
+
+class FakeAlertDB(FakeDB):
+    def __init__(self, settings=None):
+        super().__init__(settings)
+        self.logged = []
+
+    def get_pending_maintenance(self, device_id):
+        return []
+
+    def is_parent_device_down(self, device_id):
+        return None
+
+    def get_last_alert_time(self, device_id, event_type):
+        return None
+
+    def count_downstream_devices(self, device_id):
+        return 0
+
+    def get_device_recipients(self, device_id):
+        return {'emails': [], 'telegram_ids': []}
+
+    def log_alert(self, device_id, event_type, message, channel, status, error=None):
+        self.logged.append((channel, status))
+
+    def log_alerts_bulk(self, entries):
+        for entry in entries:
+            self.log_alert(*entry[:6])
+
+
+def test_trigger_alert_sends_enabled_channels_concurrently(monkeypatch):
+    import threading
+
+    db = FakeAlertDB({'email_enabled': 'true', 'telegram_enabled': 'true'})
+    alerter = Alerter(db)
+    both_started = threading.Barrier(2, timeout=5)
+
+    def fake_email(subject, message, recipient=None):
+        both_started.wait()
+        return {'success': True}
+
+    def fake_telegram(message, recipient=None):
+        both_started.wait()
+        return {'success': False, 'error': 'boom'}
+
+    monkeypatch.setattr(alerter, 'send_email', fake_email)
+    monkeypatch.setattr(alerter, 'send_telegram', fake_telegram)
+
+    alerter.trigger_alert({'id': 7, 'name': 'core-sw'}, 'down', 'Device is down')
+    alerter.flush_alert_log()
+
+    assert sorted(db.logged) == [('email', 'sent'), ('telegram', 'failed')]
+
+
+def test_alert_log_rows_are_written_in_batches():
+    class BulkDB(FakeAlertDB):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def log_alerts_bulk(self, entries):
+            self.batches.append(list(entries))
+
+    db = BulkDB()
+    alerter = Alerter(db)
+
+    for index in range(5):
+        alerter._queue_alert_log(index, 'down', 'msg', 'email', 'sent')
+    alerter.close()
+
+    rows = [row for batch in db.batches for row in batch]
+    assert [row[0] for row in rows] == [0, 1, 2, 3, 4]
+    assert len(db.batches) < 5
+
+
+def test_line_notify_is_disabled_without_network(monkeypatch):
+    def fail_post(*args, **kwargs):
+        raise AssertionError('LINE Notify must not hit the network')
+
+    monkeypatch.setattr('alerter._HTTP.post', fail_post)
+    db = FakeAlertDB({'line_enabled': 'true', 'line_notify_token': 'token'})
+    alerter = Alerter(db)
+
+    assert alerter.is_enabled('line') is False
+    assert alerter.send_line_notify('hello')['success'] is False
+
+    alerter.trigger_alert({'id': 7, 'name': 'core-sw'}, 'down', 'Device is down')
+    alerter.flush_alert_log()
+
+    assert db.logged == []
+
+
+def test_telegram_plain_text_retry_is_rate_limited(monkeypatch):
+    calls = []
+    acquired = []
+
+    def fake_post(url, data, timeout):
+        calls.append(dict(data))
+        if len(calls) == 1:
+            return FakeResponse(400, {'ok': False, 'description': "Bad Request: can't parse entities"})
+        return FakeResponse(200, {'ok': True})
+
+    monkeypatch.setattr('alerter._HTTP.post', fake_post)
+    alerter = Alerter(FakeDB({'telegram_bot_token': 'token', 'telegram_chat_id': '12345'}))
+    monkeypatch.setattr(alerter, '_acquire_telegram', acquired.append)
+
+    assert alerter.send_telegram('core_sw *down')['success'] is True
+    assert len(calls) == 2
+    assert 'parse_mode' not in calls[1]
+    assert acquired == ['12345', '12345']
+
+
+def test_idle_telegram_chat_buckets_are_evicted(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('alerter.time.monotonic', lambda: clock[0])
+    alerter = Alerter(FakeDB())
+
+    alerter._acquire_telegram('a')
+    alerter._acquire_telegram('b')
+    clock[0] += alerter._tg_per_chat_idle + 1
+    alerter._acquire_telegram('c')
+
+    assert list(alerter._tg_per_chat) == ['c']
+
+
+def test_escalation_passes_recipients_without_touching_settings(monkeypatch):
+    db = FakeAlertDB({
+        'email_recipient': 'noc@example.com', 'telegram_chat_id': '111',
+        'escalation_channel_email': 'true', 'escalation_email_recipient': 'boss@example.com',
+        'escalation_channel_telegram': 'true', 'escalation_telegram_chat_id': '999',
+    })
+    alerter = Alerter(db)
+    sent = []
+
+    def fake_email(subject, message, recipient=None):
+        sent.append(('email', recipient, alerter.get_settings()['email_recipient']))
+        return {'success': True}
+
+    def fake_telegram(message, recipient=None):
+        sent.append(('telegram', recipient, alerter.get_settings()['telegram_chat_id']))
+        return {'success': True}
+
+    monkeypatch.setattr(alerter, 'send_email', fake_email)
+    monkeypatch.setattr(alerter, 'send_telegram', fake_telegram)
+
+    assert alerter.trigger_escalated_alert({'id': 7, 'name': 'core-sw'}, 30) is True
+
+    assert sent == [('email', 'boss@example.com', 'noc@example.com'),
+                    ('telegram', '999', '111')]
+
+
+def test_rate_limited_telegram_is_reported_as_queued_not_sent(monkeypatch):
+    def throttled_post(url, data, timeout):
+        return FakeResponse(429, {'ok': False, 'parameters': {'retry_after': 1}})
+
+    monkeypatch.setattr('alerter._HTTP.post', throttled_post)
+    monkeypatch.setattr('alerter.time.sleep', lambda seconds: None)
+    db = FakeAlertDB({'telegram_enabled': 'true', 'telegram_bot_token': 'token', 'telegram_chat_id': '12345'})
+    alerter = Alerter(db)
+    monkeypatch.setattr(alerter, '_defer_telegram', lambda url, data, attempts=0: None)
+
+    result = alerter.send_telegram('device down')
+    assert result['success'] is False
+    assert result['queued'] == 1
+
+    alerter.trigger_alert({'id': 7, 'name': 'core-sw'}, 'down', 'Device is down')
+    alerter.flush_alert_log()
+
+    assert db.logged == [('telegram', 'queued')]
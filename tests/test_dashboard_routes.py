@@ -0,0 +1,77 @@
+import json
+import unittest
+
+from flask import Flask
+
+from routes.auth import auth_bp
+from routes.dashboards import dashboards_bp, invalidate_dashboard_cache
+
+
+class FakeDB:
+    def __init__(self):
+        self.dashboards = [
+            {'id': 1, 'name': 'Main', 'layout_config': '[{"type": "stats"}]', 'is_public': 1, 'created_by': 1},
+            {'id': 2, 'name': 'Broken', 'layout_config': '{not json', 'is_public': 1, 'created_by': 1},
+            {'id': 3, 'name': 'Empty', 'layout_config': None, 'is_public': 1, 'created_by': 1},
+        ]
+        self.created = []
+
+    def get_dashboards(self, user_id):
+        self.list_reads = getattr(self, 'list_reads', 0) + 1
+        return [dict(d) for d in self.dashboards]
+
+    def create_dashboard(self, **kwargs):
+        self.created.append(kwargs)
+        return {'success': True, 'id': 4}
+
+    def add_audit_log(self, **kwargs):
+        pass
+
+
+class DashboardRouteTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_dashboard_cache()
+        self.db = FakeDB()
+
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = 'test-secret'
+        app.config['TESTING'] = True
+        app.config['DB'] = self.db
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(dashboards_bp)
+        self.client = app.test_client()
+
+        with self.client.session_transaction() as sess:
+            sess['logged_in'] = True
+            sess['user_id'] = 1
+            sess['role'] = 'admin'
+
+    def test_layouts_are_decoded_with_fallback_for_bad_rows(self):
+        payload = self.client.get('/api/dashboards').get_json()
+
+        self.assertEqual([d['layout_config'] for d in payload], [[{'type': 'stats'}], [], []])
+
+    def test_list_is_cached_until_a_dashboard_write(self):
+        first = self.client.get('/api/dashboards').get_json()
+        self.client.get('/api/dashboards')
+        self.assertEqual(self.db.list_reads, 1)
+
+        self.client.post('/api/dashboards', json={'name': 'New', 'layout_config': []})
+        self.assertEqual(self.client.get('/api/dashboards').get_json(), first)
+        self.assertEqual(self.db.list_reads, 2)
+
+    def test_create_rejects_invalid_layout_string(self):
+        resp = self.client.post('/api/dashboards', json={'name': 'New', 'layout_config': '{oops'})
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.db.created, [])
+
+    def test_create_serializes_layout(self):
+        resp = self.client.post('/api/dashboards', json={'name': 'New', 'layout_config': [{'type': 'map'}]})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(json.loads(self.db.created[0]['layout_config']), [{'type': 'map'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
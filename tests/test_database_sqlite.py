@@ -0,0 +1,460 @@
+import sqlite3
+
+import pytest
+
+from config import Config
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_TYPE', 'sqlite')
+    return Database(str(tmp_path / 'monitor.db'))
+
+
+def test_init_db_adds_missing_columns_to_legacy_tables(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_TYPE', 'sqlite')
+    path = str(tmp_path / 'legacy.db')
+    legacy = sqlite3.connect(path)
+    legacy.execute('CREATE TABLE devices (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, '
+                   "ip_address TEXT NOT NULL, device_type TEXT, status TEXT DEFAULT 'unknown')")
+    legacy.execute("INSERT INTO devices (name, ip_address) VALUES ('old', '10.9.0.1')")
+    legacy.commit()
+    legacy.close()
+
+    db = Database(path)
+
+    device = db.get_all_devices()[0]
+    assert device['name'] == 'old'
+    assert device['escalation_level'] == 0
+    assert device['ssh_port'] == 22
+    assert 'parent_device_id' in device and 'service_summary_json' in device
+
+
+def test_init_db_skips_schema_setup_once_version_is_recorded(db, monkeypatch):
+    conn = db.get_connection()
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == Database.SCHEMA_VERSION
+    finally:
+        db.release_connection(conn)
+
+    calls = []
+    monkeypatch.setattr(Database, '_create_schema', lambda self, conn, cursor: calls.append(True) or True)
+    Database(db.db_path)
+    assert calls == []
+
+    monkeypatch.setattr(Database, 'SCHEMA_VERSION', Database.SCHEMA_VERSION + 1)
+    Database(db.db_path)
+    assert calls == [True]
+
+
+def test_default_users_are_seeded_once(db, monkeypatch):
+    conn = db.get_connection()
+    try:
+        conn.execute("DELETE FROM users WHERE username = 'viewer'")
+        conn.commit()
+    finally:
+        db.release_connection(conn)
+
+    hashed = []
+    monkeypatch.setattr('database.generate_password_hash', lambda password: hashed.append(password) or 'x')
+    conn = db.get_connection()
+    try:
+        db._create_schema(conn, db._cursor(conn))
+    finally:
+        db.release_connection(conn)
+
+    assert hashed == ['viewer']
+    users = {user['username']: user['role'] for user in db.get_all_users()}
+    assert {name: users[name] for name in ('admin', 'operator', 'viewer')} == {
+        'admin': 'admin', 'operator': 'operator', 'viewer': 'viewer'}
+
+
+def test_failed_column_migration_is_retried_on_next_start(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DB_TYPE', 'sqlite')
+    path = str(tmp_path / 'retry.db')
+    original = Database._add_missing_columns
+
+    def failing_for_dashboards(self, conn, cursor, table_name, columns):
+        if table_name == 'dashboards':
+            return False
+        return original(self, conn, cursor, table_name, columns)
+
+    monkeypatch.setattr(Database, '_add_missing_columns', failing_for_dashboards)
+    db = Database(path)
+    conn = db.get_connection()
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    finally:
+        db.release_connection(conn)
+
+    monkeypatch.setattr(Database, '_add_missing_columns', original)
+    db = Database(path)
+    conn = db.get_connection()
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == Database.SCHEMA_VERSION
+    finally:
+        db.release_connection(conn)
+
+
+def test_add_devices_bulk_inserts_rows_and_reports_duplicates(db):
+    assert db.add_device(name='existing', ip_address='10.0.0.1')['success'] is True
+
+    results = db.add_devices_bulk([
+        {'name': 'dup-existing', 'ip_address': '10.0.0.1'},
+        {'name': 'new-a', 'ip_address': ' 10.0.0.2 '},
+        {'name': 'new-b', 'ip_address': '10.0.0.3', 'is_enabled': False},
+        {'name': 'dup-in-batch', 'ip_address': '10.0.0.3'},
+    ])
+
+    assert [result['success'] for result in results] == [False, True, True, False]
+    assert 'already exists' in results[0]['error']
+
+    devices = {device['name']: device for device in db.get_all_devices()}
+    assert set(devices) == {'existing', 'new-a', 'new-b'}
+    assert devices['new-a']['ip_address'] == '10.0.0.2'
+    assert devices['new-b']['status'] == 'disabled'
+
+
+def test_add_device_returns_inserted_row(db):
+    result = db.add_device(name=' core ', ip_address='10.0.0.5', is_enabled=False)
+
+    assert result['success'] is True
+    assert result['device']['id'] == result['id']
+    assert result['device']['name'] == 'core'
+    assert result['device']['status'] == 'disabled'
+    assert result['device'] == db.get_device(result['id'])
+
+
+def test_iter_all_devices_matches_get_all_devices(db):
+    db.add_devices_bulk([{'name': f'dev-{index}', 'ip_address': f'10.0.1.{index}'} for index in range(5)])
+
+    assert list(db.iter_all_devices(batch_size=2)) == db.get_all_devices()
+
+
+def test_device_status_summary_aggregates_in_sql(db):
+    first = db.add_device(name='a', ip_address='10.0.2.1')['id']
+    second = db.add_device(name='b', ip_address='10.0.2.2')['id']
+    db.add_device(name='c', ip_address='10.0.2.3', is_enabled=False)
+    db.add_device(name='d', ip_address='10.0.2.4')
+    conn = db.get_connection()
+    conn.execute("UPDATE devices SET status = 'up', response_time = 10 WHERE id = ?", (first,))
+    conn.execute("UPDATE devices SET status = 'down', response_time = 30 WHERE id = ?", (second,))
+    conn.commit()
+    db.release_connection(conn)
+
+    assert db.get_device_status_summary() == {
+        'total': 4, 'up': 1, 'slow': 0, 'down': 1, 'unknown': 1, 'disabled': 1,
+        'avg_response_time': 20.0,
+    }
+
+
+def test_get_enabled_devices_skips_disabled(db):
+    db.add_device(name='on', ip_address='10.0.3.1')
+    db.add_device(name='off', ip_address='10.0.3.2', is_enabled=False)
+
+    assert [device['name'] for device in db.get_enabled_devices()] == ['on']
+
+
+def test_add_topology_connections_bulk_skips_existing_pairs(db):
+    ids = [db.add_device(name=f'dev-{n}', ip_address=f'10.0.1.{n}')['id'] for n in range(4)]
+    assert db.add_topology_connection(ids[0], ids[1])['success'] is True
+
+    results = db.add_topology_connections_bulk([
+        {'device_id': ids[1], 'connected_to': ids[0], 'view_type': 'standard'},
+        {'device_id': ids[1], 'connected_to': ids[2], 'view_type': 'standard'},
+        {'device_id': ids[2], 'connected_to': ids[1], 'view_type': 'standard'},
+        {'device_id': ids[2], 'connected_to': ids[3], 'view_type': 'group'},
+    ])
+
+    assert [result['success'] for result in results] == [False, True, False, True]
+    assert results[1]['id'] != results[3]['id']
+    stored = {(row['device_id'], row['connected_to']) for row in db.get_topology()}
+    assert stored == {(ids[0], ids[1]), (ids[1], ids[2]), (ids[2], ids[3])}
+
+
+def test_device_status_snapshot_returns_only_live_columns(db):
+    device_id = db.add_device(name='edge', ip_address='10.0.2.1', device_type='server',
+                              monitor_type='http')['id']
+    conn = db.get_connection()
+    conn.execute("UPDATE devices SET status = 'up', response_time = 12.5, last_check = '2026-01-01T00:00:00' WHERE id = ?",
+                 (device_id,))
+    conn.commit()
+    db.release_connection(conn)
+
+    snapshot = db.get_device_status_snapshot()
+
+    assert snapshot == [{
+        'id': device_id,
+        'name': 'edge',
+        'ip_address': '10.0.2.1',
+        'device_type': 'server',
+        'monitor_type': 'http',
+        'status': 'up',
+        'response_time': 12.5,
+        'http_status_code': None,
+        'last_check': '2026-01-01T00:00:00',
+    }]
+
+
+def test_historical_data_multi_binds_id_list_as_one_parameter(db):
+    ids = [db.add_device(name=f'hist-{n}', ip_address=f'10.0.3.{n}')['id'] for n in range(3)]
+    conn = db.get_connection()
+    conn.executemany(
+        "INSERT INTO status_history (device_id, status, response_time, checked_at) VALUES (?, 'up', 1.0, ?)",
+        [(device_id, f'2026-01-01T00:00:0{n}') for n, device_id in enumerate(ids)],
+    )
+    conn.commit()
+    db.release_connection(conn)
+
+    rows = db.get_historical_data_multi(device_ids=[ids[0], ids[2]] + list(range(10000, 12000)))
+
+    assert [row['device_id'] for row in rows] == [ids[0], ids[2]]
+
+
+def test_sqlite_connections_use_wal_and_tuned_pragmas(db):
+    conn = db.get_connection()
+    try:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+        assert conn.execute('PRAGMA temp_store').fetchone()[0] == 2
+        assert conn.execute('PRAGMA cache_size').fetchone()[0] == -65536
+    finally:
+        db.release_connection(conn)
+
+
+def test_device_history_marker_tracks_newest_and_oldest_rows(db):
+    device_id = db.add_device(name='marker', ip_address='10.0.4.1')['id']
+    assert db.get_device_history_marker(device_id) == (None, None)
+
+    conn = db.get_connection()
+    conn.executemany("INSERT INTO status_history (device_id, status, checked_at) VALUES (?, 'up', ?)",
+                     [(device_id, '2026-01-01T00:00:05'), (device_id, '2026-01-01T00:00:35')])
+    conn.commit()
+    plan = ' '.join(row[-1] for row in conn.execute(
+        'EXPLAIN QUERY PLAN SELECT MAX(checked_at) FROM status_history WHERE device_id = ?', (device_id,)))
+    db.release_connection(conn)
+
+    assert db.get_device_history_marker(device_id) == ('2026-01-01T00:00:35', '2026-01-01T00:00:05')
+    assert 'SCAN' not in plan
+
+
+def test_topology_snapshot_matches_separate_reads(db):
+    a = db.add_device(name='snap-a', ip_address='10.0.5.1')['id']
+    b = db.add_device(name='snap-b', ip_address='10.0.5.2')['id']
+    db.add_topology_connection(a, b)
+
+    assert db.get_topology_snapshot() == {
+        'devices': db.get_all_devices(),
+        'connections': db.get_topology(),
+    }
+
+
+def test_save_alert_settings_bulk_upserts_in_one_call(db):
+    db.save_alert_setting('email_enabled', 'false')
+
+    assert db.save_alert_settings_bulk({'email_enabled': 'true', 'smtp_port': '587'}) == {'success': True}
+
+    settings = {row['setting_key']: row['setting_value'] for row in db.get_all_alert_settings()}
+    assert settings['email_enabled'] == 'true'
+    assert settings['smtp_port'] == '587'
+
+
+def test_sqlite_connections_are_reused_and_rolled_back(db):
+    conn = db.get_connection()
+    conn.execute("INSERT INTO alert_settings (setting_key, setting_value) VALUES ('uncommitted', 'x')")
+    db.release_connection(conn)
+
+    again = db.get_connection()
+    try:
+        assert again is conn
+        assert again.execute("SELECT 1 FROM alert_settings WHERE setting_key = 'uncommitted'").fetchone() is None
+    finally:
+        db.release_connection(again)
+
+    db.close_pool()
+    assert db.get_connection() is not conn
+
+
+def test_latest_history_query_uses_covering_index(db):
+    conn = db.get_connection()
+    try:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT checked_at, response_time, status '
+            'FROM status_history ORDER BY checked_at DESC LIMIT 5'
+        ))
+        names = {row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'status_history'"
+        )}
+    finally:
+        db.release_connection(conn)
+
+    assert 'COVERING INDEX idx_sh_checked_at_cover' in plan
+    assert 'idx_sh_checked_at' not in names
+
+
+def test_topology_links_are_indexed_on_both_ends(db):
+    conn = db.get_connection()
+    try:
+        plans = [' '.join(row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, (1,)))
+                 for sql in ('SELECT id FROM topology WHERE connected_to = ?',
+                             'SELECT id FROM topology WHERE device_id = ?',
+                             'SELECT id FROM sub_topology_devices WHERE device_id = ?')]
+    finally:
+        db.release_connection(conn)
+
+    assert 'idx_topology_connected' in plans[0]
+    assert 'idx_topology_device' in plans[1]
+    assert 'idx_subtop_devices_device' in plans[2]
+
+
+def test_record_status_history_bulk_inserts_all_rows(db):
+    device_id = db.add_device(name='core', ip_address='10.0.0.1')['id']
+
+    written = db.record_status_history_bulk([
+        (device_id, 'up', 1.5, '2026-01-01T00:00:00'),
+        (device_id, 'down', None, '2026-01-01T00:00:30'),
+    ])
+
+    assert written == 2
+    assert db.record_status_history_bulk([]) == 0
+    conn = db.get_connection()
+    try:
+        rows = conn.execute(
+            'SELECT status, response_time FROM status_history WHERE device_id = ? ORDER BY checked_at',
+            (device_id,),
+        ).fetchall()
+    finally:
+        db.release_connection(conn)
+    assert [tuple(row) for row in rows] == [('up', 1.5), ('down', None)]
+
+
+def test_update_device_status_reports_transition(db):
+    device_id = db.add_device(name='edge', ip_address='10.0.0.9')['id']
+
+    state = db.update_device_status(device_id, 'up', 2.5, ssl_days_left=30)
+
+    assert state['old_status'] == 'unknown'
+    assert state['new_status'] == 'up'
+    device = db.get_device(device_id)
+    assert (device['status'], device['ssl_days_left']) == ('up', 30)
+    assert db.update_device_status(device_id, 'up', 3.0)['old_status'] == 'up'
+
+
+def test_cleanup_old_data_prunes_in_batches(db, monkeypatch):
+    device_id = db.add_device(name='old', ip_address='10.0.5.1')['id']
+    monkeypatch.setattr('database.time.sleep', lambda seconds: None)
+    db.record_status_history_bulk(
+        [(device_id, 'up', 1.0, '2000-01-01T00:00:%02d' % second) for second in range(7)]
+        + [(device_id, 'up', 1.0, '2999-01-01T00:00:00')]
+    )
+
+    db.cleanup_old_data(batch_size=3)
+
+    conn = db.get_connection()
+    try:
+        remaining = [row[0] for row in conn.execute(
+            'SELECT checked_at FROM status_history WHERE device_id = ?', (device_id,))]
+    finally:
+        db.release_connection(conn)
+    assert remaining == ['2999-01-01T00:00:00']
+
+
+def test_status_history_daily_rollup_tracks_inserts_and_pruning(db, monkeypatch):
+    device_id = db.add_device(name='rollup', ip_address='10.0.6.1')['id']
+    monkeypatch.setattr('database.time.sleep', lambda seconds: None)
+    db.record_status_history_bulk([
+        (device_id, 'up', 2.0, '2000-01-01T00:00:00'),
+        (device_id, 'up', 4.0, '2999-01-01T00:00:00'),
+        (device_id, 'up', None, '2999-01-01T00:00:30'),
+        (device_id, 'down', None, '2999-01-01T00:01:00'),
+    ])
+    db.record_status_history_bulk([(device_id, 'up', 6.0, '2999-01-01T00:01:30')])
+
+    def rollup():
+        conn = db.get_connection()
+        try:
+            return sorted(tuple(row) for row in conn.execute(
+                'SELECT day, status, n, sum_rt FROM status_history_daily WHERE device_id = ?', (device_id,)))
+        finally:
+            db.release_connection(conn)
+
+    assert rollup() == [('2000-01-01', 'up', 1, 2.0), ('2999-01-01', 'down', 1, None),
+                        ('2999-01-01', 'up', 3, 10.0)]
+
+    db.cleanup_old_data()
+    assert rollup() == [('2999-01-01', 'down', 1, None), ('2999-01-01', 'up', 3, 10.0)]
+
+    db.delete_device(device_id)
+    assert rollup() == []
+
+
+def test_dashboard_writes_retry_when_database_is_locked(db, monkeypatch):
+    import sqlite3
+
+    monkeypatch.setattr('database.time.sleep', lambda seconds: None)
+    real_get_connection = db.get_connection
+    failures = [2]
+
+    class LockedOnce:
+        def __init__(self, conn):
+            self._conn = conn
+
+        def cursor(self, *args, **kwargs):
+            if failures[0]:
+                failures[0] -= 1
+                raise sqlite3.OperationalError('database is locked')
+            return self._conn.cursor(*args, **kwargs)
+
+        def __getattr__(self, name):
+            return getattr(self._conn, name)
+
+    monkeypatch.setattr(db, 'get_connection', lambda: LockedOnce(real_get_connection()))
+    monkeypatch.setattr(db, 'release_connection', lambda conn: Database.release_connection(db, conn._conn))
+
+    result = db.create_dashboard('Ops', '[]')
+
+    assert result['success'] is True
+    assert failures == [0]
+    assert [d['name'] for d in db.get_dashboards()] == ['Ops']
+
+
+def test_busy_retry_gives_up_on_other_errors(monkeypatch):
+    import sqlite3
+    from database import _retry_on_busy
+
+    calls = []
+
+    @_retry_on_busy()
+    def broken():
+        calls.append(1)
+        raise sqlite3.OperationalError('no such table: dashboards')
+
+    with pytest.raises(sqlite3.OperationalError):
+        broken()
+    assert len(calls) == 1
+
+
+def test_rows_to_dicts_matches_per_row_conversion(db):
+    db.add_device(name='a', ip_address='10.0.7.1')
+    db.add_device(name='b', ip_address='10.0.7.2')
+    conn = db.get_connection()
+    try:
+        rows = conn.execute('SELECT * FROM devices ORDER BY id').fetchall()
+    finally:
+        db.release_connection(conn)
+
+    assert db._rows_to_dicts(rows) == [db._row_to_dict(row) for row in rows]
+    assert db._rows_to_dicts(iter(rows)) == db._rows_to_dicts(rows)
+    assert db._rows_to_dicts([]) == []
+
+
+def test_backup_to_writes_consistent_copy(db, tmp_path):
+    db.add_device(name='snap', ip_address='10.0.8.1')
+
+    result = db.backup_to(str(tmp_path / 'snapshot.db'))
+
+    assert result['success'] is True
+    copy = Database(str(tmp_path / 'snapshot.db'))
+    assert [device['name'] for device in copy.get_all_devices()] == ['snap']
+    copy.close_pool()
@@ -0,0 +1,209 @@
+import csv
+import io
+import unittest
+
+from flask import Flask
+
+from routes.auth import auth_bp
+from routes.devices import devices_bp, invalidate_device_caches
+
+
+class FakeDB:
+    def __init__(self):
+        self.devices = [
+            {'id': 1, 'name': 'Core Router', 'ip_address': '10.0.0.1', 'device_type': 'router',
+             'monitor_type': 'ping', 'status': 'up', 'last_check': '2026-01-01T00:00:00'},
+            {'id': 2, 'name': 'Edge Switch', 'ip_address': '10.0.0.2', 'device_type': 'switch',
+             'monitor_type': 'snmp', 'status': 'down', 'last_check': '2026-01-01T00:00:00'},
+        ]
+        self.audit = []
+
+    def iter_all_devices(self, batch_size=500):
+        self.reads = getattr(self, 'reads', 0) + 1
+        for device in self.devices:
+            yield dict(device)
+
+    def get_all_devices(self):
+        return [dict(device) for device in self.devices]
+
+    def add_audit_log(self, **kwargs):
+        self.audit.append(kwargs)
+
+    def add_devices_bulk(self, devices):
+        self.bulk_calls = getattr(self, 'bulk_calls', 0) + 1
+        results = []
+        for device in devices:
+            if any(existing['ip_address'] == device['ip_address'] for existing in self.devices):
+                results.append({'success': False, 'error': 'duplicate'})
+                continue
+            self.devices.append(dict(device, id=len(self.devices) + 1))
+            results.append({'success': True})
+        return results
+
+
+    def get_device(self, device_id):
+        return next((dict(device) for device in self.devices if device['id'] == device_id), None)
+
+    def get_enabled_devices(self):
+        return [dict(device) for device in self.devices if device.get('is_enabled', True)]
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.checked = []
+
+    def check_devices(self, devices):
+        self.checked.extend(device['id'] for device in devices)
+        return [{'id': device['id'], 'status': 'up'} for device in devices]
+
+    def get_snmp_interfaces(self, ip_address, community, port, version, **v3_options):
+        self.walks = getattr(self, 'walks', 0) + 1
+        return [{'index': 1, 'name': 'eth0'}]
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def start_background_task(self, target, *args):
+        target(*args)
+
+    def emit(self, event, data, namespace=None):
+        self.emitted.append((event, data))
+
+
+class DeviceRouteTests(unittest.TestCase):
+    def setUp(self):
+        invalidate_device_caches()
+        self.db = FakeDB()
+
+        app = Flask(__name__)
+        app.config['SECRET_KEY'] = 'test-secret'
+        app.config['TESTING'] = True
+        app.config['DB'] = self.db
+        self.monitor = FakeMonitor()
+        self.socketio = FakeSocketIO()
+        app.config['MONITOR'] = self.monitor
+        app.config['SOCKETIO'] = self.socketio
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(devices_bp)
+
+        self.app = app
+        self.client = app.test_client()
+
+    def _login(self, role='admin'):
+        with self.client.session_transaction() as sess:
+            sess['logged_in'] = True
+            sess['user_id'] = 1
+            sess['username'] = 'tester'
+            sess['role'] = role
+
+    def test_export_csv_streams_every_device(self):
+        self._login('admin')
+        resp = self.client.get('/api/devices/export/csv')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.is_streamed)
+        rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+        self.assertEqual([row['name'] for row in rows], ['Core Router', 'Edge Switch'])
+        self.assertEqual(rows[1]['monitor_type'], 'snmp')
+        self.assertEqual(self.db.audit[-1]['action'], 'export')
+        self.assertIn('"count": 2', self.db.audit[-1]['details'])
+
+    def test_import_csv_writes_rows_in_one_batch(self):
+        self._login('operator')
+        body = (
+            'name,ip_address,snmp_port\n'
+            'New Host,10.0.0.9,\n'
+            'Dup Router,10.0.0.1,\n'
+            ',10.0.0.10,\n'
+            'Bad Port,10.0.0.11,abc\n'
+        )
+        resp = self.client.post('/api/devices/import/csv', data={
+            'file': (io.BytesIO(body.encode('utf-8')), 'devices.csv'),
+        }, content_type='multipart/form-data')
+        payload = resp.get_json()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(payload['imported'], 1)
+        self.assertEqual(payload['failed'], 3)
+        self.assertEqual(self.db.bulk_calls, 1)
+        self.assertTrue(payload['errors'][0].startswith('Row 4:'))
+        self.assertTrue(any(error.startswith('Row 3:') for error in payload['errors']))
+        self.assertEqual(self.monitor.checked, [3])
+        self.assertEqual(self.socketio.emitted, [('status_update_bulk', [{'id': 3, 'status': 'up'}])])
+
+    def test_import_csv_reads_large_spooled_upload(self):
+        self._login('operator')
+        location = 'rack ' * 60
+        rows = ''.join(f'Höst {index},10.1.{index // 250}.{index % 250},{location}\r\n' for index in range(2000))
+        body = 'name,ip_address,location\r\n' + rows
+        self.assertGreater(len(body), 500 * 1024)
+
+        resp = self.client.post('/api/devices/import/csv', data={
+            'file': (io.BytesIO(body.encode('utf-8')), 'devices.csv'),
+        }, content_type='multipart/form-data')
+        payload = resp.get_json()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(payload['imported'], 2000)
+        self.assertEqual(payload['failed'], 0)
+        self.assertEqual(self.db.devices[2]['name'], 'Höst 0')
+
+    def test_snmp_interface_walk_is_reused(self):
+        from routes import devices
+        devices._snmp_interfaces_cache.clear()
+
+        first = self.client.get('/api/snmp/2/interfaces').get_json()
+        second = self.client.get('/api/snmp/2/interfaces').get_json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['interfaces'], [{'index': 1, 'name': 'eth0'}])
+        self.assertEqual(self.monitor.walks, 1)
+
+    def test_stacked_auth_decorators_check_session_role(self):
+        anonymous = self.client.post('/api/devices/1/toggle')
+        self.assertEqual(anonymous.status_code, 302)
+
+        self._login('viewer')
+        resp = self.client.post('/api/devices/1/toggle')
+        self.assertEqual(resp.status_code, 403)
+
+    def test_status_honors_if_none_match(self):
+        self._login('viewer')
+        first = self.client.get('/api/status')
+        tag = first.headers['ETag']
+
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('must-revalidate', first.headers['Cache-Control'])
+
+        cached = self.client.get('/api/status', headers={'If-None-Match': tag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.get_data(), b'')
+
+        self.db.devices[0]['status'] = 'down'
+        invalidate_device_caches()
+        changed = self.client.get('/api/status', headers={'If-None-Match': tag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], tag)
+
+    def test_status_body_is_cached_until_a_write(self):
+        self._login('admin')
+        first = self.client.get('/api/status').get_json()
+        self.db.devices[0]['status'] = 'down'
+        second = self.client.get('/api/status').get_json()
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.db.reads, 1)
+
+        self.client.post('/api/devices/import/csv', data={
+            'file': (io.BytesIO(b'name,ip_address\n'), 'devices.csv'),
+        }, content_type='multipart/form-data')
+        refreshed = self.client.get('/api/status').get_json()
+
+        self.assertEqual(refreshed[0]['status'], 'down')
+        self.assertEqual(self.db.reads, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from flask import Flask
+
+from routes.http_cache import TTLCache, json_array_response
+
+
+def test_ttl_cache_reuses_value_until_expiry(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr('routes.http_cache.time.monotonic', lambda: clock[0])
+    cache = TTLCache(ttl=5)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_compute(('a',), compute) == 1
+    clock[0] += 4
+    assert cache.get_or_compute(('a',), compute) == 1
+    clock[0] += 2
+    assert cache.get_or_compute(('a',), compute) == 2
+
+    cache.clear()
+    assert cache.get_or_compute(('a',), compute) == 3
+
+
+def test_ttl_cache_single_flights_concurrent_misses():
+    cache = TTLCache(ttl=60)
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute((30, 99.9), compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_ttl_cache_evicts_when_full():
+    cache = TTLCache(ttl=60, maxsize=2)
+
+    for key in range(3):
+        cache.get_or_compute(key, lambda key=key: key)
+
+    assert len(cache._data) == 2
+
+
+def test_json_array_response_buffers_small_results():
+    app = Flask(__name__)
+    rows = [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]
+
+    with app.test_request_context('/'):
+        response = json_array_response(iter(rows))
+
+        assert response.is_streamed is False
+        assert response.get_json() == rows
+
+
+def test_json_array_response_streams_large_results():
+    app = Flask(__name__)
+    rows = [{'id': index, 'name': 'x' * 50} for index in range(100)]
+    closed = []
+
+    def generate():
+        try:
+            yield from rows
+        finally:
+            closed.append(True)
+
+    with app.test_request_context('/'):
+        response = json_array_response(generate(), threshold=512)
+
+        assert response.is_streamed is True
+        assert response.get_json() == rows
+        assert closed == [True]
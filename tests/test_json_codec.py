@@ -0,0 +1,62 @@
+from datetime import datetime
+from decimal import Decimal
+
+import json_codec
+
+
+def test_dumps_handles_values_stdlib_json_rejects():
+    payload = {
+        'id': 1,
+        'last_check': datetime(2026, 1, 2, 3, 4, 5),
+        'uptime': Decimal('99.5'),
+        'response_time': None,
+    }
+
+    decoded = json_codec.loads(json_codec.dumps(payload))
+
+    assert decoded['id'] == 1
+    assert decoded['last_check'].startswith('2026-01-02')
+    assert decoded['uptime'] == '99.5'
+    assert decoded['response_time'] is None
+
+
+def test_dumps_accepts_stdlib_keyword_arguments():
+    text = json_codec.dumps([{'a': 1}], separators=(',', ':'))
+
+    assert json_codec.loads(text) == [{'a': 1}]
+
+
+def test_stdlib_fallback(monkeypatch):
+    monkeypatch.setattr(json_codec, 'ORJSON_AVAILABLE', False)
+
+    text = json_codec.dumps({'when': datetime(2026, 1, 2)}, separators=(',', ':'))
+
+    assert text == '{"when":"2026-01-02 00:00:00"}'
+    assert json_codec.loads(text) == {'when': '2026-01-02 00:00:00'}
+
+
+def test_orjson_provider_matches_default_jsonify():
+    import uuid
+
+    from flask import Flask, jsonify
+
+    payload = {
+        'b': 1,
+        'a': [1.5, None, True],
+        'when': datetime(2026, 1, 2, 3, 4, 5),
+        'amount': Decimal('1.25'),
+        'token': uuid.UUID(int=1),
+    }
+
+    default_app = Flask('default')
+    orjson_app = Flask('orjson')
+    orjson_app.json = json_codec.OrjsonProvider(orjson_app)
+
+    with default_app.app_context():
+        expected = jsonify(payload).get_data(as_text=True)
+    with orjson_app.app_context():
+        actual = jsonify(payload).get_data(as_text=True)
+        decoded = orjson_app.json.loads(actual)
+
+    assert actual == expected
+    assert decoded['when'] == 'Fri, 02 Jan 2026 03:04:05 GMT'
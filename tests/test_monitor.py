@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from monitor import NetworkMonitor
+
+
+def _monitor():
+    monitor = NetworkMonitor.__new__(NetworkMonitor)
+    monitor._inflight = {}
+    monitor._inflight_lock = threading.Lock()
+    return monitor
+
+
+def test_concurrent_checks_share_one_probe(monkeypatch):
+    monitor = _monitor()
+    release = threading.Event()
+    calls = []
+
+    def slow_probe(device, history=None):
+        calls.append(device['id'])
+        release.wait(5)
+        return {'id': device['id'], 'status': 'up'}
+
+    monkeypatch.setattr(monitor, '_check_device', slow_probe)
+    results = []
+    workers = [
+        threading.Thread(target=lambda: results.append(monitor.check_device({'id': 7})))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    while not monitor._inflight:
+        threading.Event().wait(0.01)
+    threading.Event().wait(0.05)
+    release.set()
+    for worker in workers:
+        worker.join(5)
+
+    assert calls == [7]
+    assert results == [{'id': 7, 'status': 'up'}] * 4
+    assert monitor._inflight == {}
+
+
+def test_probe_errors_propagate_and_clear_inflight(monkeypatch):
+    monitor = _monitor()
+
+    def failing_probe(device, history=None):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(monitor, '_check_device', failing_probe)
+
+    with pytest.raises(RuntimeError, match='boom'):
+        monitor.check_device({'id': 3})
+    assert monitor._inflight == {}
+
+
+def test_sweep_writes_status_history_in_one_batch(monkeypatch):
+    class FakeDB:
+        def __init__(self):
+            self.batches = []
+
+        def record_status_history_bulk(self, rows):
+            self.batches.append(list(rows))
+
+    monitor = _monitor()
+    monitor.db = FakeDB()
+    monitor.max_workers = 4
+
+    def probe(device, history=None):
+        history.append((device['id'], 'up', 1.0, 'now'))
+        return {'id': device['id'], 'status': 'up'}
+
+    monkeypatch.setattr(monitor, '_check_device', probe)
+
+    results = monitor.check_devices([{'id': 1}, {'id': 2}, {'id': 3}])
+
+    assert sorted(result['id'] for result in results) == [1, 2, 3]
+    assert len(monitor.db.batches) == 1
+    assert sorted(row[0] for row in monitor.db.batches[0]) == [1, 2, 3]
+
+
+def test_failed_history_batch_falls_back_to_single_rows():
+    class FakeDB:
+        def __init__(self):
+            self.written = []
+
+        def record_status_history_bulk(self, rows):
+            if len(rows) > 1 or rows[0][0] == 2:
+                raise RuntimeError('locked')
+            self.written.extend(rows)
+
+    monitor = _monitor()
+    monitor.db = FakeDB()
+
+    monitor._write_history([(1, 'up', 1.0, 'a'), (2, 'up', 1.0, 'b'), (3, 'down', None, 'c')])
+
+    assert [row[0] for row in monitor.db.written] == [1, 3]
+
+
+def test_status_changes_reports_only_flips_since_last_sweep():
+    monitor = NetworkMonitor.__new__(NetworkMonitor)
+    monitor._last_statuses = {}
+
+    first = [{'id': 1, 'status': 'up'}, {'id': 2, 'status': 'down'}]
+    assert monitor.status_changes(first) == first
+
+    assert monitor.status_changes([{'id': 1, 'status': 'up'}, {'id': 2, 'status': 'down'}]) == []
+    assert monitor.status_changes([{'id': 1, 'status': 'slow'}, {'id': 3, 'status': 'up'}]) == [
+        {'id': 1, 'status': 'slow'}, {'id': 3, 'status': 'up'}]
+    assert monitor.status_changes([{'id': 1, 'status': 'slow'}, {'id': 2, 'status': 'down'}]) == [
+        {'id': 2, 'status': 'down'}]
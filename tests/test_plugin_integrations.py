@@ -24,6 +24,10 @@ class FakeDB:
         self.settings[key] = value
         return {'success': True}
 
+    def save_alert_settings_bulk(self, settings):
+        self.settings.update(settings)
+        return {'success': True}
+
     def log_alert(self, device_id, event_type, message, channel, status, error=None):
         self.alert_logs.append({
             'device_id': device_id,
@@ -71,6 +71,13 @@ class ConfigSecurityTests(unittest.TestCase):
         )
         self.assertEqual(Config.SOCKETIO_CORS_ALLOWED_ORIGINS, ['https://ws.example.com'])
 
+    def test_sqlite_pragmas_can_be_overridden_from_env(self):
+        Config = self._reload_config({'SQLITE_PRAGMAS': 'cache_size=-8192, busy_timeout=10000'})
+
+        self.assertEqual(Config.SQLITE_PRAGMAS['journal_mode'], 'WAL')
+        self.assertEqual(Config.SQLITE_PRAGMAS['cache_size'], '-8192')
+        self.assertEqual(Config.SQLITE_PRAGMAS['busy_timeout'], '10000')
+
 
 if __name__ == '__main__':
     unittest.main()
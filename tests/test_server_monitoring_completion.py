@@ -42,7 +42,7 @@ def test_telegram_retries_plain_text_after_markdown_parse_error(monkeypatch):
             return FakeResponse(400, {'description': "Bad Request: can't parse entities"})
         return FakeResponse(200, {'ok': True})
 
-    monkeypatch.setattr('alerter.requests.post', fake_post)
+    monkeypatch.setattr('alerter._HTTP.post', fake_post)
     result = Alerter(FakeDB()).send_telegram('resource_cpu is above threshold')
 
     assert result['success'] is True
@@ -0,0 +1,95 @@
+import unittest
+
+from flask import Flask
+
+from routes import sla
+from routes.sla import sla_bp
+
+
+class FakeDB:
+    def __init__(self):
+        self.sla_calls = 0
+        self.history_calls = 0
+        self.last_checked = '2026-01-01T00:00:00'
+
+    def get_historical_data_multi(self, start_date, end_date, device_ids):
+        self.history_ids = device_ids
+        return []
+
+    def get_device_history_marker(self, device_id, minutes=None):
+        return (self.last_checked, '2026-01-01T00:00:00')
+
+    def get_device_history(self, device_id, limit, minutes, sample_count):
+        self.history_calls += 1
+        return [{'checked_at': self.last_checked, 'status': 'up'}]
+
+    def get_all_devices_sla(self, days=30, sla_target=99.9):
+        self.sla_calls += 1
+        return [
+            {'device_id': 1, 'uptime_percent': 100.0, 'sla_status': 'met'},
+            {'device_id': 2, 'uptime_percent': 99.5, 'sla_status': 'warning'},
+            {'device_id': 3, 'uptime_percent': 90.0, 'sla_status': 'breached'},
+            {'device_id': 4, 'uptime_percent': None, 'sla_status': 'no_data'},
+        ]
+
+
+class SlaRouteTests(unittest.TestCase):
+    def setUp(self):
+        sla._sla_cache.clear()
+        self.db = FakeDB()
+
+        app = Flask(__name__)
+        app.config['TESTING'] = True
+        app.config['DB'] = self.db
+        app.register_blueprint(sla_bp)
+        self.client = app.test_client()
+
+    def test_summary_counts_and_average(self):
+        payload = self.client.get('/api/sla?days=7').get_json()
+
+        self.assertEqual(payload['summary'], {
+            'total_devices': 4,
+            'devices_with_data': 3,
+            'sla_met': 1,
+            'sla_warning': 1,
+            'sla_breached': 1,
+            'average_uptime': 96.5,
+            'days': 7,
+            'sla_target': 99.9,
+        })
+        self.assertEqual(len(payload['devices']), 4)
+
+    def test_repeated_requests_share_cached_aggregate(self):
+        self.client.get('/api/sla?days=7')
+        self.client.get('/api/sla?days=7')
+        self.client.get('/api/sla?days=30')
+
+        self.assertEqual(self.db.sla_calls, 2)
+
+    def test_history_device_ids_skip_invalid_entries(self):
+        resp = self.client.get('/api/history?device_ids=1, 22 ,x3,-4,,5')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.db.history_ids, [1, 22, 5])
+
+    def test_history_rejects_oversized_device_ids(self):
+        resp = self.client.get('/api/history?device_ids=' + '1,' * 40000)
+
+        self.assertEqual(resp.status_code, 400)
+
+    def test_device_history_skips_query_when_marker_unchanged(self):
+        first = self.client.get('/api/devices/1/history?limit=50')
+        tag = first.headers['ETag']
+
+        cached = self.client.get('/api/devices/1/history?limit=50', headers={'If-None-Match': tag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(self.db.history_calls, 1)
+
+        self.db.last_checked = '2026-01-01T00:00:30'
+        changed = self.client.get('/api/devices/1/history?limit=50', headers={'If-None-Match': tag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(self.db.history_calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()